@@ -5,6 +5,7 @@ Provides /api/config/* endpoints for compatibility with frontend
 
 from flask import Blueprint, request, jsonify
 from database import get_db_connection
+from data_versions import CHECKLIST, STRUKTUR, bumps_versions
 from datetime import datetime
 import os
 import uuid
@@ -96,6 +97,7 @@ def config_aspects():
 # ============================================
 
 @config_bp.route('/config/checklist', methods=['GET', 'POST', 'PUT', 'DELETE', 'PATCH'])
+@bumps_versions(CHECKLIST)
 def config_checklist():
     """Alias for checklist configuration"""
     if request.method == 'GET':
@@ -173,6 +175,7 @@ def config_checklist():
 # ============================================
 
 @config_bp.route('/config/tahun-buku', methods=['GET', 'POST', 'DELETE'])
+@bumps_versions(CHECKLIST, STRUKTUR)
 def config_tahun_buku():
     """Alias for year/fiscal configuration"""
     if request.method == 'GET':
@@ -238,11 +241,13 @@ def config_tahun_buku():
                             import numpy as np
 
                             # Clean users.csv
-                            users_csv = storage_service.read_csv('config/users.csv')
-                            if users_csv is not None and not users_csv.empty and 'tahun' in users_csv.columns:
+                            def drop_year_users(users_csv):
+                                if users_csv is None or users_csv.empty or 'tahun' not in users_csv.columns:
+                                    return None
                                 mask = (users_csv['tahun'].notna()) & (users_csv['tahun'] != '') & (users_csv['tahun'] == year_value)
-                                users_csv = users_csv[~mask]
-                                storage_service.write_csv(users_csv, 'config/users.csv')
+                                return users_csv[~mask]
+
+                            storage_service.update_csv('config/users.csv', drop_year_users)
 
                             # Clean checklist.csv
                             checklist_csv = storage_service.read_csv('config/checklist.csv')
@@ -356,14 +361,18 @@ def config_tahun_buku():
                 from app import storage_service
                 import pandas as pd
 
-                uploaded_files = storage_service.read_excel('uploaded-files.xlsx')
-                if uploaded_files is not None and not uploaded_files.empty:
+                def drop_year_files(uploaded_files):
+                    if uploaded_files is None or uploaded_files.empty:
+                        return None
                     original_count = len(uploaded_files)
                     uploaded_files = uploaded_files[uploaded_files['year'] != year]
                     deleted_count = original_count - len(uploaded_files)
-                    if deleted_count > 0:
-                        storage_service.write_excel(uploaded_files, 'uploaded-files.xlsx')
-                        cleanup_stats['uploaded_files_records'] = deleted_count
+                    if deleted_count == 0:
+                        return None
+                    cleanup_stats['uploaded_files_records'] = deleted_count
+                    return uploaded_files
+
+                storage_service.update_excel('uploaded-files.xlsx', drop_year_files)
             except Exception as e:
                 print(f"Warning: Could not clean uploaded-files.xlsx: {e}")
                 cleanup_stats['uploaded_files_records'] = 0
@@ -385,21 +394,15 @@ def config_tahun_buku():
                 print(f"Warning: Could not clean aoi-documents.csv: {e}")
                 cleanup_stats['aoi_tracking_records'] = 0
 
-            # 6. Delete assessment data (output.xlsx)
+            # 6. Delete assessment data (the year's performa_gcg rows)
             try:
-                from app import storage_service
-                import pandas as pd
+                from assessment_store import assessment_store
 
-                output_data = storage_service.read_excel('web-output/output.xlsx')
-                if output_data is not None and not output_data.empty:
-                    original_count = len(output_data)
-                    output_data = output_data[output_data['Tahun'] != year]
-                    deleted_count = original_count - len(output_data)
-                    if deleted_count > 0:
-                        storage_service.write_excel(output_data, 'web-output/output.xlsx')
-                        cleanup_stats['assessment_records'] = deleted_count
+                deleted_count = assessment_store.delete_year(year)
+                if deleted_count > 0:
+                    cleanup_stats['assessment_records'] = deleted_count
             except Exception as e:
-                print(f"Warning: Could not clean output.xlsx: {e}")
+                print(f"Warning: Could not clean assessment data: {e}")
                 cleanup_stats['assessment_records'] = 0
 
             # 6b. Clean users CSV file
@@ -409,26 +412,31 @@ def config_tahun_buku():
                 from app import storage_service
                 import pandas as pd
 
-                users_csv = storage_service.read_csv('config/users.csv')
-                if users_csv is not None and not users_csv.empty:
+                state = {'found': False, 'deleted': 0}
+
+                def drop_year_users(users_csv):
+                    if users_csv is None or users_csv.empty:
+                        return None
+                    state['found'] = True
                     original_count = len(users_csv)
                     # Keep users where:
                     # 1. tahun is empty/null (default users like Super Admin)
                     # 2. tahun != year (users from other years)
-                    import numpy as np
                     if 'tahun' in users_csv.columns:
                         # Delete users where tahun == year (and tahun is not null/empty)
                         mask = (users_csv['tahun'].notna()) & (users_csv['tahun'] != '') & (users_csv['tahun'] == year)
                         users_csv = users_csv[~mask]
-                    deleted_count = original_count - len(users_csv)
-                    if deleted_count > 0:
-                        storage_service.write_csv(users_csv, 'config/users.csv')
-                        cleanup_stats['csv_users_deleted'] = deleted_count
-                        print(f"[OK] Step 6b: Deleted {deleted_count} users from users.csv")
-                    else:
-                        print(f"[INFO] Step 6b: No users to delete from users.csv")
-                else:
+                    state['deleted'] = original_count - len(users_csv)
+                    return users_csv if state['deleted'] > 0 else None
+
+                storage_service.update_csv('config/users.csv', drop_year_users)
+                if not state['found']:
                     print(f"[INFO] Step 6b: users.csv is empty or not found")
+                elif state['deleted'] > 0:
+                    cleanup_stats['csv_users_deleted'] = state['deleted']
+                    print(f"[OK] Step 6b: Deleted {state['deleted']} users from users.csv")
+                else:
+                    print(f"[INFO] Step 6b: No users to delete from users.csv")
             except Exception as e:
                 print(f"[ERROR] Step 6b ERROR: Could not clean users.csv: {e}")
                 cleanup_stats['csv_users_deleted'] = 0
@@ -591,6 +599,7 @@ def config_tahun_buku():
 # ============================================
 
 @config_bp.route('/struktur-organisasi', methods=['GET', 'POST', 'PUT', 'DELETE', 'PATCH'])
+@bumps_versions(STRUKTUR)
 def config_struktur_organisasi():
     """Alias for organizational structure - combines direktorat + subdirektorat + divisi"""
     if request.method == 'GET':
@@ -742,6 +751,7 @@ def config_struktur_organisasi():
 
 # Add route for path parameter style (for frontend compatibility)
 @config_bp.route('/config/struktur-organisasi/<int:struktur_id>', methods=['PUT', 'DELETE'])
+@bumps_versions(STRUKTUR)
 def config_struktur_organisasi_by_id(struktur_id):
     """Handle struktur organisasi by ID (path parameter style)"""
     if request.method == 'PUT':
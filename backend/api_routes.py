@@ -9,6 +9,7 @@ print("="*70)
 
 from flask import Blueprint, request, jsonify
 from database import get_db_connection
+from data_versions import CHECKLIST, STRUKTUR, bumps_versions
 from datetime import datetime
 import json
 
@@ -50,6 +51,7 @@ def get_checklist():
 
 
 @api_bp.route('/checklist', methods=['POST'])
+@bumps_versions(CHECKLIST)
 def create_checklist():
     """Create a new checklist item"""
     data = request.json
@@ -71,6 +73,7 @@ def create_checklist():
 
 
 @api_bp.route('/checklist/<int:checklist_id>', methods=['PUT'])
+@bumps_versions(CHECKLIST)
 def update_checklist(checklist_id):
     """Update a checklist item"""
     data = request.json
@@ -104,6 +107,7 @@ def update_checklist(checklist_id):
 
 
 @api_bp.route('/checklist/<int:checklist_id>', methods=['DELETE'])
+@bumps_versions(CHECKLIST)
 def delete_checklist(checklist_id):
     """Soft delete a checklist item"""
     with get_db_connection() as conn:
@@ -146,6 +150,7 @@ def get_assignments():
 
 
 @api_bp.route('/assignments', methods=['POST'])
+@bumps_versions(CHECKLIST)
 def create_assignment():
     """Create a new checklist assignment"""
     data = request.json
@@ -167,6 +172,7 @@ def create_assignment():
 
 
 @api_bp.route('/assignments/<int:assignment_id>', methods=['DELETE'])
+@bumps_versions(CHECKLIST)
 def delete_assignment(assignment_id):
     """Delete a checklist assignment"""
     with get_db_connection() as conn:
@@ -373,6 +379,7 @@ def get_direktorat():
 
 
 @api_bp.route('/direktorat', methods=['POST'])
+@bumps_versions(STRUKTUR)
 def create_direktorat():
     """Create a new direktorat"""
     data = request.json
@@ -421,6 +428,7 @@ def get_subdirektorat():
 
 
 @api_bp.route('/subdirektorat', methods=['POST'])
+@bumps_versions(STRUKTUR)
 def create_subdirektorat():
     """Create a new subdirektorat"""
     data = request.json
@@ -469,6 +477,7 @@ def get_anak_perusahaan():
 
 
 @api_bp.route('/anak-perusahaan', methods=['POST'])
+@bumps_versions(STRUKTUR)
 def create_anak_perusahaan():
     """Create a new anak perusahaan"""
     data = request.json
@@ -563,6 +572,7 @@ def get_years():
 
 
 @api_bp.route('/years', methods=['POST'])
+@bumps_versions(CHECKLIST, STRUKTUR)
 def create_year():
     """Add a new year"""
     print("\n" + "="*70)
@@ -607,11 +617,13 @@ def create_year():
                         import pandas as pd
 
                         # Clean users.csv
-                        users_csv = storage_service.read_csv('config/users.csv')
-                        if users_csv is not None and not users_csv.empty and 'tahun' in users_csv.columns:
+                        def drop_year_users(users_csv):
+                            if users_csv is None or users_csv.empty or 'tahun' not in users_csv.columns:
+                                return None
                             mask = (users_csv['tahun'].notna()) & (users_csv['tahun'] != '') & (users_csv['tahun'] == year_value)
-                            users_csv = users_csv[~mask]
-                            storage_service.write_csv(users_csv, 'config/users.csv')
+                            return users_csv[~mask]
+
+                        storage_service.update_csv('config/users.csv', drop_year_users)
 
                         # Clean checklist.csv
                         checklist_csv = storage_service.read_csv('config/checklist.csv')
@@ -650,6 +662,7 @@ def create_year():
 # ============================================
 
 @api_bp.route('/migrate-localstorage', methods=['POST'])
+@bumps_versions(CHECKLIST, STRUKTUR)
 def migrate_localstorage():
     """
     Migrate data from localStorage to SQLite
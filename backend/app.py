@@ -33,6 +33,15 @@ load_dotenv(dotenv_path=env_path)
 
 # Import storage service
 from storage_service import storage_service
+from assessment_store import assessment_store, no_key, order_assessment_rows, year_key, LEGACY_OUTPUT_PATH
+from assessment_serializer import build_records, column_values, indicator_records, number_column, text_column
+from orphan_cleanup import orphan_cleanup, ASSESSMENTS_JSON_PATH
+from data_versions import ASSESSMENTS, CHECKLIST, STRUKTUR, bumps_versions, data_versions, etag_versioned
+from json_streaming import stream_json
+from upload_jobs import DONE, FINISHED_STATES, JobCancelled, QueueFullError, upload_jobs
+from result_cache import sha256_file, upload_result_cache
+from output_index import output_index
+from file_retention import file_retention
 # from file_scanner import FileScanner  # COMMENTED OUT: Module doesn't exist, endpoint not used by frontend
 
 # Helper function to safely serialize pandas data to JSON
@@ -76,6 +85,12 @@ def migrate_config_to_csv():
 # Run migration on startup
 migrate_config_to_csv()
 
+# Prune orphaned assessments.json entries in the background after writes and on a schedule
+orphan_cleanup.start()
+
+# Expire old, duplicate and over-budget files in uploads/ and outputs/ on a schedule
+file_retention.start()
+
 def generate_unique_id():
     """Generate a unique ID for database records"""
     return int(time.time() * 1000000) % 2147483647  # Generate int ID within PostgreSQL int range
@@ -93,7 +108,7 @@ app = Flask(__name__)
 # Enable CORS for React frontend with exposed headers (allow all localhost ports for development)
 CORS(app,
      origins=["*"],  # Allow all origins for development
-     methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
+     methods=["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"],
      allow_headers=["Content-Type", "Authorization", "X-Requested-With"],
      expose_headers=['Content-Disposition', 'Content-Type', 'Content-Length'],
      supports_credentials=True)
@@ -198,13 +213,16 @@ def health_check():
 @app.route('/api/upload', methods=['POST'])
 def upload_file():
     """
-    Upload and process GCG assessment document.
+    Upload a GCG assessment document and queue it for processing.
     
     Expected form data:
     - file: The document file
     - checklistId: (optional) Associated checklist item ID
     - year: (optional) Assessment year
     - aspect: (optional) GCG aspect
+    
+    Returns 202 with a job id at once; poll /api/upload/jobs/<jobId> for the result.
+    A file identical to an earlier upload returns 200 with the cached result (cacheHit).
     """
     try:
         safe_print(f"🔧 DEBUG: Upload request received")
@@ -228,303 +246,408 @@ def upload_file():
         
         safe_print(f"🔧 DEBUG: File validation passed")
         
-        try:
-            safe_print(f"🔧 DEBUG: Starting file processing...")
-            # Generate unique filename
-            file_id = str(uuid.uuid4())
-            safe_print(f"🔧 DEBUG: Generated file_id: {file_id}")
-            original_filename = secure_filename(file.filename)
-            filename_parts = original_filename.rsplit('.', 1)
-            unique_filename = f"{file_id}_{filename_parts[0]}.{filename_parts[1]}"
-            
-            # Save uploaded file
-            input_path = UPLOAD_FOLDER / unique_filename
-            file.save(str(input_path))
-            
-            # Generate output filename
-            output_filename = f"processed_{file_id}_{filename_parts[0]}.xlsx"
-            output_path = OUTPUT_FOLDER / output_filename
+        # Generate unique filename
+        file_id = str(uuid.uuid4())
+        safe_print(f"🔧 DEBUG: Generated file_id: {file_id}")
+        original_filename = secure_filename(file.filename)
+        filename_parts = original_filename.rsplit('.', 1)
+        unique_filename = f"{file_id}_{filename_parts[0]}.{filename_parts[1]}"
+        
+        # Save uploaded file
+        input_path = UPLOAD_FOLDER / unique_filename
+        file.save(str(input_path))
+        
+        # Generate output filename
+        output_filename = f"processed_{file_id}_{filename_parts[0]}.xlsx"
+        output_path = OUTPUT_FOLDER / output_filename
+        
+        # Get metadata from form
+        checklist_id = request.form.get('checklistId')
+        year = request.form.get('year')
+        aspect = request.form.get('aspect')
+        
+        file_type = get_file_type(original_filename)
+        
+        params = {
+            'file_id': file_id,
+            'original_filename': original_filename,
+            'input_path': str(input_path),
+            'output_filename': output_filename,
+            'output_path': str(output_path),
+            'file_type': file_type,
+            'checklist_id': checklist_id,
+            'year': year,
+            'aspect': aspect,
+            'input_sha256': sha256_file(input_path)
+        }
+        params['cache_key'] = upload_result_cache.key(params['input_sha256'], file_type,
+                                                      upload_result_cache.processor_version())
+        
+        # Identical bytes already processed by the current processor: reuse that result
+        cached = upload_result_cache.lookup(params['cache_key'])
+        if cached is not None:
+            upload_result_cache.reuse_output(cached, output_path)
+            output_index.record(file_id, output_path, params['input_sha256'], original_filename)
+            result = build_upload_response(params, datetime.now().isoformat(), cached['processing'],
+                                           cached['extractedData'], cache_hit=True)
+            upload_jobs.record_done(file_id, params, result)
+            safe_print(f"⚡ Upload {file_id} served from the result cache")
             
-            # Get metadata from form
-            checklist_id = request.form.get('checklistId')
-            year = request.form.get('year')
-            aspect = request.form.get('aspect')
+            return jsonify({
+                'success': True,
+                'jobId': file_id,
+                'fileId': file_id,
+                'status': DONE,
+                'cacheHit': True,
+                'statusUrl': f'/api/upload/jobs/{file_id}',
+                'resultUrl': f'/api/upload/jobs/{file_id}/result',
+                'result': result
+            }), 200
+        
+        # Processing runs on an upload worker, not in the request thread
+        job = upload_jobs.submit(file_id, params)
+        safe_print(f"📋 Queued upload job {file_id} ({file_type})")
+        
+        return jsonify({
+            'success': True,
+            'jobId': file_id,
+            'fileId': file_id,
+            'status': job['status'],
+            'cacheHit': False,
+            'queuePosition': job.get('queue_position'),
+            'statusUrl': f'/api/upload/jobs/{file_id}',
+            'resultUrl': f'/api/upload/jobs/{file_id}/result'
+        }), 202
+        
+    except QueueFullError as e:
+        input_path.unlink(missing_ok=True)
+        return jsonify({'error': str(e)}), 503
+    except Exception as e:
+        safe_print(f"🔧 DEBUG: Exception occurred: {str(e)}")
+        import traceback
+        safe_print(f"🔧 DEBUG: Full traceback: {traceback.format_exc()}")
+        return jsonify({'error': f'Upload failed: {str(e)}'}), 500
+
+# Header keywords identifying each BRIEF summary field, checked in this order per column
+BRIEF_COLUMN_KEYWORDS = [
+    ('aspek', ['aspek', 'section', 'aspect']),
+    ('deskripsi', ['deskripsi', 'description', 'desc']),
+    ('bobot', ['bobot', 'weight', 'berat']),
+    ('skor', ['skor', 'score', 'nilai']),
+    ('capaian', ['capaian', 'achievement', 'pencapaian']),
+    ('penjelasan', ['penjelasan', 'explanation', 'keterangan']),
+]
+BRIEF_TEXT_FIELDS = ('aspek', 'deskripsi', 'penjelasan')
+
+def brief_column_mapping(columns) -> Dict[str, int]:
+    """BRIEF field -> column position; when several columns match a field the last one wins"""
+    mapping = {}
+    for position, col in enumerate(columns):
+        col_lower = str(col).strip().lower()
+        for field, keywords in BRIEF_COLUMN_KEYWORDS:
+            if any(keyword in col_lower for keyword in keywords):
+                mapping[field] = position
+                break
+    return mapping
+
+def extract_brief_rows(sheet_df: pd.DataFrame) -> List[Dict[str, Any]]:
+    """Aspect summary rows of a BRIEF sheet; rows without an aspek are skipped"""
+    mapping = brief_column_mapping(sheet_df.columns)
+    brief_rows = []
+    for values in sheet_df.itertuples(index=False, name=None):
+        brief_row = {}
+        for field, position in mapping.items():
+            value = values[position]
+            if field in BRIEF_TEXT_FIELDS:
+                brief_row[field] = str(value).strip() if pd.notna(value) else ''
+                continue
+            try:
+                brief_row[field] = float(value) if pd.notna(value) else 0.0
+            except (ValueError, TypeError):
+                brief_row[field] = 0.0
+        if brief_row.get('aspek') and brief_row['aspek'] != 'nan':
+            brief_rows.append(brief_row)
+    return brief_rows
+
+# Sheets with at most this many rows are BRIEF summaries
+BRIEF_MAX_ROWS = 15
+
+# Columns of a processed output that process_upload_job reads
+PROCESSED_OUTPUT_COLUMNS = ['Type', 'Tahun', 'Penilai', 'No', 'Section', 'Deskripsi',
+                            'Jumlah_Parameter', 'Bobot', 'Skor', 'Capaian', 'Penjelasan']
+
+def analyze_workbook_sheets(input_path: Path):
+    """Classify an uploaded workbook's sheets as BRIEF or DETAILED and extract BRIEF summary rows.
+
+    The workbook is streamed once for all sheets; only BRIEF-sized sheets are materialized.
+    Returns (sheet_analysis, brief_sheet_data).
+    """
+    sheets = storage_service.scan_excel_sheets(input_path, BRIEF_MAX_ROWS)
+    sheet_analysis = {
+        'total_sheets': len(sheets),
+        'sheet_names': list(sheets),
+        'sheet_types': {}
+    }
+    brief_sheet_data = None
+    
+    for sheet_name, (row_count, sheet_df) in sheets.items():
+        # Simple heuristic: BRIEF has fewer rows, DETAILED has more
+        sheet_type = 'BRIEF' if row_count <= BRIEF_MAX_ROWS else 'DETAILED'
+        if sheet_type == 'BRIEF' and row_count >= 3:
+            brief_sheet_data = extract_brief_rows(sheet_df)
+            safe_print(f"🔧 DEBUG: Extracted {len(brief_sheet_data)} BRIEF summary rows from sheet '{sheet_name}'")
+        
+        sheet_analysis['sheet_types'][sheet_name] = {
+            'type': sheet_type,
+            'row_count': row_count,
+            'contains_summary_data': 5 <= row_count <= 10
+        }
+    
+    safe_print(f"🔧 DEBUG: Analyzed {len(sheets)} sheets: {sheet_analysis['sheet_types']}")
+    return sheet_analysis, brief_sheet_data
+
+def process_upload_job(job: dict) -> dict:
+    """
+    Process a queued upload with the core system (runs on an upload worker thread).
+    Returns the response body /api/upload used to return synchronously.
+    """
+    params = job['params']
+    file_id = params['file_id']
+    original_filename = params['original_filename']
+    input_path = Path(params['input_path'])
+    output_filename = params['output_filename']
+    output_path = Path(params['output_path'])
+    file_type = params['file_type']
+    
+    try:
+        # Process the document using production system
+        if file_type == 'excel':
+            safe_print(f"🔧 DEBUG: Processing Excel file using core system (subprocess)...")
+            processing_result = None  # Force use of subprocess method
             
-            # Process the document using production system
-            file_type = get_file_type(original_filename)
+            # DISABLED: Accurate processing has pandas column selection issue
+            # Fall through to subprocess method which works perfectly
+        
+        # Use subprocess method for all file types (Excel, PDF, Image)
+        if file_type in ['excel', 'pdf', 'image']:
+            safe_print(f"🔧 DEBUG: Processing {file_type} file using core system...")
             
-            if file_type == 'excel':
-                safe_print(f"🔧 DEBUG: Processing Excel file using core system (subprocess)...")
-                processing_result = None  # Force use of subprocess method
+            try:
+                import time
+                start_time = time.time()
                 
-                # DISABLED: Accurate processing has pandas column selection issue
-                # Fall through to subprocess method which works perfectly
-            
-            # Use subprocess method for all file types (Excel, PDF, Image)
-            if file_type in ['excel', 'pdf', 'image']:
-                safe_print(f"🔧 DEBUG: Processing {file_type} file using core system...")
+                # Call the working core system directly as subprocess
+                cmd = [
+                    sys.executable, "main_new.py",
+                    "-i", str(input_path),
+                    "-o", str(output_path),
+                    "-v"
+                ]
                 
-                try:
-                    import time
-                    start_time = time.time()
-                    
-                    # Call the working core system directly as subprocess
-                    cmd = [
-                        sys.executable, "main_new.py",
-                        "-i", str(input_path),
-                        "-o", str(output_path),
-                        "-v"
-                    ]
-                    
-                    safe_print(f"🔧 DEBUG: Running command: {' '.join(cmd)}")
-                    safe_print(f"🔧 DEBUG: Working directory: {project_root}")
-                    
-                    result = subprocess.run(
-                        cmd,
-                        cwd=project_root,
-                        capture_output=True,
-                        text=True,
-                        timeout=180  # 3 minute timeout for OCR processing
-                    )
-                    
-                    end_time = time.time()
-                    safe_print(f"🔧 DEBUG: Core system completed in {end_time - start_time:.2f} seconds")
-                    safe_print(f"🔧 DEBUG: Return code: {result.returncode}")
-                    safe_print(f"🔧 DEBUG: STDOUT: {result.stdout}")
-                    if result.stderr:
-                        safe_print(f"🔧 DEBUG: STDERR: {result.stderr}")
-                    
-                    if result.returncode == 0:
-                        processing_result = {
-                            'success': True,
-                            'method': f'{file_type}_processing',
-                            'message': 'Processing completed successfully',
-                            'stdout': result.stdout,
-                            'processing_time': f"{end_time - start_time:.2f}s"
-                        }
-                    else:
-                        processing_result = {
-                            'success': False,
-                            'method': f'{file_type}_processing',
-                            'error': f'Core system failed with code {result.returncode}',
-                            'stdout': result.stdout,
-                            'stderr': result.stderr
-                        }
-                    
-                except subprocess.TimeoutExpired:
+                safe_print(f"🔧 DEBUG: Running command: {' '.join(cmd)}")
+                safe_print(f"🔧 DEBUG: Working directory: {project_root}")
+                
+                # Cancellable through /api/upload/jobs/<id>/cancel
+                result = upload_jobs.run_command(
+                    job,
+                    cmd,
+                    cwd=project_root,
+                    timeout=180  # 3 minute timeout for OCR processing
+                )
+                
+                end_time = time.time()
+                safe_print(f"🔧 DEBUG: Core system completed in {end_time - start_time:.2f} seconds")
+                safe_print(f"🔧 DEBUG: Return code: {result.returncode}")
+                safe_print(f"🔧 DEBUG: STDOUT: {result.stdout}")
+                if result.stderr:
+                    safe_print(f"🔧 DEBUG: STDERR: {result.stderr}")
+                
+                if result.returncode == 0:
                     processing_result = {
-                        'success': False,
+                        'success': True,
                         'method': f'{file_type}_processing',
-                        'error': 'Processing timeout (3 minutes exceeded)'
+                        'message': 'Processing completed successfully',
+                        'stdout': result.stdout,
+                        'processing_time': f"{end_time - start_time:.2f}s"
                     }
-                except Exception as e:
-                    safe_print(f"🔧 DEBUG: EXCEPTION in subprocess call: {e}")
-                    import traceback
-                    safe_print(f"🔧 DEBUG: Full traceback: {traceback.format_exc()}")
+                else:
                     processing_result = {
                         'success': False,
                         'method': f'{file_type}_processing',
-                        'error': f'Subprocess failed: {str(e)}'
+                        'error': f'Core system failed with code {result.returncode}',
+                        'stdout': result.stdout,
+                        'stderr': result.stderr
                     }
-            
-            else:
+                
+            except subprocess.TimeoutExpired:
+                processing_result = {
+                    'success': False,
+                    'method': f'{file_type}_processing',
+                    'error': 'Processing timeout (3 minutes exceeded)'
+                }
+            except JobCancelled:
+                raise
+            except Exception as e:
+                safe_print(f"🔧 DEBUG: EXCEPTION in subprocess call: {e}")
+                import traceback
+                safe_print(f"🔧 DEBUG: Full traceback: {traceback.format_exc()}")
                 processing_result = {
                     'success': False,
-                    'error': f'Unsupported file type: {file_type}',
-                    'method': 'unsupported'
+                    'method': f'{file_type}_processing',
+                    'error': f'Subprocess failed: {str(e)}'
                 }
         
-        except Exception as proc_error:
+        else:
             processing_result = {
                 'success': False,
-                'error': f'Processing failed: {str(proc_error)}',
-                'method': 'processing_error'
+                'error': f'Unsupported file type: {file_type}',
+                'method': 'unsupported'
             }
-        
-        # Load processed results if successful
-        extracted_data = None
-        if processing_result['success'] and output_path.exists():
-            try:
-                # Read the processed Excel file
-                df = pd.read_excel(str(output_path))
-                safe_print(f"🔧 DEBUG: Loaded DataFrame with {len(df)} rows")
-                safe_print(f"🔧 DEBUG: DataFrame columns: {list(df.columns)}")
-                safe_print(f"🔧 DEBUG: DataFrame head:\n{df.head()}")
-                
-                # Extract key metrics
-                indicator_rows = df[df['Type'] == 'indicator'] if 'Type' in df.columns else df
-                subtotal_rows = df[df['Type'] == 'subtotal'] if 'Type' in df.columns else pd.DataFrame()
-                total_rows = df[df['Type'] == 'total'] if 'Type' in df.columns else pd.DataFrame()
-                safe_print(f"🔧 DEBUG: Found {len(indicator_rows)} indicator rows")
-                
-                extracted_data = {
-                    'total_rows': int(len(df)),
-                    'indicators': int(len(indicator_rows)),
-                    'subtotals': int(len(subtotal_rows)),
-                    'totals': int(len(total_rows)),
-                    'year': str(df['Tahun'].iloc[0]) if len(df) > 0 and pd.notna(df['Tahun'].iloc[0]) else None,
-                    'penilai': str(df['Penilai'].iloc[0]) if len(df) > 0 and pd.notna(df['Penilai'].iloc[0]) else None,
-                    'format_type': 'DETAILED' if len(df) > 20 else 'BRIEF',
-                    'processing_status': 'success'
-                }
+    
+    except JobCancelled:
+        raise
+    except Exception as proc_error:
+        processing_result = {
+            'success': False,
+            'error': f'Processing failed: {str(proc_error)}',
+            'method': 'processing_error'
+        }
+    
+    # Load processed results if successful
+    extracted_data = None
+    if processing_result['success'] and output_path.exists():
+        try:
+            # Stream the processed Excel file, keeping only the columns summarized below
+            df = storage_service.stream_excel(output_path, columns=PROCESSED_OUTPUT_COLUMNS)
+            safe_print(f"🔧 DEBUG: Loaded DataFrame with {len(df)} rows")
+            safe_print(f"🔧 DEBUG: DataFrame columns: {list(df.columns)}")
+            safe_print(f"🔧 DEBUG: DataFrame head:\n{df.head()}")
+            
+            # Extract key metrics
+            indicator_rows = df[df['Type'] == 'indicator'] if 'Type' in df.columns else df
+            subtotal_rows = df[df['Type'] == 'subtotal'] if 'Type' in df.columns else pd.DataFrame()
+            total_rows = df[df['Type'] == 'total'] if 'Type' in df.columns else pd.DataFrame()
+            safe_print(f"🔧 DEBUG: Found {len(indicator_rows)} indicator rows")
+            
+            extracted_data = {
+                'total_rows': int(len(df)),
+                'indicators': int(len(indicator_rows)),
+                'subtotals': int(len(subtotal_rows)),
+                'totals': int(len(total_rows)),
+                'year': str(df['Tahun'].iloc[0]) if len(df) > 0 and pd.notna(df['Tahun'].iloc[0]) else None,
+                'penilai': str(df['Penilai'].iloc[0]) if len(df) > 0 and pd.notna(df['Penilai'].iloc[0]) else None,
+                'format_type': 'DETAILED' if len(df) > 20 else 'BRIEF',
+                'processing_status': 'success'
+            }
+            
+            # Extract ALL indicator data (not just samples)
+            if len(indicator_rows) > 0:
+                all_indicators = []
+                for _, row in indicator_rows.iterrows():
+                    all_indicators.append({
+                        'no': int(row['No']) if pd.notna(row['No']) else 0,
+                        'section': str(row['Section']) if pd.notna(row['Section']) else '',
+                        'description': str(row['Deskripsi']) if pd.notna(row['Deskripsi']) else '',
+                        'jumlah_parameter': int(row['Jumlah_Parameter']) if pd.notna(row['Jumlah_Parameter']) else 0,
+                        'bobot': float(row['Bobot']) if pd.notna(row['Bobot']) else 100.0,
+                        'skor': float(row['Skor']) if pd.notna(row['Skor']) else 0.0,
+                        'capaian': float(row['Capaian']) if pd.notna(row['Capaian']) else 0.0,
+                        'penjelasan': str(row['Penjelasan']) if pd.notna(row['Penjelasan']) else 'Sangat Kurang'
+                    })
+                extracted_data['sample_indicators'] = all_indicators
                 
-                # Extract ALL indicator data (not just samples)
-                if len(indicator_rows) > 0:
-                    all_indicators = []
-                    for _, row in indicator_rows.iterrows():
-                        all_indicators.append({
-                            'no': int(row['No']) if pd.notna(row['No']) else 0,
-                            'section': str(row['Section']) if pd.notna(row['Section']) else '',
-                            'description': str(row['Deskripsi']) if pd.notna(row['Deskripsi']) else '',
-                            'jumlah_parameter': int(row['Jumlah_Parameter']) if pd.notna(row['Jumlah_Parameter']) else 0,
-                            'bobot': float(row['Bobot']) if pd.notna(row['Bobot']) else 100.0,
-                            'skor': float(row['Skor']) if pd.notna(row['Skor']) else 0.0,
-                            'capaian': float(row['Capaian']) if pd.notna(row['Capaian']) else 0.0,
-                            'penjelasan': str(row['Penjelasan']) if pd.notna(row['Penjelasan']) else 'Sangat Kurang'
-                        })
-                    extracted_data['sample_indicators'] = all_indicators
+            # Add sheet analysis for XLSX files and extract BRIEF data for aspect summary
+            if file_type == 'excel':
+                try:
+                    sheet_analysis, brief_sheet_data = analyze_workbook_sheets(input_path)
+                    extracted_data['sheet_analysis'] = sheet_analysis
+                    extracted_data['brief_sheet_data'] = brief_sheet_data
                     
-                # Add sheet analysis for XLSX files and extract BRIEF data for aspect summary
-                if file_type == 'excel':
-                    try:
-                        # Read Excel file to analyze sheets
-                        excel_file = pd.ExcelFile(str(input_path))
-                        sheet_names = excel_file.sheet_names
-                        
-                        sheet_analysis = {
-                            'total_sheets': len(sheet_names),
-                            'sheet_names': sheet_names,
-                            'sheet_types': {}
-                        }
-                        
-                        brief_sheet_data = None
-                        
-                        # Analyze each sheet to determine if it's BRIEF or DETAILED
-                        for sheet_name in sheet_names:
-                            try:
-                                sheet_df = pd.read_excel(str(input_path), sheet_name=sheet_name)
-                                
-                                # Debug: Print sheet info
-                                safe_print(f"🔧 DEBUG: Analyzing sheet '{sheet_name}' with {len(sheet_df)} rows")
-                                safe_print(f"🔧 DEBUG: Sheet columns: {list(sheet_df.columns)}")
-                                safe_print(f"🔧 DEBUG: First few rows:\n{sheet_df.head()}")
-                                
-                                # Simple heuristic: BRIEF has fewer rows, DETAILED has more
-                                if len(sheet_df) <= 15:
-                                    sheet_type = 'BRIEF'
-                                    
-                                    # Try to extract BRIEF data from any sheet with reasonable data
-                                    if len(sheet_df) >= 3 and len(sheet_df) <= 20:  # More flexible range
-                                        brief_sheet_data = []
-                                        
-                                        safe_print(f"🔧 DEBUG: Attempting BRIEF extraction from sheet '{sheet_name}'")
-                                        
-                                        for idx, row in sheet_df.iterrows():
-                                            # Extract BRIEF data for aspect summary
-                                            brief_row = {}
-                                            
-                                            # More flexible column matching
-                                            for col in sheet_df.columns:
-                                                col_str = str(col).strip()
-                                                col_lower = col_str.lower()
-                                                
-                                                # Match various column patterns
-                                                if any(keyword in col_lower for keyword in ['aspek', 'section', 'aspect']):
-                                                    brief_row['aspek'] = str(row[col]).strip() if pd.notna(row[col]) else ''
-                                                elif any(keyword in col_lower for keyword in ['deskripsi', 'description', 'desc']):
-                                                    brief_row['deskripsi'] = str(row[col]).strip() if pd.notna(row[col]) else ''
-                                                elif any(keyword in col_lower for keyword in ['bobot', 'weight', 'berat']):
-                                                    try:
-                                                        brief_row['bobot'] = float(row[col]) if pd.notna(row[col]) else 0.0
-                                                    except (ValueError, TypeError):
-                                                        brief_row['bobot'] = 0.0
-                                                elif any(keyword in col_lower for keyword in ['skor', 'score', 'nilai']):
-                                                    try:
-                                                        brief_row['skor'] = float(row[col]) if pd.notna(row[col]) else 0.0
-                                                    except (ValueError, TypeError):
-                                                        brief_row['skor'] = 0.0
-                                                elif any(keyword in col_lower for keyword in ['capaian', 'achievement', 'pencapaian']):
-                                                    try:
-                                                        brief_row['capaian'] = float(row[col]) if pd.notna(row[col]) else 0.0
-                                                    except (ValueError, TypeError):
-                                                        brief_row['capaian'] = 0.0
-                                                elif any(keyword in col_lower for keyword in ['penjelasan', 'explanation', 'keterangan']):
-                                                    brief_row['penjelasan'] = str(row[col]).strip() if pd.notna(row[col]) else ''
-                                            
-                                            # Debug: show what we extracted for this row
-                                            safe_print(f"🔧 DEBUG: Row {idx}: {brief_row}")
-                                            
-                                            # Add row if it has meaningful data (aspek is required)
-                                            if brief_row.get('aspek') and brief_row.get('aspek').strip() and brief_row.get('aspek') != 'nan':
-                                                brief_sheet_data.append(brief_row)
-                                        
-                                        safe_print(f"🔧 DEBUG: Successfully extracted {len(brief_sheet_data)} BRIEF summary rows from sheet '{sheet_name}'")
-                                        
-                                else:
-                                    sheet_type = 'DETAILED'
-                                    
-                                sheet_analysis['sheet_types'][sheet_name] = {
-                                    'type': sheet_type,
-                                    'row_count': len(sheet_df),
-                                    'contains_summary_data': len(sheet_df) <= 10 and len(sheet_df) >= 5
-                                }
-                            except Exception as e:
-                                sheet_analysis['sheet_types'][sheet_name] = {
-                                    'type': 'UNKNOWN',
-                                    'error': str(e)
-                                }
-                        
-                        extracted_data['sheet_analysis'] = sheet_analysis
-                        extracted_data['brief_sheet_data'] = brief_sheet_data
-                        
-                    except Exception as e:
-                        extracted_data['sheet_analysis'] = {
-                            'error': f'Could not analyze sheets: {str(e)}'
-                        }
-                
-            except Exception as read_error:
-                extracted_data = {
-                    'error': f'Could not read processed file: {str(read_error)}'
-                }
-        
-        # Prepare response
-        response_data = {
-            'fileId': file_id,
-            'originalFilename': original_filename,
-            'processedFilename': output_filename,
-            'fileType': file_type,
-            'fileSize': input_path.stat().st_size,
-            'uploadTime': datetime.now().isoformat(),
-            'processing': processing_result,
-            'extractedData': extracted_data,
-            'metadata': {
-                'checklistId': checklist_id,
-                'year': year,
-                'aspect': aspect
+                except Exception as e:
+                    extracted_data['sheet_analysis'] = {
+                        'error': f'Could not analyze sheets: {str(e)}'
+                    }
+            
+        except Exception as read_error:
+            extracted_data = {
+                'error': f'Could not read processed file: {str(read_error)}'
             }
+    
+    if processing_result['success'] and output_path.exists():
+        output_index.record(file_id, output_path, params.get('input_sha256'), original_filename)
+    if processing_result['success'] and extracted_data and 'error' not in extracted_data and params.get('cache_key'):
+        upload_result_cache.store(params['cache_key'], output_path, processing_result, extracted_data)
+    
+    return build_upload_response(params, job['created_at'], processing_result, extracted_data, cache_hit=False)
+
+def build_upload_response(params: dict, upload_time: str, processing_result: dict, extracted_data, cache_hit: bool) -> dict:
+    """The body /api/upload used to return synchronously, for a processed or cached upload"""
+    return {
+        'fileId': params['file_id'],
+        'originalFilename': params['original_filename'],
+        'processedFilename': params['output_filename'],
+        'fileType': params['file_type'],
+        'fileSize': Path(params['input_path']).stat().st_size,
+        'uploadTime': upload_time,
+        'cacheHit': cache_hit,
+        'processing': processing_result,
+        'extractedData': extracted_data,
+        'metadata': {
+            'checklistId': params['checklist_id'],
+            'year': params['year'],
+            'aspect': params['aspect']
         }
-        
-        return jsonify(response_data), 200
-        
-    except Exception as e:
-        safe_print(f"🔧 DEBUG: Exception occurred: {str(e)}")
-        import traceback
-        safe_print(f"🔧 DEBUG: Full traceback: {traceback.format_exc()}")
-        return jsonify({'error': f'Upload failed: {str(e)}'}), 500
+    }
+
+# Start the upload workers; jobs still queued from the previous run are picked up again
+upload_jobs.start(process_upload_job)
+
+@app.route('/api/upload/jobs', methods=['GET'])
+def list_upload_jobs():
+    """Upload queue depth, worker count and the jobs still queued or running"""
+    return jsonify(dict(upload_jobs.get_stats(), result_cache=upload_result_cache.get_stats()))
+
+@app.route('/api/upload/jobs/<job_id>', methods=['GET'])
+def get_upload_job(job_id: str):
+    """Status of an upload job: queued, running, done, failed or cancelled"""
+    job = upload_jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(job)
+
+@app.route('/api/upload/jobs/<job_id>/result', methods=['GET'])
+def get_upload_job_result(job_id: str):
+    """The processed upload, in the body /api/upload used to return; 202 while the job is pending"""
+    job = upload_jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    if job['status'] == DONE:
+        return jsonify(job['result']), 200
+    if job['status'] in FINISHED_STATES:
+        return jsonify({'status': job['status'], 'error': job['error'] or f"Job {job['status']}"}), 409
+    return jsonify({'status': job['status'], 'queue_position': job.get('queue_position')}), 202
+
+@app.route('/api/upload/jobs/<job_id>/cancel', methods=['POST'])
+def cancel_upload_job(job_id: str):
+    """Cancel a queued job, or stop the processing of a running one"""
+    job = upload_jobs.cancel(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(job)
 
 @app.route('/api/download/<file_id>', methods=['GET'])
 def download_file(file_id: str):
     """Download processed file by ID."""
     try:
         # Find the processed file
-        for output_file in OUTPUT_FOLDER.glob(f"processed_{file_id}_*.xlsx"):
-            if output_file.exists():
-                return send_file(
-                    str(output_file),
-                    as_attachment=True,
-                    download_name=f"GCG_Assessment_{file_id}.xlsx",
-                    mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-                )
+        output = output_index.get(file_id)
+        if output is not None:
+            return send_file(
+                str(output['path']),
+                as_attachment=True,
+                download_name=f"GCG_Assessment_{file_id}.xlsx",
+                mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+            )
         
         return jsonify({'error': 'File not found'}), 404
         
@@ -533,28 +656,14 @@ def download_file(file_id: str):
 
 @app.route('/api/files', methods=['GET'])
 def list_files():
-    """List all processed files."""
+    """List processed files, newest first.
+    
+    Query params: page (default 1), perPage (default 50, max 500).
+    """
     try:
-        files = []
-        
-        for output_file in OUTPUT_FOLDER.glob("processed_*.xlsx"):
-            # Extract file ID from filename
-            filename_parts = output_file.name.split('_', 2)
-            if len(filename_parts) >= 2:
-                file_id = filename_parts[1]
-                
-                # Get file stats
-                stat = output_file.stat()
-                
-                files.append({
-                    'fileId': file_id,
-                    'filename': output_file.name,
-                    'size': stat.st_size,
-                    'created': datetime.fromtimestamp(stat.st_ctime).isoformat(),
-                    'modified': datetime.fromtimestamp(stat.st_mtime).isoformat()
-                })
-        
-        return jsonify({'files': files}), 200
+        page = max(1, request.args.get('page', 1, type=int))
+        per_page = min(500, max(1, request.args.get('perPage', 50, type=int)))
+        return jsonify(output_index.list_page(page, per_page)), 200
         
     except Exception as e:
         return jsonify({'error': f'Failed to list files: {str(e)}'}), 500
@@ -598,10 +707,77 @@ def system_info():
     })
 
 
+@app.route('/api/system/storage-stats', methods=['GET'])
+def storage_stats():
+    """Get parsed DataFrame cache statistics from the storage service."""
+    return jsonify({
+        'cache': storage_service.get_cache_stats(),
+        'journals': storage_service.get_journal_stats(),
+        'write_behind': storage_service.get_write_behind_stats(),
+        'data_versions': data_versions.get_stats()
+    })
+
+@app.route('/api/system/orphan-cleanup', methods=['GET'])
+def orphan_cleanup_status():
+    """Report when the background orphan cleanup last ran and what it removed."""
+    return jsonify(orphan_cleanup.get_status())
+
+@app.route('/api/system/file-retention', methods=['GET'])
+def file_retention_status():
+    """Report the retention rules for uploads/ and outputs/ and what the last run removed."""
+    return jsonify(file_retention.get_status())
+
+@app.route('/api/system/file-retention/run', methods=['POST'])
+def run_file_retention():
+    """Apply the retention rules now; only reports what would be removed unless dryRun=false."""
+    try:
+        dry_run = request.args.get('dryRun', 'true').strip().lower() not in ('0', 'false', 'no')
+        report = file_retention.run('manual', dry_run=dry_run)
+        return jsonify(dict(report, success=True))
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/system/compact-journals', methods=['POST'])
+def compact_journals():
+    """Fold pending CSV journal entries into their base files."""
+    try:
+        data = request.get_json(silent=True) or {}
+        file_path = data.get('file_path')
+        if file_path:
+            compacted = [file_path] if storage_service.compact_journal(file_path) else []
+        else:
+            compacted = storage_service.compact_all_journals()
+        return jsonify({'success': True, 'compacted': compacted})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/storage/export/<path:file_path>', methods=['GET'])
+def export_storage_table(file_path):
+    """Download a tracked table as XLSX/CSV, regenerating it from its sidecar when stale."""
+    try:
+        data_root = (Path(__file__).parent.parent / 'data').resolve()
+        target = (data_root / file_path).resolve()
+        if data_root not in target.parents or target.suffix.lower() not in ('.xlsx', '.csv'):
+            return jsonify({'error': 'Invalid table path'}), 400
+        # Credentials are never exported through this endpoint
+        if target == data_root / 'config' / 'users.csv':
+            return jsonify({'error': 'Table not exportable'}), 403
+
+        if target == data_root / LEGACY_OUTPUT_PATH:
+            # Assessments live in performa_gcg; build the combined workbook on demand
+            full_path = assessment_store.export_combined()
+        else:
+            full_path = storage_service.materialize(file_path)
+        return send_file(str(full_path), as_attachment=True, download_name=full_path.name)
+    except FileNotFoundError:
+        return jsonify({'error': 'File not found'}), 404
+    except Exception as e:
+        return jsonify({'error': f'Failed to export table: {str(e)}'}), 500
+
 @app.route('/api/save', methods=['POST'])
 def save_assessment():
     """
-    Save assessment data directly to output.xlsx (no JSON intermediate)
+    Save assessment data directly to the performa_gcg table (no JSON intermediate)
     """
     try:
         data = request.json
@@ -611,33 +787,9 @@ def save_assessment():
         assessment_id = f"{data.get('year', 'unknown')}_{data.get('auditor', 'unknown')}_{str(uuid.uuid4())[:8]}"
         saved_at = datetime.now().isoformat()
         
-        # Load existing XLSX data and COMPLETELY REPLACE year's data (including deletions)
+        # The year's rows are COMPLETELY REPLACED (this handles deletions);
+        # other years' rows are not touched
         all_rows = []
-        existing_df = storage_service.read_excel('web-output/output.xlsx')
-        
-        if existing_df is not None:
-            try:
-                current_year = data.get('year')
-                
-                safe_print(f"🔧 DEBUG: Loading existing XLSX with {len(existing_df)} rows")
-                safe_print(f"🔧 DEBUG: Current year to save: {current_year}")
-                safe_print(f"🔧 DEBUG: Existing years in file: {existing_df['Tahun'].unique().tolist()}")
-                
-                # COMPLETELY REMOVE all existing data for this year (this handles deletions)
-                if current_year:
-                    original_count = len(existing_df)
-                    existing_df = existing_df[existing_df['Tahun'] != current_year]
-                    removed_count = original_count - len(existing_df)
-                    safe_print(f"🔧 DEBUG: COMPLETELY REMOVED {removed_count} rows for year {current_year} (including deletions)")
-                    safe_print(f"🔧 DEBUG: Preserved {len(existing_df)} rows from other years")
-                
-                # Convert remaining data back to list format
-                for _, row in existing_df.iterrows():
-                    all_rows.append(row.to_dict())
-                    
-                safe_print(f"🔧 DEBUG: Starting with {len(all_rows)} rows from other years")
-            except Exception as e:
-                safe_print(f"WARNING: Could not read existing XLSX: {e}")
         
         # Process new data and add to all_rows
         year = data.get('year', 'unknown')
@@ -777,42 +929,17 @@ def save_assessment():
             safe_print(f"🔧 DEBUG: Removed {len(df) - len(df_unique)} duplicate rows")
             
             # Custom sorting: year → aspek → no, then organize headers and subtotals properly
-            def sort_key(row):
-                # Ensure all values are consistently typed for comparison
-                try:
-                    year = int(row['Tahun']) if pd.notna(row['Tahun']) else 0
-                except (ValueError, TypeError):
-                    year = 0
-                
-                section = str(row['Section']) if pd.notna(row['Section']) else ''
-                no = row['No']
-                row_type = str(row['Type']) if pd.notna(row['Type']) else 'indicator'
-                
-                # Convert 'no' to numeric for proper sorting, handle empty values
-                try:
-                    no_numeric = int(no) if str(no).isdigit() else 9999
-                except (ValueError, TypeError):
-                    no_numeric = 9999
-                
-                # Type priority: header=0, indicators=1, subtotal=2, total=3 (appears last)
-                type_priority = {'header': 0, 'indicator': 1, 'subtotal': 2, 'total': 3}.get(row_type, 1)
-                
-                # Special handling for total rows: they should appear at the very end of each year
-                if row_type == 'total':
-                    # Use 'ZZZZZ' as section to ensure total rows sort last within each year
-                    section = 'ZZZZZ'
-                
-                return (year, section, type_priority, no_numeric)
-            
-            # Apply custom sorting
-            df_sorted = df_unique.loc[df_unique.apply(sort_key, axis=1).sort_values().index]
+            df_sorted = order_assessment_rows(df_unique)
             
-            # Save XLSX using storage service
-            success = storage_service.write_excel(df_sorted, 'web-output/output.xlsx')
+            # Save only this year's rows
+            success = assessment_store.write_year(year, df_sorted)
             if success:
-                safe_print(f"SUCCESS: Saved to output.xlsx with {len(df_sorted)} rows (sorted: year->aspek->no->type)")
+                safe_print(f"SUCCESS: Saved year {year} to performa_gcg with {len(df_sorted)} rows (sorted: aspek->no->type)")
             else:
-                safe_print(f"ERROR: Failed to save output.xlsx")
+                safe_print(f"ERROR: Failed to save year {year} to performa_gcg")
+        else:
+            # Nothing submitted for this year: drop its rows
+            assessment_store.delete_year(year)
             
         return jsonify({
             'success': True,
@@ -829,13 +956,75 @@ def save_assessment():
         }), 500
 
 
-# generate_output_xlsx function removed - now saving directly to XLSX
+# generate_output_xlsx function removed - now saving directly to performa_gcg
+
+
+@app.route('/api/assessment/indicators', methods=['PATCH'])
+def patch_assessment_indicators():
+    """
+    Apply cell-level indicator edits keyed by (year, section, no) without resubmitting the whole year.
+    Only the affected subtotal rows and the year's total are recomputed.
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        changes = data.get('changes', [])
+        if not isinstance(changes, list) or not changes:
+            return jsonify({'success': False, 'error': 'changes must be a non-empty list'}), 400
+        
+        # Group edits by year; a top-level year applies to changes that don't name one
+        changes_by_year = {}
+        for change in changes:
+            if not isinstance(change, dict):
+                return jsonify({'success': False, 'error': 'Each change must be an object'}), 400
+            year = change.get('year', data.get('year'))
+            no = change.get('no', change.get('id'))
+            if (year is None or not str(change.get('section', change.get('aspek', ''))).strip()
+                    or no is None or not no_key(no)):
+                return jsonify({'success': False, 'error': 'Each change needs year, section and no'}), 400
+            changes_by_year.setdefault(year_key(year), []).append(change)
+        
+        results = []
+        for year, year_changes in changes_by_year.items():
+            result = assessment_store.patch_indicators(year, year_changes)
+            if result is None:
+                return jsonify({'success': False, 'error': f'No saved data found for year {year}'}), 404
+            
+            results.append({
+                'year': int(year) if year.isdigit() else year,
+                'updated': indicator_records(result['updated']),
+                'subtotals': [
+                    {'aspek': item['Section'], 'bobot': item['Bobot'], 'skor': item['Skor'],
+                     'capaian': item['Capaian'], 'penjelasan': item['Penjelasan']}
+                    for item in result['subtotals']
+                ],
+                'total': {
+                    'bobot': result['total']['Bobot'], 'skor': result['total']['Skor'],
+                    'capaian': result['total']['Capaian'], 'penjelasan': result['total']['Penjelasan']
+                } if result['total'] else None,
+                'not_found': result['not_found']
+            })
+            safe_print(f"💾 Patched {len(result['updated'])} indicators, {len(result['subtotals'])} subtotals for year {year}")
+        
+        return jsonify({
+            'success': True,
+            'results': results,
+            'version': assessment_store.version
+        })
+        
+    except (TypeError, ValueError) as e:
+        return jsonify({'success': False, 'error': f'Invalid change value: {e}'}), 400
+    except Exception as e:
+        safe_print(f"ERROR: Error patching indicators: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
 
 
 @app.route('/api/delete-year-data', methods=['DELETE'])
 def delete_year_data():
     """
-    Delete all assessment data for a specific year from output.xlsx
+    Delete all assessment data for a specific year (its performa_gcg rows)
     """
     try:
         data = request.json
@@ -849,83 +1038,26 @@ def delete_year_data():
         
         safe_print(f"🗑️ DEBUG: Received delete request for year: {year_to_delete}")
         
-        # Load existing XLSX data
-        existing_df = storage_service.read_excel('web-output/output.xlsx')
-        
-        if existing_df is None:
-            return jsonify({
-                'success': False,
-                'error': 'No data file exists to delete from'
-            }), 404
-        
         try:
-            safe_print(f"🔧 DEBUG: Loading existing XLSX with {len(existing_df)} rows")
-            safe_print(f"🔧 DEBUG: Year to delete: {year_to_delete}")
-            safe_print(f"🔧 DEBUG: Existing years in file: {existing_df['Tahun'].unique().tolist()}")
+            existing_years = assessment_store.list_years()
+            safe_print(f"🔧 DEBUG: Existing assessment years: {existing_years}")
             
             # Check if the year exists in the data
-            if year_to_delete not in existing_df['Tahun'].values:
+            if year_key(year_to_delete) not in existing_years:
                 return jsonify({
                     'success': False,
                     'error': f'No data found for year {year_to_delete}'
                 }), 404
             
-            # Remove all data for the specified year
-            original_count = len(existing_df)
-            filtered_df = existing_df[existing_df['Tahun'] != year_to_delete]
-            deleted_count = original_count - len(filtered_df)
-            
+            # Remove the year's rows; other years are untouched
+            deleted_count = assessment_store.delete_year(year_to_delete)
             safe_print(f"🗑️ DEBUG: Deleted {deleted_count} rows for year {year_to_delete}")
-            safe_print(f"🔧 DEBUG: Remaining {len(filtered_df)} rows from other years")
-            
-            # Save the filtered data back to the XLSX file
-            if len(filtered_df) > 0:
-                # Sort the remaining data properly before saving
-                def sort_key(row):
-                    year = row['Tahun']
-                    section = str(row['Section']) if pd.notna(row['Section']) else ''
-                    no = row['No']
-                    row_type = str(row['Type']) if pd.notna(row['Type']) else 'indicator'
-                    
-                    # Convert 'no' to numeric for proper sorting
-                    try:
-                        no_numeric = int(no) if str(no).isdigit() else 9999
-                    except (ValueError, TypeError):
-                        no_numeric = 9999
-                    
-                    # Type priority: header=0, indicators=1, subtotal=2, total=3 (appears last)
-                    type_priority = {'header': 0, 'indicator': 1, 'subtotal': 2, 'total': 3}.get(row_type, 1)
-                    
-                    # Special handling for total rows: they should appear at the very end of each year
-                    if row_type == 'total':
-                        # Use 'ZZZZZ' as section to ensure total rows sort last within each year
-                        section = 'ZZZZZ'
-                    
-                    return (year, section, type_priority, no_numeric)
-                
-                # Apply sorting
-                df_sorted = filtered_df.loc[filtered_df.apply(sort_key, axis=1).sort_values().index]
-                success = storage_service.write_excel(df_sorted, 'web-output/output.xlsx')
-                if success:
-                    safe_print(f"SUCCESS: Updated output.xlsx with {len(df_sorted)} rows (deleted {deleted_count} rows for year {year_to_delete})")
-                else:
-                    safe_print(f"ERROR: Failed to update output.xlsx after deletion")
-            else:
-                # If no data remains, create an empty file with just headers
-                empty_df = pd.DataFrame(columns=['Level', 'Type', 'Section', 'No', 'Deskripsi', 
-                                               'Bobot', 'Skor', 'Capaian', 'Penjelasan', 'Tahun', 'Penilai', 
-                                               'Jenis_Asesmen', 'Export_Date'])
-                success = storage_service.write_excel(empty_df, 'web-output/output.xlsx')
-                if success:
-                    safe_print(f"SUCCESS: Created empty output.xlsx file (all data deleted)")
-                else:
-                    safe_print(f"ERROR: Failed to create empty output.xlsx file")
             
         except Exception as e:
-            safe_print(f"ERROR: Could not process XLSX file: {e}")
+            safe_print(f"ERROR: Could not delete year data: {e}")
             return jsonify({
                 'success': False,
-                'error': f'Could not process XLSX file: {str(e)}'
+                'error': f'Could not delete year data: {str(e)}'
             }), 500
         
         return jsonify({
@@ -943,16 +1075,27 @@ def delete_year_data():
         }), 500
 
 
+def _penjelasan_or_default(rows):
+    """Penjelasan as text, with missing/'nan' values shown as 'Tidak Baik'"""
+    penjelasan = text_column(rows, 'Penjelasan')
+    empty = column_values(rows, 'Penjelasan', '').isna() | (penjelasan.str.lower() == 'nan')
+    return penjelasan.where(~empty, 'Tidak Baik')
+
+
 @app.route('/api/load/<int:year>', methods=['GET'])
 def load_assessment_by_year(year):
     """
-    Load assessment data for a specific year from output.xlsx
+    Load assessment data for a specific year from performa_gcg
     """
     try:
-        # Read XLSX data
-        df = storage_service.read_excel('web-output/output.xlsx')
+        # Read only this year's rows and the columns used below
+        df = assessment_store.read(
+            year,
+            columns=['Tahun', 'Type', 'Section', 'No', 'Deskripsi', 'Jumlah_Parameter', 'Bobot', 'Skor',
+                     'Capaian', 'Penjelasan', 'Penilai', 'Jenis_Asesmen', 'Export_Date']
+        )
         
-        if df is None:
+        if df is None or 'Tahun' not in df.columns:
             return jsonify({
                 'success': False,
                 'data': [],
@@ -977,54 +1120,40 @@ def load_assessment_by_year(year):
             safe_print(f"🔧 DEBUG: Found {len(indicator_rows)} indicators, {len(subtotal_rows)} subtotals, {len(header_rows)} headers")
             
             # Process indicator data for main table (both BRIEF and DETAILED)
-            main_table_data = []
-            for _, row in indicator_rows.iterrows():
-                row_id = row.get('No', '')
-                if pd.isna(row_id) or str(row_id).lower() in ['nan', '', 'none']:
-                    continue
-                    
-                aspek = str(row.get('Section', ''))
-                deskripsi = str(row.get('Deskripsi', ''))
-                if not aspek or not deskripsi:
-                    continue
-                
-                penjelasan = row.get('Penjelasan', '')
-                if pd.isna(penjelasan) or str(penjelasan).lower() == 'nan':
-                    penjelasan = 'Tidak Baik'
-                
-                main_table_data.append({
-                    'id': str(row_id),
-                    'aspek': aspek,
-                    'deskripsi': deskripsi,
-                    'jumlah_parameter': int(row.get('Jumlah_Parameter', 0)) if pd.notna(row.get('Jumlah_Parameter')) else 0,
-                    'bobot': float(row.get('Bobot', 0)) if pd.notna(row.get('Bobot')) else 0,
-                    'skor': float(row.get('Skor', 0)) if pd.notna(row.get('Skor')) else 0,
-                    'capaian': float(row.get('Capaian', 0)) if pd.notna(row.get('Capaian')) else 0,
-                    'penjelasan': str(penjelasan)
-                })
+            row_ids = text_column(indicator_rows, 'No')
+            valid = (
+                column_values(indicator_rows, 'No', '').notna()
+                & ~row_ids.str.lower().isin(['nan', '', 'none'])
+                & (text_column(indicator_rows, 'Section') != '')
+                & (text_column(indicator_rows, 'Deskripsi') != '')
+            )
+            main_rows = indicator_rows[valid]
+            main_table_data = build_records({
+                'id': text_column(main_rows, 'No'),
+                'aspek': text_column(main_rows, 'Section'),
+                'deskripsi': text_column(main_rows, 'Deskripsi'),
+                'jumlah_parameter': number_column(main_rows, 'Jumlah_Parameter', int),
+                'bobot': number_column(main_rows, 'Bobot'),
+                'skor': number_column(main_rows, 'Skor'),
+                'capaian': number_column(main_rows, 'Capaian'),
+                'penjelasan': _penjelasan_or_default(main_rows)
+            })
             
             # Process aspek summary data (subtotals) for DETAILED mode
             aspek_summary_data = []
             if is_detailed and len(subtotal_rows) > 0:
-                for _, row in subtotal_rows.iterrows():
-                    aspek = str(row.get('Section', ''))
-                    if not aspek:
-                        continue
-                        
-                    penjelasan = row.get('Penjelasan', '')
-                    if pd.isna(penjelasan) or str(penjelasan).lower() == 'nan':
-                        penjelasan = 'Tidak Baik'
-                    
-                    aspek_summary_data.append({
-                        'id': f'summary-{aspek}',
-                        'aspek': aspek,
-                        'deskripsi': str(row.get('Deskripsi', '')),
-                        'jumlah_parameter': int(row.get('Jumlah_Parameter', 0)) if pd.notna(row.get('Jumlah_Parameter')) else 0,
-                        'bobot': float(row.get('Bobot', 0)) if pd.notna(row.get('Bobot')) else 0,
-                        'skor': float(row.get('Skor', 0)) if pd.notna(row.get('Skor')) else 0,
-                        'capaian': float(row.get('Capaian', 0)) if pd.notna(row.get('Capaian')) else 0,
-                        'penjelasan': str(penjelasan)
-                    })
+                summary_rows = subtotal_rows[text_column(subtotal_rows, 'Section') != '']
+                aspek = text_column(summary_rows, 'Section')
+                aspek_summary_data = build_records({
+                    'id': 'summary-' + aspek,
+                    'aspek': aspek,
+                    'deskripsi': text_column(summary_rows, 'Deskripsi'),
+                    'jumlah_parameter': number_column(summary_rows, 'Jumlah_Parameter', int),
+                    'bobot': number_column(summary_rows, 'Bobot'),
+                    'skor': number_column(summary_rows, 'Skor'),
+                    'capaian': number_column(summary_rows, 'Capaian'),
+                    'penjelasan': _penjelasan_or_default(summary_rows)
+                })
             
             safe_print(f"🔧 DEBUG: Processed {len(main_table_data)} indicators, {len(aspek_summary_data)} aspect summaries")
             
@@ -1061,76 +1190,39 @@ def load_assessment_by_year(year):
 
 
 @app.route('/api/dashboard-data', methods=['GET'])
+@etag_versioned(ASSESSMENTS)
 def get_dashboard_data():
     """
-    Get all assessment data from output.xlsx for dashboard visualization
+    Get all assessment data from performa_gcg for dashboard visualization
     """
     try:
-        # Read XLSX data
-        df = storage_service.read_excel('web-output/output.xlsx')
+        # Per-year groups precomputed on save
+        year_groups = assessment_store.read_views('dashboard')
         
-        if df is None:
+        if not year_groups:
             return jsonify({
                 'success': False,
                 'data': [],
                 'message': 'No dashboard data available. Please save some assessments first.'
             })
         
-        safe_print(f"🔧 DEBUG: Dashboard loading {len(df)} rows from output.xlsx")
-        safe_print(f"🔧 DEBUG: Years in file: {df['Tahun'].unique().tolist()}")
-        safe_print(f"🔧 DEBUG: Sample rows: {df[['Tahun', 'Section', 'Skor']].head().to_dict('records')}")
-        
-        # Convert to dashboard format
-        dashboard_data = []
-        for _, row in df.iterrows():
-            # Handle NaN values properly
-            bobot = row.get('Bobot', 0)
-            skor = row.get('Skor', 0)
-            capaian = row.get('Capaian', 0)
-            jumlah_param = row.get('Jumlah_Parameter', 0)
-            
-            # Convert NaN to 0 for numeric fields
-            if pd.isna(bobot):
-                bobot = 0
-            if pd.isna(skor):
-                skor = 0
-            if pd.isna(capaian):
-                capaian = 0
-            if pd.isna(jumlah_param):
-                jumlah_param = 0
-                
-            dashboard_item = {
-                'id': str(row.get('No', '')),
-                'aspek': str(row.get('Section', '')),
-                'deskripsi': str(row.get('Deskripsi', '')),
-                'jumlah_parameter': float(jumlah_param),
-                'bobot': float(bobot),
-                'skor': float(skor),
-                'capaian': float(capaian),
-                'penjelasan': str(row.get('Penjelasan', '')),
-                'year': int(row.get('Tahun', 2022)),
-                'auditor': str(row.get('Penilai', 'Unknown')),
-                'jenis_asesmen': str(row.get('Jenis_Asesmen', 'Internal'))
-            }
-            dashboard_data.append(dashboard_item)
-        
         # Group by year for multi-year support
         years_data = {}
-        for item in dashboard_data:
-            year = item['year']
-            if year not in years_data:
-                years_data[year] = {
-                    'year': year,
-                    'auditor': item['auditor'],
-                    'jenis_asesmen': item['jenis_asesmen'],
-                    'data': []
-                }
-            years_data[year]['data'].append(item)
+        total_rows = 0
+        for groups in year_groups:
+            for group in groups:
+                year = group['year']
+                if year not in years_data:
+                    years_data[year] = dict(group, data=[])
+                years_data[year]['data'].extend(group['data'])
+                total_rows += len(group['data'])
+        
+        safe_print(f"🔧 DEBUG: Dashboard serving {total_rows} rows for years {list(years_data.keys())}")
         
         return jsonify({
             'success': True,
             'years_data': years_data,
-            'total_rows': len(dashboard_data),
+            'total_rows': total_rows,
             'available_years': list(years_data.keys()),
             'message': f'Loaded dashboard data for {len(years_data)} year(s)'
         })
@@ -1145,49 +1237,24 @@ def get_dashboard_data():
 
 
 @app.route('/api/aspek-data', methods=['GET'])
+@etag_versioned(ASSESSMENTS)
 def get_aspek_data():
     """
-    Get hybrid data (subtotal + header) for aspek summary table
+    Get hybrid data (subtotal + header) for aspek summary table, optionally for one year
     """
     try:
-        # Read XLSX data
-        df = storage_service.read_excel('web-output/output.xlsx')
+        # Subtotal rows with header descriptions, precomputed per year on save
+        year = request.args.get('year', type=int)
+        year_records = assessment_store.read_views('aspek', year=year)
         
-        if df is None:
+        if not year_records:
             return jsonify({
                 'success': False,
                 'data': [],
                 'message': 'No data available'
             })
         
-        # Create hybrid data: subtotal numeric data + header descriptions
-        subtotal_rows = df[df['Type'] == 'subtotal']
-        header_rows = df[df['Type'] == 'header']
-        
-        # Convert to frontend format by combining subtotal + header data
-        indicators = []
-        for _, subtotal_row in subtotal_rows.iterrows():
-            # Find matching header row by Section and Year
-            matching_header = header_rows[
-                (header_rows['Section'] == subtotal_row['Section']) & 
-                (header_rows['Tahun'] == subtotal_row['Tahun'])
-            ]
-            
-            # Use header description if found, otherwise subtotal description
-            deskripsi = subtotal_row['Deskripsi']  # fallback
-            if not matching_header.empty:
-                deskripsi = matching_header.iloc[0]['Deskripsi']
-            indicators.append({
-                'id': str(subtotal_row.get('No', '')),
-                'aspek': str(subtotal_row.get('Section', '')),
-                'deskripsi': deskripsi,  # Use header description
-                'jumlah_parameter': int(subtotal_row.get('Jumlah_Parameter', 0)) if pd.notna(subtotal_row.get('Jumlah_Parameter')) else 0,
-                'bobot': float(subtotal_row.get('Bobot', 0)) if pd.notna(subtotal_row.get('Bobot')) else 0,
-                'skor': float(subtotal_row.get('Skor', 0)) if pd.notna(subtotal_row.get('Skor')) else 0,
-                'capaian': float(subtotal_row.get('Capaian', 0)) if pd.notna(subtotal_row.get('Capaian')) else 0,
-                'penjelasan': str(subtotal_row.get('Penjelasan', 'Tidak Baik')),
-                'tahun': int(subtotal_row.get('Tahun', 0)) if pd.notna(subtotal_row.get('Tahun')) else 0
-            })
+        indicators = [record for records in year_records for record in records]
         
         return jsonify({
             'success': True,
@@ -1204,81 +1271,25 @@ def get_aspek_data():
             'data': []
         }), 500
 
-def _cleanup_orphaned_data_internal():
-    """
-    Internal helper function to clean up orphaned data (without returning HTTP response)
-    """
-    assessments_path = Path(__file__).parent.parent / 'web-output' / 'assessments.json'
-    
-    # Get years that exist in output.xlsx
-    xlsx_years = set()
-    df = storage_service.read_excel('web-output/output.xlsx')
-    if df is not None:
-        xlsx_years = set(df['Tahun'].unique())
-    
-    # Clean up assessments.json
-    orphaned_count = 0
-    if assessments_path.exists():
-        with open(assessments_path, 'r') as f:
-            assessments_data = json.load(f)
-        
-        # Filter out orphaned entries
-        cleaned_assessments = []
-        for assessment in assessments_data.get('assessments', []):
-            year = assessment.get('year')
-            if year in xlsx_years:
-                cleaned_assessments.append(assessment)
-            else:
-                orphaned_count += 1
-        
-        # Save cleaned data if any changes were made
-        if orphaned_count > 0:
-            assessments_data['assessments'] = cleaned_assessments
-            with open(assessments_path, 'w') as f:
-                json.dump(assessments_data, f, indent=2)
-            safe_print(f"🔄 Auto-cleaned {orphaned_count} orphaned entries")
-    
-    return orphaned_count
-
 @app.route('/api/indicator-data', methods=['GET'])
+@etag_versioned(ASSESSMENTS)
 def get_indicator_data():
     """
     Get pure indicator data for detailed bottom table
     """
     try:
-        # Auto-cleanup orphaned data before proceeding
-        try:
-            _cleanup_orphaned_data_internal()
-        except Exception as cleanup_error:
-            safe_print(f"WARNING: Auto-cleanup failed: {cleanup_error}")
+        # Orphaned assessments.json entries are pruned by the background orphan_cleanup task
+        # Indicator rows precomputed per year on save
+        year_records = assessment_store.read_views('indicator')
         
-        # Read XLSX data
-        df = storage_service.read_excel('web-output/output.xlsx')
-        
-        if df is None:
+        if not year_records:
             return jsonify({
                 'success': False,
                 'data': [],
                 'message': 'No data available'
             })
         
-        # Filter only indicator rows
-        indicator_rows = df[df['Type'] == 'indicator']
-        
-        # Convert to frontend format
-        indicators = []
-        for _, row in indicator_rows.iterrows():
-            indicators.append({
-                'id': str(row.get('No', '')),
-                'aspek': str(row.get('Section', '')),
-                'deskripsi': str(row.get('Deskripsi', '')),
-                'jumlah_parameter': int(row.get('Jumlah_Parameter', 0)) if pd.notna(row.get('Jumlah_Parameter')) else 0,
-                'bobot': float(row.get('Bobot', 0)) if pd.notna(row.get('Bobot')) else 0,
-                'skor': float(row.get('Skor', 0)) if pd.notna(row.get('Skor')) else 0,
-                'capaian': float(row.get('Capaian', 0)) if pd.notna(row.get('Capaian')) else 0,
-                'penjelasan': str(row.get('Penjelasan', 'Tidak Baik')),
-                'tahun': int(row.get('Tahun', 0)) if pd.notna(row.get('Tahun')) else 0
-            })
+        indicators = [record for records in year_records for record in records]
         
         return jsonify({
             'success': True,
@@ -1296,71 +1307,34 @@ def get_indicator_data():
         }), 500
 
 @app.route('/api/gcg-chart-data', methods=['GET'])
+@etag_versioned(ASSESSMENTS)
 def get_gcg_chart_data():
     """
     Get assessment data formatted for GCGChart component (graphics-2 format)
     Returns data with Level hierarchy as expected by processGCGData function
     """
     try:
-        # Read XLSX data
-        df = storage_service.read_excel('web-output/output.xlsx')
+        # Chart rows precomputed per year on save
+        year_records = assessment_store.read_views('chart')
         
-        if df is None:
-            safe_print(f"WARNING: output.xlsx not found or empty")
+        if not year_records:
+            safe_print(f"WARNING: No assessment results stored")
             return jsonify({
                 'success': True,
                 'data': [],
                 'message': 'No chart data available. Please save some assessments first.'
             })
         
-        safe_print(f"INFO: GCG Chart Data: Loading {len(df)} rows from output.xlsx")
-        
-        # Convert to graphics-2 GCGData format
-        gcg_data = []
-        for _, row in df.iterrows():
-            # Determine level based on row type
-            level = 3  # Default to section level
-            row_type = str(row.get('Type', '')).lower()
-            
-            if row_type == 'total':
-                level = 4
-            elif row_type == 'header':
-                level = 1
-            elif row_type == 'indicator':
-                level = 2
-            elif row_type == 'subtotal':
-                level = 3
-            
-            # Handle NaN values
-            tahun = int(row.get('Tahun', 2022))
-            skor = float(row.get('Skor', 0)) if not pd.isna(row.get('Skor', 0)) else 0
-            capaian = float(row.get('Capaian', 0)) if not pd.isna(row.get('Capaian', 0)) else 0
-            bobot = float(row.get('Bobot', 0)) if not pd.isna(row.get('Bobot', 0)) else None
-            jumlah_param = float(row.get('Jumlah_Parameter', 0)) if not pd.isna(row.get('Jumlah_Parameter', 0)) else None
-            
-            gcg_item = {
-                'Tahun': tahun,
-                'Skor': skor,
-                'Level': level,
-                'Section': str(row.get('Section', '')),
-                'Capaian': capaian,
-                'Bobot': bobot,
-                'Jumlah_Parameter': jumlah_param,
-                'Penjelasan': str(row.get('Penjelasan', '')),
-                'Penilai': str(row.get('Penilai', 'Unknown')),
-                'No': str(row.get('No', '')),
-                'Deskripsi': str(row.get('Deskripsi', '')),
-                'Jenis_Penilaian': str(row.get('Jenis_Penilaian', 'Data Kosong'))
-            }
-            gcg_data.append(gcg_item)
+        total_rows = sum(len(records) for records in year_records)
+        safe_print(f"INFO: GCG Chart Data: Streaming {total_rows} precomputed rows")
         
-        return jsonify({
+        # Rows are encoded one at a time straight from the per-year views
+        return stream_json({
             'success': True,
-            'data': gcg_data,
-            'total_rows': len(gcg_data),
-            'available_years': list(set([item['Tahun'] for item in gcg_data])),
-            'message': f'Loaded GCG chart data: {len(gcg_data)} rows'
-        })
+            'total_rows': total_rows,
+            'available_years': list(set([item['Tahun'] for records in year_records for item in records])),
+            'message': f'Loaded GCG chart data: {total_rows} rows'
+        }, 'data', (record for records in year_records for record in records))
         
     except Exception as e:
         safe_print(f"ERROR: Error loading GCG chart data: {str(e)}")
@@ -1371,6 +1345,27 @@ def get_gcg_chart_data():
         }), 500
 
 
+@app.route('/api/gcg-rollups', methods=['GET'])
+@etag_versioned(ASSESSMENTS)
+def get_gcg_rollups():
+    """
+    Get per-year totals, per-aspek capaian per year with year-over-year deltas,
+    and min/max/mean across years, aggregated server-side from performa_gcg
+    """
+    try:
+        rollups = assessment_store.rollups()
+        safe_print(f"INFO: GCG Rollups: {len(rollups['years'])} years, {len(rollups['aspek'])} aspek rows")
+        
+        return jsonify(dict(rollups, success=True))
+        
+    except Exception as e:
+        safe_print(f"ERROR: Error computing GCG rollups: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
 @app.route('/api/gcg-mapping', methods=['GET'])
 def get_gcg_mapping():
     """
@@ -1426,55 +1421,19 @@ def get_gcg_mapping():
 @app.route('/api/cleanup-orphaned-data', methods=['POST'])
 def cleanup_orphaned_data():
     """
-    Clean up orphaned entries in assessments.json that don't exist in output.xlsx
+    Clean up orphaned entries in assessments.json that have no saved results
     """
     try:
-        assessments_path = Path(__file__).parent.parent / 'web-output' / 'assessments.json'
-        
-        # Get years that exist in output.xlsx
-        xlsx_years = set()
-        df = storage_service.read_excel('web-output/output.xlsx')
-        if df is not None:
-            xlsx_years = set(df['Tahun'].unique())
-            safe_print(f"INFO: Found years in output.xlsx: {sorted(xlsx_years)}")
-        else:
-            safe_print("WARNING: output.xlsx not found - will clean all assessments.json entries")
-        
-        # Clean up assessments.json
-        orphaned_count = 0
-        if assessments_path.exists():
-            with open(assessments_path, 'r') as f:
-                assessments_data = json.load(f)
-            
-            original_count = len(assessments_data.get('assessments', []))
-            
-            # Filter out orphaned entries (keep only years that exist in xlsx or if xlsx doesn't exist, keep none)
-            cleaned_assessments = []
-            for assessment in assessments_data.get('assessments', []):
-                year = assessment.get('year')
-                if year in xlsx_years:
-                    cleaned_assessments.append(assessment)
-                else:
-                    orphaned_count += 1
-                    safe_print(f"CLEANUP: Removing orphaned assessment for year {year}")
-            
-            # Save cleaned data
-            assessments_data['assessments'] = cleaned_assessments
-            with open(assessments_path, 'w') as f:
-                json.dump(assessments_data, f, indent=2)
-                
-            safe_print(f"SUCCESS: Cleaned up {orphaned_count} orphaned entries from assessments.json")
-            safe_print(f"INFO: Kept {len(cleaned_assessments)} valid entries")
-        else:
-            safe_print("WARNING: assessments.json not found - nothing to clean")
+        result = orphan_cleanup.run('manual')
+        safe_print(f"SUCCESS: Cleaned up {result['removed_count']} orphaned entries from assessments.json")
         
         return jsonify({
             'success': True,
-            'message': f'Successfully cleaned up {orphaned_count} orphaned entries',
-            'orphaned_count': orphaned_count,
-            'xlsx_years': sorted(list(xlsx_years)),
-            'xlsx_exists': storage_service.file_exists('web-output/output.xlsx'),
-            'assessments_exists': assessments_path.exists()
+            'message': f"Successfully cleaned up {result['removed_count']} orphaned entries",
+            'orphaned_count': result['removed_count'],
+            'xlsx_years': [int(key) if key.isdigit() else key for key in result['saved_years']],
+            'xlsx_exists': len(result['saved_years']) > 0,
+            'assessments_exists': ASSESSMENTS_JSON_PATH.exists()
         })
         
     except Exception as e:
@@ -1530,15 +1489,6 @@ def create_uploaded_file():
             if field not in data:
                 return jsonify({'error': f'Missing required field: {field}'}), 400
         
-        # Read existing files data
-        try:
-            files_data = storage_service.read_excel('uploaded-files.xlsx')
-            if files_data is None:
-                # Create new DataFrame if no data exists
-                files_data = pd.DataFrame()
-        except:
-            files_data = pd.DataFrame()
-        
         # Generate unique ID
         new_id = str(uuid.uuid4())
         
@@ -1563,12 +1513,15 @@ def create_uploaded_file():
             'userEmail': data.get('userEmail', '')
         }
         
-        # Add to DataFrame
-        new_row = pd.DataFrame([new_file])
-        files_data = pd.concat([files_data, new_row], ignore_index=True)
+        def append_record(files_data):
+            new_row = pd.DataFrame([new_file])
+            if files_data is None:
+                # Create the table if no data exists yet
+                return new_row
+            return pd.concat([files_data, new_row], ignore_index=True)
         
-        # Save to storage
-        success = storage_service.write_excel(files_data, 'uploaded-files.xlsx')
+        # Append under the table's lock so concurrent uploads don't drop each other's rows
+        success = storage_service.update_excel('uploaded-files.xlsx', append_record)
         
         if success:
             return jsonify({'success': True, 'file': new_file}), 201
@@ -1583,49 +1536,50 @@ def create_uploaded_file():
 def fix_uploaded_files_schema():
     """Add missing user information columns to uploaded-files.xlsx"""
     try:
-        # Read existing files data
-        files_data = storage_service.read_excel('uploaded-files.xlsx')
-        
-        if files_data is None:
-            return jsonify({'error': 'No files data found'}), 404
-        
-        # Check if user columns already exist
-        missing_columns = []
         required_user_columns = ['uploadedBy', 'userRole', 'userDirektorat', 'userSubdirektorat', 'userDivisi', 'userWhatsApp', 'userEmail']
+        missing_columns = []
+        state = {'found': False, 'total': 0}
+
+        def add_missing_columns(files_data):
+            if files_data is None:
+                return None
+            state['found'] = True
+            state['total'] = len(files_data)
+            # Check if user columns already exist
+            missing_columns[:] = [col for col in required_user_columns if col not in files_data.columns]
+            if not missing_columns:
+                return None
+            
+            # Add missing columns with default values
+            for col in missing_columns:
+                if col == 'uploadedBy':
+                    files_data[col] = 'Unknown User'
+                elif col == 'userRole':
+                    files_data[col] = 'user'  # Default role
+                elif col in ['userWhatsApp', 'userEmail']:
+                    files_data[col] = ''  # Empty string for contact fields
+                else:
+                    files_data[col] = 'Unknown'
+            safe_print(f"📝 Adding missing user columns: {missing_columns}")
+            return files_data
         
-        for col in required_user_columns:
-            if col not in files_data.columns:
-                missing_columns.append(col)
+        # Save updated data
+        success = storage_service.update_excel('uploaded-files.xlsx', add_missing_columns)
         
+        if not state['found']:
+            return jsonify({'error': 'No files data found'}), 404
         if not missing_columns:
             return jsonify({
                 'success': True,
                 'message': 'All user columns already exist',
                 'columns': required_user_columns
             }), 200
-        
-        # Add missing columns with default values
-        for col in missing_columns:
-            if col == 'uploadedBy':
-                files_data[col] = 'Unknown User'
-            elif col == 'userRole':
-                files_data[col] = 'user'  # Default role
-            elif col in ['userWhatsApp', 'userEmail']:
-                files_data[col] = ''  # Empty string for contact fields
-            else:
-                files_data[col] = 'Unknown'
-        
-        safe_print(f"📝 Adding missing user columns: {missing_columns}")
-        
-        # Save updated data
-        success = storage_service.write_excel(files_data, 'uploaded-files.xlsx')
-        
         if success:
             return jsonify({
                 'success': True,
                 'message': f'Added missing user columns: {missing_columns}',
                 'addedColumns': missing_columns,
-                'totalRecords': len(files_data)
+                'totalRecords': state['total']
             }), 200
         else:
             return jsonify({'error': 'Failed to save changes to storage'}), 500
@@ -1743,7 +1697,9 @@ def delete_uploaded_file(file_id):
             return jsonify({'error': f'Failed to delete from database: {str(db_error)}'}), 500
 
         # Also remove from Excel file for backward compatibility
-        try:
+        def remove_record(files_data):
+            if files_data is None:
+                return None
             initial_count = len(files_data)
             files_data = files_data[files_data['id'] != file_id]
 
@@ -1754,8 +1710,11 @@ def delete_uploaded_file(file_id):
                     files_data = files_data[files_data['checklistId'] != checklist_id]
                 except ValueError:
                     pass
+            return files_data
 
-            storage_service.write_excel(files_data, 'uploaded-files.xlsx')
+        try:
+            # Filter the current table under its lock, not the copy read above
+            storage_service.update_excel('uploaded-files.xlsx', remove_record)
             safe_print(f"🔧 DEBUG: Also removed from Excel for backward compatibility")
         except Exception as excel_error:
             # Non-critical - Excel is just backup
@@ -1847,20 +1806,11 @@ def download_uploaded_file(file_id):
 def view_file(file_id):
     """Get a public view URL for a processed file."""
     try:
-        # Find the processed file in OUTPUT_FOLDER
-        file_path = None
-        filename = None
-        
-        for output_file in OUTPUT_FOLDER.glob("processed_*.xlsx"):
-            # Extract file ID from filename
-            filename_parts = output_file.name.split('_', 2)
-            if len(filename_parts) >= 2 and filename_parts[1] == file_id:
-                file_path = output_file
-                filename = output_file.name
-                break
-        
-        if not file_path or not file_path.exists():
+        # Find the processed file in the output index
+        output = output_index.get(file_id)
+        if output is None:
             return jsonify({'success': False, 'error': 'File not found'}), 404
+        filename = output['filename']
         
         # For processed files, return a download URL since we can't "view" Excel files in browser
         return jsonify({
@@ -1918,23 +1868,14 @@ def download_file_by_id(file_id):
         except Exception as e:
             safe_print(f"⚠️ Error checking uploaded-files.xlsx: {e}")
 
-        # Fallback: try to find processed file in OUTPUT_FOLDER
-        file_path = None
-        filename = None
-
-        for output_file in OUTPUT_FOLDER.glob("processed_*.xlsx"):
-            # Extract file ID from filename
-            filename_parts = output_file.name.split('_', 2)
-            if len(filename_parts) >= 2 and filename_parts[1] == file_id:
-                file_path = output_file
-                filename = output_file.name
-                break
-
-        if file_path and file_path.exists():
+        # Fallback: try to find processed file in the output index
+        output = output_index.get(file_id)
+        if output is not None:
+            filename = output['filename']
             safe_print(f"✅ Found processed file: {filename}")
             # Send the file for download
             return send_file(
-                str(file_path),
+                str(output['path']),
                 as_attachment=True,
                 download_name=filename,
                 mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
@@ -2039,40 +1980,8 @@ def create_aoi_table():
             'status': data.get('status', 'active')
         }
         
-        # Read existing AOI tables
-        existing_data = storage_service.read_csv('config/aoi-tables.csv')
-        if existing_data is not None:
-            aoi_df = existing_data
-            # Ensure proper data types for string columns
-            string_columns = ['nama', 'targetType', 'targetDirektorat', 'targetSubdirektorat', 'targetDivisi', 'status']
-            for col in string_columns:
-                if col in aoi_df.columns:
-                    aoi_df[col] = aoi_df[col].astype(str).replace('nan', '')
-            # Integer columns
-            if 'tahun' in aoi_df.columns:
-                aoi_df['tahun'] = pd.to_numeric(aoi_df['tahun'], errors='coerce').astype('Int64')
-            if 'id' in aoi_df.columns:
-                aoi_df['id'] = pd.to_numeric(aoi_df['id'], errors='coerce').astype('Int64')
-        else:
-            aoi_df = pd.DataFrame()
-
-        # Add new AOI table
-        new_aoi_df = pd.DataFrame([aoi_table_data])
-        updated_df = pd.concat([aoi_df, new_aoi_df], ignore_index=True)
-
-        # Ensure all columns have proper dtype
-        string_columns = ['nama', 'targetType', 'targetDirektorat', 'targetSubdirektorat', 'targetDivisi', 'status']
-        for col in string_columns:
-            if col in updated_df.columns:
-                updated_df[col] = updated_df[col].astype(str).replace('nan', '')
-        # Integer columns
-        if 'tahun' in updated_df.columns:
-            updated_df['tahun'] = pd.to_numeric(updated_df['tahun'], errors='coerce').astype('Int64')
-        if 'id' in updated_df.columns:
-            updated_df['id'] = pd.to_numeric(updated_df['id'], errors='coerce').astype('Int64')
-        
-        # Save to storage
-        success = storage_service.write_csv(updated_df, 'config/aoi-tables.csv')
+        # Append to the AOI tables journal (no full-table rewrite)
+        success = storage_service.append_csv_rows('config/aoi-tables.csv', [aoi_table_data])
         
         if success:
             return jsonify(aoi_table_data), 201
@@ -2247,12 +2156,8 @@ def create_aoi_recommendation():
             'status': data.get('status', 'active')
         }
         
-        # Add new AOI recommendation
-        new_recommendation_df = pd.DataFrame([aoi_recommendation_data])
-        updated_df = pd.concat([recommendations_df, new_recommendation_df], ignore_index=True)
-        
-        # Save to storage
-        success = storage_service.write_csv(updated_df, 'config/aoi-recommendations.csv')
+        # Append to the AOI recommendations journal (no full-table rewrite)
+        success = storage_service.append_csv_rows('config/aoi-recommendations.csv', [aoi_recommendation_data])
         
         if success:
             return jsonify(aoi_recommendation_data), 201
@@ -2579,25 +2484,17 @@ def upload_aoi_file():
         except Exception as e:
             safe_print(f"Error clearing directory: {e}")
 
-        # Upload file to local storage
-        file_content = file.read()
-        local_file_path = Path(__file__).parent.parent / 'data' / file_path
-
-        # Create directory structure
-        local_file_path.parent.mkdir(parents=True, exist_ok=True)
+        # Stream the upload to local storage in chunks (never held in memory)
+        saved = storage_service.save_stream(file.stream, file_path)
 
-        # Save file
-        with open(local_file_path, 'wb') as f:
-            f.write(file_content)
-
-        safe_print(f"🔧 DEBUG: File uploaded successfully to: {file_path}")
+        safe_print(f"🔧 DEBUG: File uploaded successfully to: {file_path} ({saved['size']} bytes, sha256 {saved['sha256']})")
         
         # Create AOI document record
         document_id = f"aoi_{generate_unique_id()}"
         aoi_document_data = {
             'id': document_id,
             'fileName': filename,
-            'fileSize': len(file_content),
+            'fileSize': saved['size'],
             'uploadDate': datetime.now().isoformat(),
             'aoiRecommendationId': recommendation_id_int,
             'aoiJenis': aoi_jenis,
@@ -2612,21 +2509,11 @@ def upload_aoi_file():
             'filePath': file_path
         }
         
-        # Read existing AOI documents
-        existing_data = storage_service.read_csv('config/aoi-documents.csv')
-        if existing_data is not None:
-            # Remove existing documents for the same recommendation
-            existing_data = existing_data[existing_data['aoiRecommendationId'] != recommendation_id_int]
-            documents_df = existing_data
-        else:
-            documents_df = pd.DataFrame()
-        
-        # Add new AOI document
-        new_document_df = pd.DataFrame([aoi_document_data])
-        updated_df = pd.concat([documents_df, new_document_df], ignore_index=True)
-        
-        # Save to storage
-        success = storage_service.write_csv(updated_df, 'config/aoi-documents.csv')
+        # Replace existing documents for the same recommendation via the journal
+        success = storage_service.apply_csv_changes('config/aoi-documents.csv', [
+            {'op': 'delete', 'match': {'aoiRecommendationId': recommendation_id_int}},
+            {'op': 'insert', 'rows': [aoi_document_data]}
+        ])
         
         if success:
             safe_print(f"🔧 DEBUG: AOI document record saved successfully")
@@ -2914,12 +2801,8 @@ def create_user():
             'whatsapp': data.get('whatsapp', '')
         }
 
-        # Add to DataFrame
-        new_row = pd.DataFrame([new_user])
-        csv_data = pd.concat([csv_data, new_row], ignore_index=True)
-
-        # Save to CSV
-        success = storage_service.write_csv(csv_data, 'config/users.csv')
+        # Append to the users journal (no full-table rewrite)
+        success = storage_service.append_csv_rows('config/users.csv', [new_user])
 
         if success:
             safe_print(f"✅ Created user in CSV: {new_user['email']} (ID: {user_id}, Year: {year or 'N/A'})")
@@ -2943,20 +2826,27 @@ def delete_user(user_id):
     from database import get_db_connection
     try:
         # 1. Delete from CSV file (primary storage)
-        csv_data = storage_service.read_csv('config/users.csv')
-        if csv_data is None or csv_data.empty:
-            return jsonify({'error': 'No users data found'}), 404
-
-        # Find user in CSV
-        user_exists = csv_data[csv_data['id'] == user_id]
-        if user_exists.empty:
-            return jsonify({'error': 'User not found'}), 404
-
-        user_email = user_exists.iloc[0]['email']
-
-        # Remove user from CSV
-        csv_data = csv_data[csv_data['id'] != user_id]
-        storage_service.write_csv(csv_data, 'config/users.csv')
+        state = {}
+
+        def remove_user(csv_data):
+            if csv_data is None or csv_data.empty:
+                state['error'] = 'No users data found'
+                return None
+
+            # Find user in CSV
+            user_exists = csv_data[csv_data['id'] == user_id]
+            if user_exists.empty:
+                state['error'] = 'User not found'
+                return None
+
+            state['email'] = user_exists.iloc[0]['email']
+            # Remove user from CSV
+            return csv_data[csv_data['id'] != user_id]
+
+        storage_service.update_csv('config/users.csv', remove_user)
+        if 'error' in state:
+            return jsonify({'error': state['error']}), 404
+        user_email = state['email']
         safe_print(f"✅ Deleted user from CSV: {user_email} (ID: {user_id})")
 
         # 2. Also delete from SQLite database if exists
@@ -2986,50 +2876,59 @@ def update_user(user_id):
         data = request.get_json()
 
         # 1. Update CSV file (primary storage)
-        csv_data = storage_service.read_csv('config/users.csv')
-        if csv_data is None or csv_data.empty:
-            return jsonify({'error': 'No users data found'}), 404
-
-        # Find user in CSV
-        user_mask = csv_data['id'] == user_id
-        if not user_mask.any():
-            return jsonify({'error': 'User not found'}), 404
-
-        user_index = csv_data[user_mask].index[0]
-
-        # Update fields in CSV
-        if 'name' in data:
-            csv_data.at[user_index, 'name'] = data['name']
-        if 'email' in data:
-            csv_data.at[user_index, 'email'] = data['email']
         if 'password' in data:
-            # Hash password for CSV storage
+            # Hash password for CSV storage (before taking the table lock; bcrypt is slow)
             try:
                 import bcrypt
-                password_hash = bcrypt.hashpw(data['password'].encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
-                csv_data.at[user_index, 'password'] = password_hash
+                csv_password = bcrypt.hashpw(data['password'].encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
             except:
-                csv_data.at[user_index, 'password'] = data['password']
-        if 'role' in data:
-            csv_data.at[user_index, 'role'] = data['role']
-        if 'direktorat' in data:
-            csv_data.at[user_index, 'direktorat'] = data['direktorat']
-        if 'subdirektorat' in data:
-            csv_data.at[user_index, 'subdirektorat'] = data['subdirektorat']
-        if 'divisi' in data:
-            csv_data.at[user_index, 'divisi'] = data['divisi']
-        if 'tahun' in data or 'year' in data:
-            csv_data.at[user_index, 'tahun'] = data.get('tahun') or data.get('year', '')
-        if 'whatsapp' in data:
-            csv_data.at[user_index, 'whatsapp'] = data['whatsapp']
-        if 'telegram' in data:
-            csv_data.at[user_index, 'telegram'] = data['telegram']
-
-        # Save updated CSV
-        storage_service.write_csv(csv_data, 'config/users.csv')
+                csv_password = data['password']
+        state = {}
+
+        def apply_changes(csv_data):
+            if csv_data is None or csv_data.empty:
+                state['error'] = 'No users data found'
+                return None
+
+            # Find user in CSV
+            user_mask = csv_data['id'] == user_id
+            if not user_mask.any():
+                state['error'] = 'User not found'
+                return None
+
+            user_index = csv_data[user_mask].index[0]
+
+            # Update fields in CSV
+            if 'name' in data:
+                csv_data.at[user_index, 'name'] = data['name']
+            if 'email' in data:
+                csv_data.at[user_index, 'email'] = data['email']
+            if 'password' in data:
+                csv_data.at[user_index, 'password'] = csv_password
+            if 'role' in data:
+                csv_data.at[user_index, 'role'] = data['role']
+            if 'direktorat' in data:
+                csv_data.at[user_index, 'direktorat'] = data['direktorat']
+            if 'subdirektorat' in data:
+                csv_data.at[user_index, 'subdirektorat'] = data['subdirektorat']
+            if 'divisi' in data:
+                csv_data.at[user_index, 'divisi'] = data['divisi']
+            if 'tahun' in data or 'year' in data:
+                csv_data.at[user_index, 'tahun'] = data.get('tahun') or data.get('year', '')
+            if 'whatsapp' in data:
+                csv_data.at[user_index, 'whatsapp'] = data['whatsapp']
+            if 'telegram' in data:
+                csv_data.at[user_index, 'telegram'] = data['telegram']
+            state['row'] = csv_data.loc[user_index]
+            return csv_data
+
+        # Save updated CSV under the table's lock so concurrent edits aren't lost
+        storage_service.update_csv('config/users.csv', apply_changes)
+        if 'error' in state:
+            return jsonify({'error': state['error']}), 404
 
         # Get updated user data from CSV
-        updated_user_row = csv_data.iloc[user_index]
+        updated_user_row = state['row']
         updated_user = {
             'id': int(updated_user_row['id']),
             'name': updated_user_row.get('name', ''),
@@ -3158,9 +3057,6 @@ def upload_gcg_file():
         # Fixed file structure: gcg-documents/{year}/{PIC}/{checklist_id}/{filename}
         file_path = f"gcg-documents/{year_int}/{pic_name}/{checklist_id_int}/{secure_filename(file.filename)}"
         
-        # Upload file to storage
-        file_data = file.read()
-        
         # Determine content type
         file_extension = file.filename.rsplit('.', 1)[1].lower() if '.' in file.filename else 'bin'
         content_type_map = {
@@ -3200,14 +3096,11 @@ def upload_gcg_file():
             except Exception as e:
                 safe_print(f"🔧 DEBUG: Error clearing directory (continuing anyway): {e}")
 
-            # Create directory structure if it doesn't exist
-            local_file_path.parent.mkdir(parents=True, exist_ok=True)
-
-            # Save the file to local storage
-            with open(local_file_path, 'wb') as f:
-                f.write(file_data)
+            # Stream the file to local storage in chunks (never held in memory)
+            saved = storage_service.save_stream(file.stream, file_path)
 
-            safe_print(f"🔧 DEBUG: File saved successfully to local storage: {local_file_path}")
+            safe_print(f"🔧 DEBUG: File saved successfully to local storage: {local_file_path} "
+                       f"({saved['size']} bytes, sha256 {saved['sha256']})")
 
         except Exception as upload_error:
             safe_print(f"🔧 DEBUG: Local upload exception: {upload_error}")
@@ -3226,7 +3119,7 @@ def upload_gcg_file():
         file_record = {
             'id': file_id,
             'fileName': file.filename,
-            'fileSize': len(file_data),
+            'fileSize': saved['size'],
             'uploadDate': datetime.now().isoformat(),
             'year': year_int,
             'checklistId': int(float(checklist_id)) if checklist_id else None,
@@ -3269,7 +3162,7 @@ def upload_gcg_file():
                 """, (
                     file_id,
                     file.filename,
-                    len(file_data),
+                    saved['size'],
                     datetime.now().isoformat(),
                     year_int,
                     checklist_id_int,
@@ -3289,8 +3182,7 @@ def upload_gcg_file():
             return jsonify({'error': f'File uploaded but failed to save database record: {str(db_error)}'}), 500
 
         # Also save to Excel file for backward compatibility (legacy support)
-        try:
-            files_data = storage_service.read_excel('uploaded-files.xlsx')
+        def replace_record(files_data):
             if files_data is None:
                 files_data = pd.DataFrame()
 
@@ -3299,8 +3191,10 @@ def upload_gcg_file():
                 files_data = files_data[~((files_data['checklistId'] == checklist_id_int) & (files_data['year'] == year_int))]
 
             new_row = pd.DataFrame([file_record])
-            files_data = pd.concat([files_data, new_row], ignore_index=True)
-            storage_service.write_excel(files_data, 'uploaded-files.xlsx')
+            return pd.concat([files_data, new_row], ignore_index=True)
+
+        try:
+            storage_service.update_excel('uploaded-files.xlsx', replace_record)
             safe_print(f"🔧 DEBUG: Also saved to Excel for backward compatibility")
         except Exception as excel_error:
             # Non-critical - Excel is just backup
@@ -3396,21 +3290,15 @@ def upload_random_document():
                 unique_filename = f"{safe_filename_str}_{timestamp}"
             file_path = f"gcg-documents/{year_int}/Dokumen_Lainnya/{unique_filename}"
 
-        # Upload file to local storage
-        file_data = file.read()
-
+        # Stream the upload to local storage in chunks (never held in memory)
         try:
             local_file_path = Path(__file__).parent.parent / 'data' / file_path
             safe_print(f"📤 DEBUG: Saving to: {local_file_path}")
 
-            # Create directory structure
-            local_file_path.parent.mkdir(parents=True, exist_ok=True)
-
-            # Save the file
-            with open(local_file_path, 'wb') as f:
-                f.write(file_data)
+            saved = storage_service.save_stream(file.stream, file_path)
 
-            safe_print(f"✅ DEBUG: File saved successfully: {local_file_path}")
+            safe_print(f"✅ DEBUG: File saved successfully: {local_file_path} "
+                       f"({saved['size']} bytes, sha256 {saved['sha256']})")
 
         except Exception as upload_error:
             safe_print(f"❌ DEBUG: Upload error: {upload_error}")
@@ -3420,7 +3308,7 @@ def upload_random_document():
         file_record = {
             'id': file_id,
             'fileName': file.filename,
-            'fileSize': len(file_data),
+            'fileSize': saved['size'],
             'uploadDate': datetime.now().isoformat(),
             'year': year_int,
             'checklistId': None,  # No checklist association
@@ -3435,19 +3323,15 @@ def upload_random_document():
         }
 
         # Add to uploaded files database
-        try:
-            files_data = storage_service.read_excel('uploaded-files.xlsx')
+        def append_record(files_data):
+            new_row = pd.DataFrame([file_record])
             if files_data is None:
-                files_data = pd.DataFrame()
-        except Exception:
-            files_data = pd.DataFrame()
-
-        new_row = pd.DataFrame([file_record])
-        files_data = pd.concat([files_data, new_row], ignore_index=True)
+                return new_row
+            return pd.concat([files_data, new_row], ignore_index=True)
 
         # Save to storage
         try:
-            success = storage_service.write_excel(files_data, 'uploaded-files.xlsx')
+            success = storage_service.update_excel('uploaded-files.xlsx', append_record)
 
             if success:
                 return jsonify({
@@ -3896,6 +3780,7 @@ def delete_aspect(aspect_id):
 
 # CHECKLIST ENDPOINTS
 @app.route('/api/config/checklist', methods=['GET'])
+@etag_versioned(CHECKLIST)
 def get_checklist():
     """Get all checklist items with PIC assignments, optionally filtered by year"""
     from database import get_db_connection
@@ -3967,6 +3852,7 @@ def get_checklist():
         return jsonify({'checklist': []}), 200
 
 @app.route('/api/config/checklist', methods=['POST'])
+@bumps_versions(CHECKLIST)
 def add_checklist():
     """Add a new checklist item to SQLite database"""
     from database import get_db_connection
@@ -4019,6 +3905,7 @@ def add_checklist():
         return jsonify({'error': f'Failed to add checklist: {str(e)}'}), 500
 
 @app.route('/api/config/checklist/<int:checklist_id>', methods=['PUT'])
+@bumps_versions(CHECKLIST)
 def update_checklist(checklist_id):
     """Update an existing checklist item in SQLite and transfer files if PIC changes"""
     from database import get_db_connection
@@ -4103,31 +3990,34 @@ def update_checklist(checklist_id):
                         files_transferred = True
 
                         # Update uploaded-files.xlsx tracking file with new paths
+                        def move_records(files_data):
+                            if files_data is None or files_data.empty:
+                                return None
+                            # Find records for this checklist ID and year
+                            mask = (files_data['checklistId'] == checklist_id) & (files_data['year'] == old_tahun)
+                            if not mask.any():
+                                return None
+                            # Update the PIC name and file paths for matching records
+                            for idx in files_data[mask].index:
+                                old_path = files_data.loc[idx, 'localFilePath']
+                                # Replace old PIC with new PIC in the path
+                                new_path = old_path.replace(f"/{old_pic_clean}/", f"/{new_pic_clean}/")
+                                # Also update year if it changed
+                                if year_changed:
+                                    new_path = new_path.replace(f"gcg-documents/{old_tahun}/", f"gcg-documents/{new_tahun}/")
+
+                                files_data.loc[idx, 'localFilePath'] = new_path
+                                files_data.loc[idx, 'subdirektorat'] = new_pic
+                                if year_changed:
+                                    files_data.loc[idx, 'year'] = new_tahun
+
+                                safe_print(f"📝 Updated file path: {old_path} → {new_path}")
+                            return files_data
+
                         try:
-                            files_data = storage_service.read_excel('uploaded-files.xlsx')
-                            if files_data is not None and not files_data.empty:
-                                # Find records for this checklist ID and year
-                                mask = (files_data['checklistId'] == checklist_id) & (files_data['year'] == old_tahun)
-                                if mask.any():
-                                    # Update the PIC name and file paths for matching records
-                                    for idx in files_data[mask].index:
-                                        old_path = files_data.loc[idx, 'localFilePath']
-                                        # Replace old PIC with new PIC in the path
-                                        new_path = old_path.replace(f"/{old_pic_clean}/", f"/{new_pic_clean}/")
-                                        # Also update year if it changed
-                                        if year_changed:
-                                            new_path = new_path.replace(f"gcg-documents/{old_tahun}/", f"gcg-documents/{new_tahun}/")
-
-                                        files_data.loc[idx, 'localFilePath'] = new_path
-                                        files_data.loc[idx, 'subdirektorat'] = new_pic
-                                        if year_changed:
-                                            files_data.loc[idx, 'year'] = new_tahun
-
-                                        safe_print(f"📝 Updated file path: {old_path} → {new_path}")
-
-                                    # Save updated tracking file
-                                    storage_service.write_excel(files_data, 'uploaded-files.xlsx')
-                                    safe_print(f"✅ Updated uploaded-files.xlsx with new paths")
+                            # Save updated tracking file
+                            if storage_service.update_excel('uploaded-files.xlsx', move_records):
+                                safe_print(f"✅ Updated uploaded-files.xlsx with new paths")
                         except Exception as tracking_error:
                             safe_print(f"⚠️ Warning: Failed to update uploaded-files.xlsx: {tracking_error}")
                             # Don't fail the whole operation if tracking update fails
@@ -4229,6 +4119,7 @@ def update_checklist(checklist_id):
         return jsonify({'error': f'Failed to update checklist: {str(e)}'}), 500
 
 @app.route('/api/config/checklist/<int:checklist_id>', methods=['DELETE'])
+@bumps_versions(CHECKLIST)
 def delete_checklist(checklist_id):
     """Delete a checklist item"""
     try:
@@ -4299,6 +4190,7 @@ def check_files_exist(checklist_id):
         return jsonify({'hasFiles': False}), 200
 
 @app.route('/api/config/checklist/clear', methods=['DELETE'])
+@bumps_versions(CHECKLIST)
 def clear_checklist():
     """Clear all checklist data"""
     try:
@@ -4316,6 +4208,7 @@ def clear_checklist():
         return jsonify({'error': f'Failed to clear checklist: {str(e)}'}), 500
 
 @app.route('/api/config/checklist/fix-ids', methods=['POST'])
+@bumps_versions(CHECKLIST)
 def fix_checklist_ids():
     """Temporary endpoint to fix checklist IDs to proper year+row format"""
     try:
@@ -4351,6 +4244,7 @@ def fix_checklist_ids():
         return jsonify({'error': f'Failed to fix checklist IDs: {str(e)}'}), 500
 
 @app.route('/api/config/checklist/batch', methods=['POST'])
+@bumps_versions(CHECKLIST)
 def add_checklist_batch():
     """Add multiple checklist items in batch to both CSV and SQLite database"""
     from database import get_db_connection
@@ -4363,13 +4257,6 @@ def add_checklist_batch():
 
         safe_print(f"📦 Batch adding {len(items)} checklist items")
 
-        # Read existing checklist from CSV
-        existing_data = storage_service.read_csv('config/checklist.csv')
-        if existing_data is not None:
-            checklist_df = existing_data
-        else:
-            checklist_df = pd.DataFrame()
-
         # Process each item in the batch
         batch_data = []
         for item in items:
@@ -4384,10 +4271,8 @@ def add_checklist_batch():
             }
             batch_data.append(checklist_data)
 
-        # 1. Save to CSV file
-        new_batch_df = pd.DataFrame(batch_data)
-        updated_df = pd.concat([checklist_df, new_batch_df], ignore_index=True)
-        csv_success = storage_service.write_csv(updated_df, 'config/checklist.csv')
+        # 1. Append to the checklist CSV journal
+        csv_success = storage_service.append_csv_rows('config/checklist.csv', batch_data)
 
         if not csv_success:
             return jsonify({'error': 'Failed to save checklist batch to CSV'}), 500
@@ -4432,6 +4317,7 @@ def add_checklist_batch():
         return jsonify({'error': f'Failed to add checklist batch: {str(e)}'}), 500
 
 @app.route('/api/config/checklist/migrate-year', methods=['POST'])
+@bumps_versions(CHECKLIST)
 def migrate_checklist_year():
     """Emergency endpoint to migrate checklist data from one year to another"""
     try:
@@ -4654,6 +4540,7 @@ if __name__ == '__main__':
 # The blueprint has proper cleanup logic for year reactivation
 
 @app.route('/api/config/tahun-buku/<int:tahun_id>', methods=['DELETE'])
+@bumps_versions(CHECKLIST, STRUKTUR)
 def delete_tahun_buku(tahun_id):
     """Delete a tahun buku by ID"""
     try:
@@ -4746,12 +4633,15 @@ def delete_tahun_buku(tahun_id):
                     safe_print(f"  ⚠️ AOI recommendations cleanup skipped: {e}")
 
                 # 6. Clean up uploaded files tracking
-                uploaded_files_data = storage_service.read_excel('uploaded-files.xlsx')
-                if uploaded_files_data is not None and not uploaded_files_data.empty:
+                def drop_year_files(uploaded_files_data):
+                    if uploaded_files_data is None or uploaded_files_data.empty:
+                        return None
                     original_count = len(uploaded_files_data)
                     uploaded_files_data = uploaded_files_data[uploaded_files_data['year'] != year_to_delete]
-                    storage_service.write_excel(uploaded_files_data, 'uploaded-files.xlsx')
                     cleanup_stats['uploaded_files'] = original_count - len(uploaded_files_data)
+                    return uploaded_files_data
+
+                if storage_service.update_excel('uploaded-files.xlsx', drop_year_files):
                     safe_print(f"  ✅ Cleaned {cleanup_stats['uploaded_files']} uploaded file records")
 
                 # 7. Clean up checklist assignments
@@ -4767,12 +4657,15 @@ def delete_tahun_buku(tahun_id):
                     safe_print(f"  ⚠️ Assignments cleanup skipped: {e}")
 
                 # 8. Clean up users with year-specific data
-                users_data = storage_service.read_csv('config/users.csv')
-                if users_data is not None and not users_data.empty and 'tahun' in users_data.columns:
+                def drop_year_users(users_data):
+                    if users_data is None or users_data.empty or 'tahun' not in users_data.columns:
+                        return None
                     original_count = len(users_data)
                     users_data = users_data[users_data['tahun'] != year_to_delete]
-                    storage_service.write_csv(users_data, 'config/users.csv')
                     cleanup_stats['users'] = original_count - len(users_data)
+                    return users_data
+
+                if storage_service.update_csv('config/users.csv', drop_year_users):
                     safe_print(f"  ✅ Cleaned {cleanup_stats['users']} year-specific users")
 
                 # 9. Clean up AOI documents tracking
@@ -4857,6 +4750,7 @@ def delete_tahun_buku(tahun_id):
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/config/struktur-organisasi', methods=['GET'])
+@etag_versioned(STRUKTUR)
 def get_struktur_organisasi():
     """Get all struktur organisasi data from SQLite, optionally filtered by year"""
     from database import get_db_connection
@@ -4997,6 +4891,7 @@ def get_struktur_organisasi():
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/config/struktur-organisasi', methods=['POST'])
+@bumps_versions(STRUKTUR)
 def add_struktur_organisasi():
     """Add a new struktur organisasi item to SQLite database"""
     from database import get_db_connection
@@ -5077,6 +4972,7 @@ def add_struktur_organisasi():
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/config/struktur-organisasi/batch', methods=['POST'])
+@bumps_versions(STRUKTUR)
 def add_struktur_organisasi_batch():
     """Add multiple struktur organisasi items in a single transaction with proper ID mapping"""
     from database import get_db_connection
@@ -5213,6 +5109,7 @@ def get_assignments():
         return jsonify({'assignments': []}), 200
 
 @app.route('/api/config/assignments', methods=['POST'])
+@bumps_versions(CHECKLIST)
 def add_assignment():
     """Add or update checklist assignment"""
     try:
@@ -5253,6 +5150,7 @@ def add_assignment():
         return jsonify({'error': f'Failed to add assignment: {str(e)}'}), 500
 
 @app.route('/api/config/assignments/<int:checklist_id>', methods=['DELETE'])
+@bumps_versions(CHECKLIST)
 def delete_assignment(checklist_id):
     """Delete assignment for a checklist item"""
     try:
@@ -5312,10 +5210,9 @@ def delete_row_files(year, pic_name, row_number):
                 'deletedCount': 0
             }), 200
         
-        # Delete all files in the directory
+        # Delete all files in the directory (list_files returns paths relative to data/)
         deleted_count = 0
-        for file_info in files:
-            file_path = f"{path}/{file_info['name']}"
+        for file_path in files:
             success = storage_service.delete_file(file_path)
             if success:
                 deleted_count += 1
@@ -5393,14 +5290,8 @@ def preview_bulk_delete(year):
         
         # Count uploaded files for the year
         try:
-            files = storage_service.list_files(f"gcg-documents/{year}")
-            if files:
-                # Count only actual files, not directories
-                file_count = 0
-                for file_info in files:
-                    if not file_info.get('name', '').endswith('/'):
-                        file_count += 1
-                preview_data['uploaded_files'] = file_count
+            # Answered from the directory index, no tree walk
+            preview_data['uploaded_files'] = storage_service.count_files(f"gcg-documents/{year}")
         except Exception as e:
             safe_print(f"⚠️ Error counting uploaded files: {e}")
         
@@ -5423,6 +5314,7 @@ def preview_bulk_delete(year):
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/bulk-delete/<int:year>', methods=['DELETE'])
+@bumps_versions(CHECKLIST, STRUKTUR)
 def bulk_delete_year_data(year):
     """Delete all data for a specific year"""
     try:
@@ -5477,16 +5369,17 @@ def bulk_delete_year_data(year):
         
         # 3. Delete users for the year
         try:
-            users_data = storage_service.read_csv('config/users.csv')
-            if users_data is not None:
+            def drop_year_users(users_data):
+                if users_data is None:
+                    return None
                 year_users = users_data[users_data['tahun'] == year]
                 deleted_summary['users'] = len(year_users)
                 
                 # Keep only users not from this year
-                remaining_users = users_data[users_data['tahun'] != year]
-                success = storage_service.write_csv(remaining_users, 'config/users.csv')
-                if success:
-                    safe_print(f"✅ Deleted {deleted_summary['users']} users for year {year}")
+                return users_data[users_data['tahun'] != year]
+
+            if storage_service.update_csv('config/users.csv', drop_year_users):
+                safe_print(f"✅ Deleted {deleted_summary['users']} users for year {year}")
         except Exception as e:
             safe_print(f"⚠️ Error deleting users: {e}")
         
@@ -5528,8 +5421,7 @@ def bulk_delete_year_data(year):
             files = storage_service.list_files(f"gcg-documents/{year}")
             if files:
                 file_count = 0
-                for file_info in files:
-                    file_path = f"gcg-documents/{year}/{file_info['name']}"
+                for file_path in files:
                     success = storage_service.delete_file(file_path)
                     if success:
                         file_count += 1
@@ -5776,9 +5668,10 @@ def refresh_tracking_tables():
         try:
             safe_print(f"📄 Checking GCG documents tracking...")
 
-            # Read uploaded-files.xlsx
-            uploaded_files_data = storage_service.read_excel('uploaded-files.xlsx')
-            if uploaded_files_data is not None and not uploaded_files_data.empty:
+            def drop_orphaned_records(uploaded_files_data):
+                nonlocal gcg_cleaned
+                if uploaded_files_data is None or uploaded_files_data.empty:
+                    return None
                 initial_count = len(uploaded_files_data)
 
                 # Filter for the specified year
@@ -5842,11 +5735,12 @@ def refresh_tracking_tables():
 
                     # Save cleaned data
                     if len(updated_df) != initial_count:
-                        success = storage_service.write_excel(updated_df, 'uploaded-files.xlsx')
-                        if success:
-                            safe_print(f"✅ Cleaned {gcg_cleaned} orphaned GCG records")
-                        else:
-                            safe_print(f"❌ Failed to save cleaned GCG data")
+                        return updated_df
+                return None
+
+            # Filter and save under the table's lock so uploads in the meantime are kept
+            if storage_service.update_excel('uploaded-files.xlsx', drop_orphaned_records):
+                safe_print(f"✅ Cleaned {gcg_cleaned} orphaned GCG records")
 
         except Exception as e:
             safe_print(f"❌ Error cleaning GCG tracking: {e}")
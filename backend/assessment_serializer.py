@@ -0,0 +1,153 @@
+"""
+Assessment Serializer - Column-wise conversion of assessment rows to JSON records
+Each field is converted once per column instead of once per cell, then the
+columns are zipped into plain dicts for jsonify.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Marker for number_column: let NaN raise like int(nan) instead of filling it
+NO_FILL = object()
+
+
+def column_values(df: pd.DataFrame, column: str, default=None) -> pd.Series:
+    """A column as an object Series, or the default repeated like row.get(column, default)"""
+    if column in df.columns:
+        return df[column].astype(object)
+    return pd.Series([default] * len(df), index=df.index, dtype=object)
+
+
+def text_column(df: pd.DataFrame, column: str, default='') -> pd.Series:
+    """str() of every value, so NaN becomes 'nan' as with per-row str(row.get(...))"""
+    values = column_values(df, column, default).to_numpy(dtype=object)
+    return pd.Series(values.astype(str).astype(object), index=df.index, dtype=object)
+
+
+def number_column(df: pd.DataFrame, column: str, cast=float, default=0, fill=0) -> pd.Series:
+    """float()/int() of every value with NaN replaced by fill (NO_FILL raises on NaN)"""
+    values = column_values(df, column, default)
+    missing = values.isna().to_numpy()
+    numbers = values.to_numpy(dtype=object)
+    if missing.any():
+        if fill is NO_FILL:
+            raise ValueError(f"cannot convert NaN in column '{column}' to {cast.__name__}")
+        numbers = numbers.copy()
+        numbers[missing] = 0
+
+    numbers = numbers.astype('float64')
+    if cast is int:
+        numbers = np.trunc(numbers).astype('int64')
+    result = np.array(numbers.tolist(), dtype=object)
+    if fill is not NO_FILL:
+        result[missing] = fill
+    return pd.Series(result, index=df.index, dtype=object)
+
+
+def build_records(fields: dict) -> list:
+    """Zip converted columns (key -> Series/list) into a list of row dicts"""
+    keys = list(fields.keys())
+    return [dict(zip(keys, row)) for row in zip(*fields.values())]
+
+
+def dashboard_groups(df: pd.DataFrame) -> list:
+    """Dashboard rows grouped by year: [{'year', 'auditor', 'jenis_asesmen', 'data'}] (NaN numerics become 0.0)"""
+    records = build_records({
+        'id': text_column(df, 'No'),
+        'aspek': text_column(df, 'Section'),
+        'deskripsi': text_column(df, 'Deskripsi'),
+        'jumlah_parameter': number_column(df, 'Jumlah_Parameter', fill=0.0),
+        'bobot': number_column(df, 'Bobot', fill=0.0),
+        'skor': number_column(df, 'Skor', fill=0.0),
+        'capaian': number_column(df, 'Capaian', fill=0.0),
+        'penjelasan': text_column(df, 'Penjelasan'),
+        'year': number_column(df, 'Tahun', int, default=2022, fill=NO_FILL),
+        'auditor': text_column(df, 'Penilai', 'Unknown'),
+        'jenis_asesmen': text_column(df, 'Jenis_Asesmen', 'Internal')
+    })
+
+    years_data = {}
+    for item in records:
+        year = item['year']
+        if year not in years_data:
+            years_data[year] = {
+                'year': year,
+                'auditor': item['auditor'],
+                'jenis_asesmen': item['jenis_asesmen'],
+                'data': []
+            }
+        years_data[year]['data'].append(item)
+    return list(years_data.values())
+
+
+def aspek_records(df: pd.DataFrame) -> list:
+    """Subtotal rows with the matching header's description, for the aspek summary table"""
+    subtotal_rows = df[df['Type'] == 'subtotal']
+    header_rows = df[df['Type'] == 'header']
+
+    # First header per (Section, Tahun); missing keys never matched a header row
+    headers = (
+        header_rows[['Section', 'Tahun', 'Deskripsi']]
+        .dropna(subset=['Section', 'Tahun'])
+        .drop_duplicates(subset=['Section', 'Tahun'])
+        .rename(columns={'Deskripsi': 'Header_Deskripsi'})
+    )
+    joined = subtotal_rows[['Section', 'Tahun', 'Deskripsi']].merge(
+        headers, on=['Section', 'Tahun'], how='left', indicator=True
+    )
+
+    # Use header description if found, otherwise subtotal description
+    deskripsi = np.where(
+        joined['_merge'] == 'both', joined['Header_Deskripsi'].astype(object), joined['Deskripsi'].astype(object)
+    ).tolist()
+
+    return build_records({
+        'id': text_column(subtotal_rows, 'No'),
+        'aspek': text_column(subtotal_rows, 'Section'),
+        'deskripsi': deskripsi,
+        'jumlah_parameter': number_column(subtotal_rows, 'Jumlah_Parameter', int),
+        'bobot': number_column(subtotal_rows, 'Bobot'),
+        'skor': number_column(subtotal_rows, 'Skor'),
+        'capaian': number_column(subtotal_rows, 'Capaian'),
+        'penjelasan': text_column(subtotal_rows, 'Penjelasan', 'Tidak Baik'),
+        'tahun': number_column(subtotal_rows, 'Tahun', int)
+    })
+
+
+def indicator_records(df: pd.DataFrame) -> list:
+    """Indicator rows for the detailed bottom table"""
+    indicator_rows = df[df['Type'] == 'indicator']
+    return build_records({
+        'id': text_column(indicator_rows, 'No'),
+        'aspek': text_column(indicator_rows, 'Section'),
+        'deskripsi': text_column(indicator_rows, 'Deskripsi'),
+        'jumlah_parameter': number_column(indicator_rows, 'Jumlah_Parameter', int),
+        'bobot': number_column(indicator_rows, 'Bobot'),
+        'skor': number_column(indicator_rows, 'Skor'),
+        'capaian': number_column(indicator_rows, 'Capaian'),
+        'penjelasan': text_column(indicator_rows, 'Penjelasan', 'Tidak Baik'),
+        'tahun': number_column(indicator_rows, 'Tahun', int)
+    })
+
+
+def chart_records(df: pd.DataFrame) -> list:
+    """Rows in the graphics-2 GCGData format (NaN Bobot/Jumlah_Parameter become None)"""
+    # Determine level based on row type: header=1, indicator=2, subtotal/other=3, total=4
+    levels = text_column(df, 'Type').str.lower().map(
+        {'total': 4, 'header': 1, 'indicator': 2, 'subtotal': 3}
+    ).fillna(3).astype(int).astype(object)
+
+    return build_records({
+        'Tahun': number_column(df, 'Tahun', int, default=2022, fill=NO_FILL),
+        'Skor': number_column(df, 'Skor'),
+        'Level': levels,
+        'Section': text_column(df, 'Section'),
+        'Capaian': number_column(df, 'Capaian'),
+        'Bobot': number_column(df, 'Bobot', fill=None),
+        'Jumlah_Parameter': number_column(df, 'Jumlah_Parameter', fill=None),
+        'Penjelasan': text_column(df, 'Penjelasan'),
+        'Penilai': text_column(df, 'Penilai', 'Unknown'),
+        'No': text_column(df, 'No'),
+        'Deskripsi': text_column(df, 'Deskripsi'),
+        'Jenis_Penilaian': text_column(df, 'Jenis_Penilaian', 'Data Kosong')
+    })
@@ -0,0 +1,782 @@
+"""
+Assessment Store - SQLite-backed storage for GCG assessment results
+Rows live in the performa_gcg table, indexed by tahun, so saving one year is a
+single delete + executemany transaction and reads are indexed lookups instead
+of workbook parsing. output.xlsx is only generated on demand for download.
+Every write also refreshes that year's precomputed dashboard/aspek/indicator/chart
+payloads under web-output/assessment-views/ and bumps the data version.
+"""
+
+import json
+import math
+import threading
+from datetime import datetime
+from typing import Optional
+import numpy as np
+import pandas as pd
+from storage_service import storage_service
+from database import get_db_connection
+from migrate_performa_gcg import create_performa_gcg_table
+from assessment_serializer import aspek_records, build_records, chart_records, dashboard_groups, indicator_records
+from data_versions import ASSESSMENTS, data_versions
+from windows_utils import safe_print
+
+LEGACY_OUTPUT_PATH = 'web-output/output.xlsx'
+# Per-year workbooks used before performa_gcg became the primary store
+LEGACY_PARTITION_DIR = 'web-output/assessments'
+LEGACY_PARTITION_MARKER = f'{LEGACY_PARTITION_DIR}/partitions.json'
+# Written by releases that recorded the one-time import in a JSON file instead of SQLite
+MIGRATION_MARKER = 'web-output/performa_gcg_migration.json'
+# Columns the combined results sheet has; optional columns outside it read back as absent
+SHEET_COLUMNS_PATH = 'web-output/performa_gcg_columns.json'
+VIEW_DIR = 'web-output/assessment-views'
+VIEW_MANIFEST = f'{VIEW_DIR}/manifest.json'
+
+# Precomputed payloads stored per year, served by the dashboard GET endpoints
+VIEW_BUILDERS = {
+    'dashboard': dashboard_groups,
+    'aspek': aspek_records,
+    'indicator': indicator_records,
+    'chart': chart_records,
+}
+
+# Row type priority inside a Section: header=0, indicators=1, subtotal=2, total=3
+TYPE_PRIORITY = {'header': 0, 'indicator': 1, 'subtotal': 2, 'total': 3}
+# Section used for total rows so they sort last within each year
+TOTAL_SECTION_KEY = 'ZZZZZ'
+# Sort position for rows whose No is not a plain digit string
+NON_NUMERIC_NO = 9999
+# Indicator fields a PATCH may change: request field -> sheet column
+PATCHABLE_FIELDS = {
+    'deskripsi': 'Deskripsi',
+    'bobot': 'Bobot',
+    'skor': 'Skor',
+    'capaian': 'Capaian',
+    'penjelasan': 'Penjelasan',
+}
+SCORE_COLUMNS = ['Bobot', 'Skor', 'Capaian']
+
+# Sheet column -> performa_gcg column
+TABLE_COLUMNS = {
+    'Level': 'level',
+    'Type': 'type',
+    'Section': 'section',
+    'No': 'no',
+    'Deskripsi': 'deskripsi',
+    'Jumlah_Parameter': 'jumlah_parameter',
+    'Bobot': 'bobot',
+    'Skor': 'skor',
+    'Capaian': 'capaian',
+    'Penjelasan': 'penjelasan',
+    'Tahun': 'tahun',
+    'Penilai': 'penilai',
+    'Jenis_Asesmen': 'jenis_asesmen',
+    'Export_Date': 'export_date',
+    'Jenis_Penilaian': 'jenis_penilaian',
+}
+NUMERIC_COLUMNS = {'Level', 'Jumlah_Parameter', 'Bobot', 'Skor', 'Capaian', 'Tahun'}
+# Columns every saved row has; the others are only read back when the sheet has them
+ROW_COLUMNS = {'Level', 'Type', 'Section', 'No', 'Deskripsi', 'Bobot', 'Skor', 'Capaian', 'Penjelasan', 'Tahun'}
+# level is NOT NULL; rows saved without one get the level their type is written with
+LEVEL_BY_TYPE = {'header': 1, 'indicator': 2, 'subtotal': 1, 'total': 4}
+# Aspek display order used by the dashboard chart; other sections follow by name
+ROMAN_SECTIONS = ['I', 'II', 'III', 'IV', 'V', 'VI', 'VII', 'VIII', 'IX', 'X',
+                  'XI', 'XII', 'XIII', 'XIV', 'XV', 'XVI', 'XVII', 'XVIII', 'XIX', 'XX']
+
+
+def create_migration_table(conn):
+    """Create the single-row table recording the one-time import of the XLSX results"""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS performa_gcg_migration (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            source TEXT NOT NULL,
+            migrated_years TEXT NOT NULL,
+            replaced_years TEXT NOT NULL,
+            kept_years TEXT NOT NULL,
+            migrated_at TEXT NOT NULL
+        )
+    """)
+
+
+def year_key(year) -> str:
+    """Normalize a Tahun value (2024, 2024.0, '2024') to its storage key"""
+    try:
+        return str(int(float(year)))
+    except (TypeError, ValueError):
+        text = str(year).strip()
+        return text if text and text.lower() != 'nan' else 'unknown'
+
+
+def _year_sort_value(key: str) -> int:
+    """Order years like the row sort does: numeric years ascending, others first"""
+    try:
+        return int(key)
+    except ValueError:
+        return 0
+
+
+def _tahun_param(key: str):
+    """A year key as stored in performa_gcg.tahun"""
+    return int(key) if key.lstrip('-').isdigit() else key
+
+
+def _text_values(values: pd.Series, empty=None) -> list:
+    """str() of every value, with NaN and '' stored as empty"""
+    return [empty if pd.isna(value) or value == '' else str(value) for value in values.astype(object)]
+
+
+def _number_values(values: pd.Series, cast=float) -> list:
+    """float()/int() of every value, with unparseable values stored as NULL"""
+    values = values.astype(object)
+    numbers = pd.to_numeric(values.where(values != '', None), errors='coerce')
+    return [None if pd.isna(value) else cast(value) for value in numbers]
+
+
+def _year_sort_values(tahun: pd.Series) -> np.ndarray:
+    """Tahun as int like int(value), with 0 for missing or unparseable values"""
+    if pd.api.types.is_numeric_dtype(tahun) and not pd.api.types.is_bool_dtype(tahun):
+        return np.trunc(tahun.fillna(0).to_numpy(dtype='float64')).astype('int64')
+
+    values = tahun.astype(object)
+    numeric = pd.to_numeric(values, errors='coerce')
+    is_text = values.map(type) == str
+    # int('2024') works but int('2024.0') does not
+    text_ok = values.astype(str).str.fullmatch(r'\s*[+-]?\d+\s*')
+    numeric = numeric.where(~is_text | text_ok)
+    return np.trunc(numeric.fillna(0).to_numpy(dtype='float64')).astype('int64')
+
+
+def assessment_sort_keys(df: pd.DataFrame) -> pd.DataFrame:
+    """Derived sort columns for the year -> section -> type -> No hierarchy"""
+    row_type = df['Type'].astype(object).where(df['Type'].notna(), 'indicator').astype(str)
+    section = df['Section'].astype(object).where(df['Section'].notna(), '').astype(str)
+    section = section.where(row_type != 'total', TOTAL_SECTION_KEY)
+
+    # Only plain digit strings count as numbers: str(1.0) is '1.0', which sorts as non-numeric
+    no_text = df['No'].astype(object).astype(str)
+    no_numeric = pd.to_numeric(no_text.where(no_text.str.isdigit()), errors='coerce')
+
+    return pd.DataFrame({
+        'year': _year_sort_values(df['Tahun']),
+        'section': section.to_numpy(dtype=object),
+        'type_priority': row_type.map(TYPE_PRIORITY).fillna(1).to_numpy(dtype='int64'),
+        'no': no_numeric.fillna(NON_NUMERIC_NO).to_numpy(dtype='float64'),
+    }, index=df.index)
+
+
+def order_assessment_rows(df: pd.DataFrame) -> pd.DataFrame:
+    """Sort assessment rows by year, section (TOTAL last), type priority and numeric No.
+
+    Rows with equal keys keep their input order.
+    """
+    if df.empty:
+        return df
+    keys = assessment_sort_keys(df)
+    order = keys.sort_values(['year', 'section', 'type_priority', 'no'], kind='mergesort').index
+    return df.loc[order]
+
+
+def no_key(value) -> str:
+    """Normalize a No value (3, 3.0, '3') for matching"""
+    try:
+        number = float(value)
+        if number.is_integer():
+            return str(int(number))
+    except (TypeError, ValueError):
+        pass
+    return str(value).strip()
+
+
+def _js_round(value: float) -> int:
+    """JavaScript's Math.round: halves round up (2.5 -> 3, -2.5 -> -2), unlike Python's round()"""
+    whole = math.floor(value)
+    # value - whole is exact, so 0.49999999999999994 stays below the half like in JS
+    return int(whole) + 1 if value - whole >= 0.5 else int(whole)
+
+
+def calculate_capaian(skor: float, bobot: float) -> float:
+    """Capaian percentage as the assessment table computes it (negative bobot counts bad events)"""
+    if bobot == 0:
+        return 100
+    if bobot < 0:
+        if skor == 0:
+            return 0
+        ratio = min(abs(skor), abs(bobot)) / abs(bobot)
+        return -_js_round(ratio * 100)
+    return _js_round(skor / bobot * 100)
+
+
+def penjelasan_for(skor: float, bobot: float) -> str:
+    """Penjelasan category for a skor/bobot pair, matching the assessment table"""
+    if bobot < 0:
+        return 'Sangat Baik' if skor == 0 else 'Tidak Baik'
+    capaian = calculate_capaian(skor, bobot)
+    if capaian > 85:
+        return 'Sangat Baik'
+    if 76 <= capaian <= 85:
+        return 'Baik'
+    if 61 <= capaian <= 75:
+        return 'Cukup Baik'
+    if 51 <= capaian <= 60:
+        return 'Kurang Baik'
+    return 'Tidak Baik'
+
+
+def summarize_scores(rows: pd.DataFrame) -> dict:
+    """Subtotal-style sums over rows: negative bobot counts its skor, capaian from the sums"""
+    skor = pd.to_numeric(rows['Skor'], errors='coerce').fillna(0)
+    bobot = pd.to_numeric(rows['Bobot'], errors='coerce').fillna(0)
+    total_skor = float(skor.sum())
+    total_bobot = float(bobot.where(bobot >= 0, skor).sum())
+    return {
+        'Bobot': total_bobot,
+        'Skor': total_skor,
+        'Capaian': total_skor / total_bobot * 100 if total_bobot > 0 else 0.0,
+        'Penjelasan': penjelasan_for(total_skor, total_bobot),
+    }
+
+
+def _json_number(value):
+    return None if pd.isna(value) else float(value)
+
+
+def _score_stats(values: pd.Series, prefix: str) -> dict:
+    """min/max/mean of a score column, ignoring missing values"""
+    values = values.dropna()
+    return {
+        f'{prefix}_min': _json_number(values.min()) if not values.empty else None,
+        f'{prefix}_max': _json_number(values.max()) if not values.empty else None,
+        f'{prefix}_mean': _json_number(values.mean()) if not values.empty else None,
+    }
+
+
+def build_rollups(rows: pd.DataFrame, indicator_counts: dict) -> dict:
+    """Per-year totals, per-aspek scores per year with year-over-year deltas, and stats across years.
+
+    rows holds the header/subtotal/total rows; like the dashboard chart, a year's aspek
+    figures come from its subtotals, or its headers when it was saved without subtotals.
+    """
+    rows = rows.copy()
+    for column in ['Bobot', 'Skor', 'Capaian', 'Jumlah_Parameter']:
+        rows[column] = pd.to_numeric(rows[column], errors='coerce')
+    rows['Tahun'] = _year_sort_values(rows['Tahun'])
+    rows['Type'] = rows['Type'].astype(object).where(rows['Type'].notna(), '').astype(str).str.strip().str.lower()
+    rows['Section'] = rows['Section'].astype(object).where(rows['Section'].notna(), '').astype(str).str.strip()
+
+    subtotal_years = set(rows.loc[rows['Type'] == 'subtotal', 'Tahun'])
+    is_aspek = (rows['Type'] == 'subtotal') | ((rows['Type'] == 'header') & ~rows['Tahun'].isin(subtotal_years))
+    aspek = rows[is_aspek & (rows['Section'] != '')].drop_duplicates(['Tahun', 'Section'])
+    section_order = aspek['Section'].map(
+        lambda section: ROMAN_SECTIONS.index(section) if section in ROMAN_SECTIONS else len(ROMAN_SECTIONS)
+    )
+    aspek = aspek.assign(section_order=section_order).sort_values(
+        ['section_order', 'Section', 'Tahun'], kind='mergesort'
+    )
+    by_section = aspek.groupby('Section', sort=False)
+    aspek = aspek.assign(delta_skor=by_section['Skor'].diff(), delta_capaian=by_section['Capaian'].diff())
+
+    totals = rows[rows['Type'] == 'total'].drop_duplicates('Tahun').set_index('Tahun')
+    years, previous = [], None
+    for tahun in sorted(set(rows['Tahun']) | set(indicator_counts)):
+        year_aspek = aspek[aspek['Tahun'] == tahun]
+        if tahun in totals.index:
+            total = totals.loc[tahun, ['Bobot', 'Skor', 'Capaian', 'Penjelasan']].to_dict()
+        else:
+            total = summarize_scores(year_aspek)
+        year = {
+            'tahun': int(tahun),
+            'bobot': _json_number(total['Bobot']),
+            'skor': _json_number(total['Skor']),
+            'capaian': _json_number(total['Capaian']),
+            'penjelasan': None if pd.isna(total['Penjelasan']) else str(total['Penjelasan']),
+            'aspek_count': len(year_aspek),
+            'indicator_count': int(indicator_counts.get(tahun, 0)),
+            'delta_skor': None,
+            'delta_capaian': None,
+        }
+        if previous is not None:
+            for field in ['skor', 'capaian']:
+                if year[field] is not None and previous[field] is not None:
+                    year[f'delta_{field}'] = year[field] - previous[field]
+        years.append(year)
+        previous = year
+
+    # Plain lists: mapping a float Series to None would turn the Nones back into NaN
+    aspek_rollups = build_records({
+        'section': aspek['Section'],
+        'tahun': aspek['Tahun'].astype(int).tolist(),
+        'bobot': [_json_number(value) for value in aspek['Bobot']],
+        'skor': [_json_number(value) for value in aspek['Skor']],
+        'capaian': [_json_number(value) for value in aspek['Capaian']],
+        'jumlah_parameter': [_json_number(value) for value in aspek['Jumlah_Parameter']],
+        'delta_skor': [_json_number(value) for value in aspek['delta_skor']],
+        'delta_capaian': [_json_number(value) for value in aspek['delta_capaian']],
+    })
+
+    aspek_stats = []
+    for section, section_rows in by_section:
+        aspek_stats.append(dict(
+            {'section': section, 'years': int(section_rows['Tahun'].nunique())},
+            **_score_stats(section_rows['Skor'], 'skor'),
+            **_score_stats(section_rows['Capaian'], 'capaian'),
+        ))
+
+    year_frame = pd.DataFrame(years, columns=['skor', 'capaian'], dtype=float)
+    return {
+        'years': years,
+        'aspek': aspek_rollups,
+        'aspek_stats': aspek_stats,
+        'overall': dict(
+            {'years': len(years)},
+            **_score_stats(year_frame['skor'], 'skor'),
+            **_score_stats(year_frame['capaian'], 'capaian'),
+        ),
+    }
+
+
+class AssessmentStore:
+    """Reads and writes assessment rows in the performa_gcg table, one Tahun at a time"""
+
+    def __init__(self):
+        self._migration_lock = threading.Lock()
+        self._migrated = False
+        self._view_lock = threading.RLock()
+        self._write_lock = threading.RLock()  # Serializes year writes and read-modify-write edits
+        self._views = None
+        self._views_version = None
+        self._rollups = None
+        self._rollups_version = None
+
+    def _ensure_migrated(self):
+        """Create performa_gcg and import the XLSX results into it once, across all server processes"""
+        if self._migrated:
+            return
+        with self._migration_lock:
+            if self._migrated:
+                return
+            with get_db_connection() as conn:
+                create_performa_gcg_table(conn)
+                create_migration_table(conn)
+                done = conn.execute("SELECT 1 FROM performa_gcg_migration").fetchone() is not None
+            if not done:
+                self._import_legacy_results()
+            self._migrated = True
+
+    def _read_legacy_frames(self) -> tuple:
+        """The per-year partitions (or the multi-year output.xlsx) as (source, {year key: frame})"""
+        frames = {}
+        if storage_service.read_json(LEGACY_PARTITION_MARKER) is not None:
+            source = LEGACY_PARTITION_DIR
+            for table in storage_service.list_tables(LEGACY_PARTITION_DIR):
+                if table.endswith('.xlsx'):
+                    frames[table[len(LEGACY_PARTITION_DIR) + 1:-len('.xlsx')]] = storage_service.read_excel(table)
+        else:
+            source = LEGACY_OUTPUT_PATH
+            legacy_df = storage_service.read_excel(LEGACY_OUTPUT_PATH)
+            if legacy_df is not None and 'Tahun' in legacy_df.columns:
+                keys = legacy_df['Tahun'].map(year_key)
+                frames = {key: legacy_df[keys == key] for key in keys.unique()}
+        return source, {key: df for key, df in frames.items() if df is not None and not df.empty}
+
+    def _import_legacy_results(self):
+        """Reconcile performa_gcg with the legacy XLSX results and record that it happened.
+
+        The legacy source wins for every year it holds, replacing rows already in the table
+        (e.g. an older migrate_performa_gcg.py snapshot); years only in the table are kept.
+        The check and the import share one BEGIN IMMEDIATE transaction, so when several
+        workers start at once exactly one of them imports.
+        """
+        legacy_marker = storage_service.read_json(MIGRATION_MARKER)
+        # Parsed before taking the write lock; a worker that loses the race just discards them
+        source, frames = (None, {}) if legacy_marker else self._read_legacy_frames()
+
+        with get_db_connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            if conn.execute("SELECT 1 FROM performa_gcg_migration").fetchone() is not None:
+                return
+            if legacy_marker:
+                # Imported by an earlier release; the table has been the primary store since
+                source = legacy_marker.get('source', LEGACY_OUTPUT_PATH)
+                migrated_years, replaced_years, kept_years = legacy_marker.get('migrated_years', []), [], []
+            else:
+                stored = {year_key(row[0]) for row in conn.execute("SELECT DISTINCT tahun FROM performa_gcg")}
+                migrated_years, replaced_years = [], []
+                for key, df in frames.items():
+                    if key in stored:
+                        conn.execute("DELETE FROM performa_gcg WHERE tahun = ?", (_tahun_param(key),))
+                        replaced_years.append(key)
+                    self._insert_rows(conn, key, df)
+                    migrated_years.append(key)
+                kept_years = sorted(stored - set(frames))
+            conn.execute(
+                "INSERT INTO performa_gcg_migration VALUES (1, ?, ?, ?, ?, ?)",
+                (source, json.dumps(migrated_years), json.dumps(replaced_years), json.dumps(kept_years),
+                 datetime.now().isoformat())
+            )
+
+        if legacy_marker:
+            return
+        if frames and not kept_years:
+            columns = set()
+            for df in frames.values():
+                columns.update(df.columns)
+            self._write_sheet_columns(columns)
+        if migrated_years:
+            safe_print(f"📁 Imported {len(migrated_years)} years of assessment results from {source} into performa_gcg")
+        if replaced_years:
+            safe_print(f"⚠️ Replaced existing performa_gcg rows for {', '.join(replaced_years)} with {source}")
+        if kept_years:
+            safe_print(f"ℹ️ Kept performa_gcg rows for {', '.join(kept_years)}, which {source} does not have")
+
+    def list_years(self) -> list:
+        """Stored Tahun values in row-sort order"""
+        self._ensure_migrated()
+        with get_db_connection() as conn:
+            keys = {year_key(row[0]) for row in conn.execute("SELECT DISTINCT tahun FROM performa_gcg")}
+        return sorted(keys, key=lambda key: (_year_sort_value(key), key))
+
+    def read(self, year=None, columns: Optional[list] = None) -> Optional[pd.DataFrame]:
+        """Read one year's rows, or every year concatenated in year order; None if nothing is stored"""
+        self._ensure_migrated()
+        if year is not None:
+            with get_db_connection() as conn:
+                df = self._select_rows(conn, year_key(year), columns)
+            return df if not df.empty else None
+
+        frames = []
+        with get_db_connection() as conn:
+            for key in self.list_years():
+                df = self._select_rows(conn, key, columns)
+                if not df.empty:
+                    frames.append(df)
+        if not frames:
+            return None
+        return pd.concat(frames, ignore_index=True)
+
+    def write_year(self, year, df: pd.DataFrame) -> bool:
+        """Replace a year's rows and its precomputed views; an empty frame removes it"""
+        self._ensure_migrated()
+        if df is None or df.empty:
+            self.delete_year(year)
+            return True
+        with self._write_lock:
+            # Delete and re-insert in one transaction, so readers never see a half-written year
+            with get_db_connection() as conn:
+                conn.execute("DELETE FROM performa_gcg WHERE tahun = ?", (_tahun_param(year_key(year)),))
+                self._insert_rows(conn, year_key(year), df)
+                other_years = conn.execute(
+                    "SELECT 1 FROM performa_gcg WHERE tahun != ? LIMIT 1", (_tahun_param(year_key(year)),)
+                ).fetchone() is not None
+            # Like rebuilding the sheet from the other years' rows plus this year's frame
+            known = self._sheet_columns()
+            if not other_years:
+                columns = set(df.columns)
+            elif known is not None:
+                columns = known | set(df.columns)
+            else:
+                columns = None
+            stale_years = []
+            if columns is not None and columns != known:
+                self._write_sheet_columns(columns)
+                # Years saved earlier now read back with (or without) the changed columns
+                stale_years = [key for key in self.list_years() if key != year_key(year)]
+            # Views are built from the stored rows so they match what a re-read returns
+            with self._view_lock:
+                self._refresh_view(year_key(year))
+                for key in stale_years:
+                    self._refresh_view(key)
+        return True
+
+    def delete_year(self, year) -> int:
+        """Remove a year's rows and views, and return how many rows it held"""
+        self._ensure_migrated()
+        key = year_key(year)
+        with self._write_lock:
+            with get_db_connection() as conn:
+                deleted = conn.execute("DELETE FROM performa_gcg WHERE tahun = ?", (_tahun_param(key),)).rowcount
+            if deleted == 0:
+                return 0
+            with self._view_lock:
+                storage_service.delete_file(self.view_path(key))
+                version = self._bump_version()
+                self._apply_view_change(key, None, version)
+        return deleted
+
+    def patch_indicators(self, year, changes: list) -> Optional[dict]:
+        """Apply indicator edits keyed by (Section, No) and recompute affected subtotals and the total.
+
+        Only the changed rows are updated. Returns None if the year has no rows.
+        """
+        self._ensure_migrated()
+        key = year_key(year)
+        with self._write_lock, get_db_connection() as conn:
+            df = self._select_rows(conn, key, with_ids=True)
+            if df.empty:
+                return None
+            for column in SCORE_COLUMNS:
+                df[column] = pd.to_numeric(df[column], errors='coerce')
+            for column in ['Penjelasan', 'Deskripsi']:
+                df[column] = df[column].astype(object)
+
+            sections = df['Section'].astype(str).str.strip()
+            row_types = df['Type'].astype(str).str.strip().str.lower()
+            nos = df['No'].map(no_key)
+            is_indicator = row_types == 'indicator'
+
+            updated_rows, not_found, touched_sections = [], [], set()
+            for change in changes:
+                section = str(change.get('section', change.get('aspek', ''))).strip()
+                no = no_key(change.get('no', change.get('id', '')))
+                matches = df.index[is_indicator & (sections == section) & (nos == no)]
+                if len(matches) == 0:
+                    not_found.append({'section': section, 'no': no})
+                    continue
+
+                updates = {PATCHABLE_FIELDS[field]: value for field, value in change.items() if field in PATCHABLE_FIELDS}
+                for column in SCORE_COLUMNS:
+                    if column in updates:
+                        updates[column] = float(updates[column]) if updates[column] not in (None, '') else float('nan')
+                for column, value in updates.items():
+                    df.loc[matches, column] = value
+                # Capaian and Penjelasan follow skor/bobot unless the edit sets them explicitly
+                if 'Skor' in updates or 'Bobot' in updates:
+                    for index in matches:
+                        skor = df.at[index, 'Skor']
+                        bobot = df.at[index, 'Bobot']
+                        skor, bobot = (0 if pd.isna(skor) else skor), (0 if pd.isna(bobot) else bobot)
+                        if 'Capaian' not in updates:
+                            df.at[index, 'Capaian'] = calculate_capaian(skor, bobot)
+                        if 'Penjelasan' not in updates:
+                            df.at[index, 'Penjelasan'] = penjelasan_for(skor, bobot)
+                updated_rows.extend(matches)
+                touched_sections.add(section)
+
+            changed_rows = set(updated_rows)
+            subtotals = []
+            for section in sorted(touched_sections):
+                subtotal_index = df.index[(row_types == 'subtotal') & (sections == section)]
+                if len(subtotal_index) == 0:
+                    continue
+                summary = summarize_scores(df[is_indicator & (sections == section)])
+                for column, value in summary.items():
+                    df.loc[subtotal_index, column] = value
+                changed_rows.update(subtotal_index)
+                subtotals.append(dict(summary, Section=section))
+
+            total = None
+            total_index = df.index[row_types == 'total']
+            if touched_sections and len(total_index) > 0:
+                subtotal_rows = df[row_types == 'subtotal']
+                total = summarize_scores(subtotal_rows if not subtotal_rows.empty else df[is_indicator])
+                for column, value in total.items():
+                    df.loc[total_index, column] = value
+                changed_rows.update(total_index)
+
+            if changed_rows:
+                changed = df.loc[sorted(changed_rows)]
+                conn.executemany(
+                    """
+                    UPDATE performa_gcg
+                    SET deskripsi = ?, bobot = ?, skor = ?, capaian = ?, penjelasan = ?,
+                        updated_at = CURRENT_TIMESTAMP
+                    WHERE id = ?
+                    """,
+                    zip(_text_values(changed['Deskripsi'], ''), _number_values(changed['Bobot']),
+                        _number_values(changed['Skor']), _number_values(changed['Capaian']),
+                        _text_values(changed['Penjelasan']), changed.index.tolist())
+                )
+                conn.commit()
+                with self._view_lock:
+                    self._refresh_view(key)
+
+            return {
+                'updated': df.loc[sorted(set(updated_rows))],
+                'subtotals': subtotals,
+                'total': total,
+                'not_found': not_found,
+            }
+
+    def _sheet_columns(self) -> Optional[set]:
+        """Columns of the combined results sheet, or None if unknown (every column is read back)"""
+        record = storage_service.read_json(SHEET_COLUMNS_PATH)
+        return set(record['columns']) if record else None
+
+    def _write_sheet_columns(self, columns: set):
+        storage_service.write_json({
+            'columns': sorted(column for column in columns if column in TABLE_COLUMNS),
+            'updated_at': datetime.now().isoformat()
+        }, SHEET_COLUMNS_PATH)
+
+    def _select_rows(self, conn, key: str, columns: Optional[list] = None, with_ids: bool = False) -> pd.DataFrame:
+        """One year's rows in saved order, with sheet column names and NaN for NULL.
+
+        Optional columns the sheet does not have are left out, so serializers fall back to their
+        defaults for them; columns it has but a row left empty read back as NaN.
+        """
+        known = self._sheet_columns()
+        selected = [column for column in (columns or list(TABLE_COLUMNS))
+                    if column in TABLE_COLUMNS and (known is None or column in ROW_COLUMNS or column in known)]
+        fields = ', '.join(TABLE_COLUMNS[column] for column in selected)
+        rows = conn.execute(
+            f"SELECT id, {fields} FROM performa_gcg WHERE tahun = ? ORDER BY id", (_tahun_param(key),)
+        ).fetchall()
+
+        df = pd.DataFrame([tuple(row)[1:] for row in rows], columns=selected, dtype=object)
+        if with_ids:
+            df.index = pd.Index([row[0] for row in rows], name='id')
+        for column in selected:
+            if column in NUMERIC_COLUMNS:
+                df[column] = pd.to_numeric(df[column], errors='coerce')
+            else:
+                df[column] = df[column].where(df[column].notna(), np.nan)
+        return df
+
+    def _insert_rows(self, conn, key: str, df: pd.DataFrame):
+        """Insert a year's rows with one executemany; caller manages the transaction"""
+        count = len(df)
+
+        def text(column, empty=None):
+            return _text_values(df[column], empty) if column in df.columns else [empty] * count
+
+        def number(column, cast=float):
+            return _number_values(df[column], cast) if column in df.columns else [None] * count
+
+        row_types = text('Type', '')
+        levels = [
+            level if level is not None else LEVEL_BY_TYPE.get(str(row_type).lower(), 1)
+            for level, row_type in zip(number('Level', int), row_types)
+        ]
+        nos = [None if value is None else no_key(value) for value in text('No')]
+
+        conn.executemany(
+            """
+            INSERT INTO performa_gcg (
+                level, type, section, no, deskripsi, jumlah_parameter, bobot,
+                skor, capaian, penjelasan, tahun, penilai, jenis_asesmen,
+                export_date, jenis_penilaian
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            zip(levels, row_types, text('Section'), nos, text('Deskripsi', ''), number('Jumlah_Parameter', int),
+                number('Bobot'), number('Skor'), number('Capaian'), text('Penjelasan'),
+                [_tahun_param(key)] * count, text('Penilai'), text('Jenis_Asesmen'), text('Export_Date'),
+                text('Jenis_Penilaian'))
+        )
+
+    # Precomputed views
+    def view_path(self, year) -> str:
+        """Storage path of a year's precomputed payloads"""
+        return f'{VIEW_DIR}/{year_key(year)}.json'
+
+    @property
+    def version(self) -> int:
+        """Data version, bumped on every year write or delete"""
+        manifest = storage_service.read_json(VIEW_MANIFEST)
+        return manifest.get('version', 0) if manifest else 0
+
+    def _bump_version(self) -> int:
+        # The shared ASSESSMENTS counter hands out the number, so concurrent workers never reuse one
+        version = data_versions.bump(ASSESSMENTS)[ASSESSMENTS]
+        storage_service.write_json({'version': version, 'updated_at': datetime.now().isoformat()}, VIEW_MANIFEST)
+        return version
+
+    def _refresh_view(self, key: str) -> dict:
+        """Rebuild one year's payloads from its stored rows; caller holds _view_lock"""
+        with get_db_connection() as conn:
+            df = self._select_rows(conn, key)
+        payloads, errors = {}, {}
+        for name, builder in VIEW_BUILDERS.items():
+            try:
+                payloads[name] = builder(df)
+            except Exception as e:
+                # Surface the failure on GET, like building the payload from the sheet would
+                errors[name] = str(e)
+                safe_print(f"⚠️ Could not precompute {name} view for year {key}: {e}")
+
+        version = self._bump_version()
+        view = {'year': key, 'version': version, 'rows': len(df), 'payloads': payloads, 'errors': errors}
+        storage_service.write_json(view, self.view_path(key))
+        self._apply_view_change(key, view, version)
+        return view
+
+    def _apply_view_change(self, key: str, view: Optional[dict], version: int):
+        """Patch the in-memory views, or drop them if another process changed data in between"""
+        if self._views is None or self._views_version != version - 1:
+            self._views = None
+            return
+        if view is None:
+            self._views.pop(key, None)
+        else:
+            self._views[key] = view
+            self._views = dict(sorted(self._views.items(), key=lambda item: (_year_sort_value(item[0]), item[0])))
+        self._views_version = version
+
+    def _current_views(self) -> dict:
+        """Views per year in year order, reloaded only when the data version changes"""
+        self._ensure_migrated()
+        version = self.version
+        with self._view_lock:
+            if self._views is not None and self._views_version == version:
+                return self._views
+
+            self._views = None
+            views = {}
+            for key in self.list_years():
+                view = storage_service.read_json(self.view_path(key))
+                if view is None:
+                    # Years written before views existed, or by the legacy migration
+                    view = self._refresh_view(key)
+                views[key] = view
+            self._views = views
+            self._views_version = self.version
+            return views
+
+    def read_views(self, name: str, year=None) -> list:
+        """A precomputed payload for every stored year in year order, or just for one year"""
+        views = self._current_views()
+        if year is not None:
+            key = year_key(year)
+            views = {key: views[key]} if key in views else {}
+        payloads = []
+        for key, view in views.items():
+            if name in view['errors']:
+                raise ValueError(view['errors'][name])
+            payloads.append(view['payloads'][name])
+        return payloads
+
+    def rollups(self) -> dict:
+        """Aggregated per-year/per-aspek figures, recomputed only when the data version changes"""
+        self._ensure_migrated()
+        version = self.version
+        with self._view_lock:
+            if self._rollups is not None and self._rollups_version == version:
+                return self._rollups
+
+            columns = ['Tahun', 'Type', 'Section', 'Bobot', 'Skor', 'Capaian', 'Penjelasan', 'Jumlah_Parameter']
+            fields = ', '.join(f'{TABLE_COLUMNS[column]} AS {column}' for column in columns)
+            with get_db_connection() as conn:
+                # Indicators are only counted; the figures come from the summary rows
+                rows = pd.read_sql_query(
+                    f"SELECT {fields} FROM performa_gcg WHERE type != 'indicator' ORDER BY id", conn
+                )
+                indicator_counts = {
+                    _year_sort_value(year_key(tahun)): count for tahun, count in conn.execute(
+                        "SELECT tahun, COUNT(*) FROM performa_gcg WHERE type = 'indicator' GROUP BY tahun"
+                    )
+                }
+            self._rollups = dict(build_rollups(rows, indicator_counts), version=version)
+            self._rollups_version = version
+            return self._rollups
+
+    def export_combined(self):
+        """Generate the multi-year output.xlsx from performa_gcg for download"""
+        combined = self.read()
+        if combined is None:
+            combined = pd.DataFrame(columns=['Level', 'Type', 'Section', 'No', 'Deskripsi', 'Bobot', 'Skor',
+                                             'Capaian', 'Penjelasan', 'Tahun', 'Penilai', 'Jenis_Penilaian',
+                                             'Export_Date'])
+        storage_service.write_excel(combined, LEGACY_OUTPUT_PATH)
+        return storage_service.materialize(LEGACY_OUTPUT_PATH)
+
+
+# Global assessment store instance
+assessment_store = AssessmentStore()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: row-wise sort_key ordering vs vectorized order_assessment_rows
+Checks that both produce the same order, then times them at 10k and 100k rows
+"""
+
+import random
+import sys
+import time
+import pandas as pd
+from windows_utils import safe_print, set_console_encoding
+from assessment_store import order_assessment_rows
+
+# Set console encoding for Windows compatibility
+set_console_encoding()
+
+ROW_COUNTS = [10_000, 100_000]
+REPEATS = 3
+
+
+def legacy_order(df):
+    """The previous save_assessment ordering: one Python sort_key call per row"""
+    def sort_key(row):
+        try:
+            year = int(row['Tahun']) if pd.notna(row['Tahun']) else 0
+        except (ValueError, TypeError):
+            year = 0
+
+        section = str(row['Section']) if pd.notna(row['Section']) else ''
+        no = row['No']
+        row_type = str(row['Type']) if pd.notna(row['Type']) else 'indicator'
+
+        try:
+            no_numeric = int(no) if str(no).isdigit() else 9999
+        except (ValueError, TypeError):
+            no_numeric = 9999
+
+        type_priority = {'header': 0, 'indicator': 1, 'subtotal': 2, 'total': 3}.get(row_type, 1)
+        if row_type == 'total':
+            section = 'ZZZZZ'
+
+        return (year, section, type_priority, no_numeric)
+
+    # mergesort keeps ties in input order, like order_assessment_rows
+    return df.loc[df.apply(sort_key, axis=1).sort_values(kind='mergesort').index]
+
+
+def build_rows(count, seed=42):
+    """Shuffled assessment rows with headers, indicators, subtotals, totals and messy No values"""
+    rng = random.Random(seed)
+    sections = ['I', 'II', 'III', 'IV', 'V', 'VI', None]
+    types = ['header', 'indicator', 'indicator', 'indicator', 'subtotal', 'total', None, 'custom']
+    years = [2022, 2023, 2024, None]
+    rows = []
+    for i in range(count):
+        row_type = rng.choice(types)
+        no_choice = rng.random()
+        if no_choice < 0.6:
+            no = str(rng.randint(1, 200))
+        elif no_choice < 0.75:
+            no = float(rng.randint(1, 200))
+        elif no_choice < 0.9:
+            no = ''
+        else:
+            no = f'{rng.randint(1, 20)}a'
+        rows.append({
+            'Level': rng.choice(['1', '2', '3']),
+            'Type': row_type,
+            'Section': rng.choice(sections),
+            'No': no,
+            'Deskripsi': f'Row {i}',
+            'Bobot': rng.random() * 10,
+            'Skor': rng.random() * 10,
+            'Tahun': rng.choice(years),
+        })
+    df = pd.DataFrame(rows)
+    df['No'] = df['No'].astype(object)
+    return df
+
+
+def time_call(func, df):
+    """Best wall time over REPEATS runs"""
+    best = None
+    result = None
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        result = func(df)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    all_match = True
+    for count in ROW_COUNTS:
+        df = build_rows(count)
+        legacy_time, legacy_df = time_call(legacy_order, df)
+        vector_time, vector_df = time_call(order_assessment_rows, df)
+
+        same_order = legacy_df.index.equals(vector_df.index)
+        all_match = all_match and same_order
+        status = "✅" if same_order else "❌"
+        safe_print(f"{status} {count:>7,} rows: sort_key {legacy_time * 1000:9.1f} ms | "
+                   f"vectorized {vector_time * 1000:7.1f} ms | "
+                   f"speedup {legacy_time / vector_time:6.1f}x | same order: {same_order}")
+
+    if not all_match:
+        safe_print("❌ Vectorized ordering differs from the sort_key ordering")
+        return 1
+    safe_print("🎉 Vectorized ordering matches the sort_key ordering")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
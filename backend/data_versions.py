@@ -0,0 +1,145 @@
+"""
+Data Versions - Per-dataset version counters for ETag / If-None-Match
+Write routes bump the datasets they change; cached GET routes derive a strong
+ETag (one per content encoding) from those counters and answer 304 before touching storage. The counters
+live in the data_versions SQLite table, so every server worker sees every write.
+"""
+
+import hashlib
+import threading
+from functools import wraps
+from flask import request, make_response
+from database import get_db_connection
+
+# Dataset names
+ASSESSMENTS = 'assessments'
+CHECKLIST = 'checklist'
+STRUKTUR = 'struktur-organisasi'
+
+READ_METHODS = ('GET', 'HEAD')
+
+# Random value set when the table is created; if the counters are ever reset, old ETags must not match
+EPOCH_ROW = '__epoch__'
+
+# Gzipped bodies differ byte for byte from identity ones, so they get their own strong ETag
+GZIP_ETAG_SUFFIX = '-gzip'
+
+
+def create_data_versions_table(conn):
+    """Create the data_versions table and its epoch row"""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS data_versions (
+            dataset TEXT PRIMARY KEY,
+            version INTEGER NOT NULL
+        )
+    """)
+    conn.execute("INSERT OR IGNORE INTO data_versions (dataset, version) VALUES (?, random())", (EPOCH_ROW,))
+
+
+class DataVersions:
+    """Version counter per dataset, shared by all server processes through SQLite"""
+
+    def __init__(self):
+        self._ready = False
+        self._lock = threading.Lock()
+
+    def _ensure_table(self):
+        if self._ready:
+            return
+        with self._lock:
+            if not self._ready:
+                with get_db_connection() as conn:
+                    create_data_versions_table(conn)
+                self._ready = True
+
+    def _read(self, datasets) -> dict:
+        self._ensure_table()
+        with get_db_connection() as conn:
+            rows = conn.execute(
+                f"SELECT dataset, version FROM data_versions WHERE dataset IN ({', '.join('?' * len(datasets))})",
+                list(datasets)
+            ).fetchall()
+        return {row['dataset']: row['version'] for row in rows}
+
+    def bump(self, *datasets) -> dict:
+        """Mark datasets as changed; returns their new versions"""
+        self._ensure_table()
+        with get_db_connection() as conn:
+            conn.executemany(
+                """
+                INSERT INTO data_versions (dataset, version) VALUES (?, 1)
+                ON CONFLICT(dataset) DO UPDATE SET version = version + 1
+                """,
+                [(dataset,) for dataset in datasets]
+            )
+            rows = conn.execute(
+                f"SELECT dataset, version FROM data_versions WHERE dataset IN ({', '.join('?' * len(datasets))})",
+                list(datasets)
+            ).fetchall()
+        return {row['dataset']: row['version'] for row in rows}
+
+    def get(self, dataset: str) -> int:
+        return self._read([dataset]).get(dataset, 0)
+
+    def etag(self, datasets, resource: str = '') -> str:
+        """Strong ETag for a resource built from the given datasets"""
+        versions = self._read([EPOCH_ROW] + list(datasets))
+        parts = [f'{dataset}={versions.get(dataset, 0)}' for dataset in datasets]
+        raw = '|'.join([str(versions.get(EPOCH_ROW)), resource] + parts)
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()[:32]
+
+    def get_stats(self) -> dict:
+        self._ensure_table()
+        with get_db_connection() as conn:
+            rows = conn.execute("SELECT dataset, version FROM data_versions WHERE dataset != ?", (EPOCH_ROW,))
+            return {row['dataset']: row['version'] for row in rows}
+
+
+# Global data versions instance
+data_versions = DataVersions()
+
+
+def etag_versioned(*datasets):
+    """Decorator: tag GET responses with the datasets' ETag and answer 304 while it still matches"""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if request.method not in READ_METHODS:
+                return view(*args, **kwargs)
+
+            # Taken before the view runs, so a concurrent write only ever makes the tag older
+            etag = data_versions.etag(datasets, request.full_path)
+            # Either stored variant (identity or gzip) is still current while the versions match
+            matched = next((tag for tag in (etag, etag + GZIP_ETAG_SUFFIX)
+                            if request.if_none_match.contains_weak(tag)), None)
+            if matched:
+                response = make_response('', 304)
+                response.set_etag(matched)
+            else:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+                gzipped = response.headers.get('Content-Encoding') == 'gzip'
+                response.set_etag(etag + GZIP_ETAG_SUFFIX if gzipped else etag)
+            # The 304 must vary like the 200 it stands for (stream_json picks gzip per request)
+            response.vary.add('Accept-Encoding')
+            response.headers.setdefault('Cache-Control', 'no-cache')
+            return response
+        return wrapper
+    return decorator
+
+
+def bumps_versions(*datasets):
+    """Decorator: bump the datasets' versions after every write request"""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if request.method in READ_METHODS:
+                return view(*args, **kwargs)
+            try:
+                return view(*args, **kwargs)
+            finally:
+                # Also on errors: a failed request may still have written part of its changes
+                data_versions.bump(*datasets)
+        return wrapper
+    return decorator
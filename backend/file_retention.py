@@ -0,0 +1,252 @@
+"""
+File Retention - Background garbage collection of backend/uploads and backend/outputs
+Files nothing still needs are expired by age, by duplicate content and by a total
+size budget (least recently used first). Files of queued or running upload jobs
+and files younger than the minimum age are never touched. Every run produces a
+report, and dry runs only report what would be removed.
+"""
+
+import os
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from output_index import file_id_from_name, output_index
+from result_cache import sha256_file, upload_result_cache
+from upload_jobs import upload_jobs
+from windows_utils import safe_print
+
+BACKEND_DIR = Path(__file__).parent
+UPLOAD_FOLDER = BACKEND_DIR / 'uploads'
+OUTPUT_FOLDER = BACKEND_DIR / 'outputs'
+
+# Removal reasons, in the order the rules are applied
+AGE = 'age'
+DUPLICATE = 'duplicate'
+BUDGET = 'budget'
+
+
+def _env_flag(name: str, default: str) -> bool:
+    return os.environ.get(name, default).strip().lower() not in ('0', 'false', 'no')
+
+
+class FileRetention:
+    """Retention rules for the upload and processed output folders, run on a background thread"""
+
+    def __init__(self):
+        self.folders = [UPLOAD_FOLDER, OUTPUT_FOLDER]
+        self.interval = float(os.environ.get('RETENTION_INTERVAL', 3600))
+        self.max_age_days = float(os.environ.get('RETENTION_MAX_AGE_DAYS', 90))  # 0 = no age limit
+        self.max_bytes = int(float(os.environ.get('RETENTION_MAX_MB', 2048)) * 1024 * 1024)  # 0 = no budget
+        self.min_age_seconds = float(os.environ.get('RETENTION_MIN_AGE_SECONDS', 3600))
+        self.deduplicate = _env_flag('RETENTION_DEDUPLICATE', 'true')
+        # Report-only until an operator sets RETENTION_DRY_RUN=false; nothing is deleted by default
+        self.dry_run = _env_flag('RETENTION_DRY_RUN', 'true')
+        self._run_lock = threading.Lock()  # One run at a time
+        self._status_lock = threading.Lock()
+        self._worker = None
+        self._hashes = {}  # path -> ((size, mtime), sha256)
+        self._status = {
+            'running': False,
+            'runs': 0,
+            'last_run_at': None,
+            'last_trigger': None,
+            'last_duration_ms': None,
+            'last_report': None,
+            'total_removed_files': 0,
+            'total_removed_bytes': 0,
+            'last_error': None,
+        }
+
+    def _scan(self) -> list:
+        """Every file in the managed folders with its size, age and last use"""
+        now = time.time()
+        files = []
+        for folder in self.folders:
+            if not folder.exists():
+                continue
+            for entry in os.scandir(folder):
+                if not entry.is_file():
+                    continue
+                stat = entry.stat()
+                files.append({
+                    'path': Path(entry.path),
+                    'folder': folder.name,
+                    'size': stat.st_size,
+                    'mtime': stat.st_mtime,
+                    'age_seconds': now - stat.st_mtime,
+                    'last_used': max(stat.st_atime, stat.st_mtime),
+                    'links': stat.st_nlink,
+                })
+        return files
+
+    def _hash(self, file: dict) -> str:
+        """sha256 of a file, remembered while its size and mtime are unchanged"""
+        stamp = (file['size'], file['mtime'])
+        cached = self._hashes.get(file['path'])
+        if cached is None or cached[0] != stamp:
+            cached = (stamp, sha256_file(file['path']))
+            self._hashes[file['path']] = cached
+        return cached[1]
+
+    def _content_key(self, file: dict, uploads_by_id: dict, source_hashes: dict) -> str:
+        """Hash identifying a file's content; outputs are identified by the upload they were processed from"""
+        if file['folder'] == UPLOAD_FOLDER.name:
+            return self._hash(file)
+        file_id = file_id_from_name(file['path'].name)
+        if file_id in source_hashes:
+            return source_hashes[file_id]
+        if file_id in uploads_by_id:
+            return self._hash(uploads_by_id[file_id])
+        return self._hash(file)
+
+    def plan(self) -> dict:
+        """Decide what a run would remove, without removing anything"""
+        files = self._scan()
+        current = {file['path'] for file in files}
+        self._hashes = {path: value for path, value in self._hashes.items() if path in current}
+        protected = upload_jobs.active_paths()
+        cached_outputs = {entry['output_path'] for entry in upload_result_cache.entries()}
+        candidates = [file for file in files
+                      if str(file['path']) not in protected and file['age_seconds'] >= self.min_age_seconds]
+        removals = {}  # path -> reason
+
+        if self.max_age_days:
+            for file in candidates:
+                if file['age_seconds'] > self.max_age_days * 86400:
+                    removals[file['path']] = AGE
+
+        if self.deduplicate:
+            # Uploads are named <file_id>_<name>, their outputs processed_<file_id>_<name>.xlsx
+            uploads_by_id = {file['path'].name.split('_', 1)[0]: file
+                             for file in files if file['folder'] == UPLOAD_FOLDER.name}
+            # Read-only: planning (and so a dry run) must not reconcile or prune the index
+            source_hashes = output_index.source_hashes()
+            groups = {}
+            for file in files:
+                if file['path'] not in removals:
+                    key = (file['folder'], self._content_key(file, uploads_by_id, source_hashes))
+                    groups.setdefault(key, []).append(file)
+            candidate_paths = {file['path'] for file in candidates}
+            for group in groups.values():
+                # Keep the copy the result cache points at, otherwise the newest one
+                group.sort(key=lambda file: (str(file['path']) in cached_outputs, -file['age_seconds']), reverse=True)
+                for file in group[1:]:
+                    # Hard-linked reuses share the kept file's inode: removing them frees nothing
+                    if file['path'] in candidate_paths and file['links'] <= 1:
+                        removals[file['path']] = DUPLICATE
+
+        if self.max_bytes:
+            remaining = sum(file['size'] for file in files if file['path'] not in removals)
+            for file in sorted(candidates, key=lambda file: file['last_used']):
+                if remaining <= self.max_bytes:
+                    break
+                if file['path'] not in removals:
+                    removals[file['path']] = BUDGET
+                    remaining -= file['size']
+
+        sizes = {file['path']: file['size'] for file in files}
+        removed = [{'path': str(path), 'reason': reason, 'size': sizes[path]} for path, reason in removals.items()]
+        by_reason = {reason: sum(1 for item in removed if item['reason'] == reason) for reason in (AGE, DUPLICATE, BUDGET)}
+        return {
+            'scanned_files': len(files),
+            'scanned_bytes': sum(sizes.values()),
+            'protected_files': sum(1 for file in files if str(file['path']) in protected),
+            'removed': removed,
+            'removed_count': len(removed),
+            'removed_bytes': sum(item['size'] for item in removed),
+            'removed_by_reason': by_reason,
+        }
+
+    def _apply(self, report: dict):
+        """Delete the planned files and drop index and cache entries that pointed at them"""
+        removed_outputs = set()
+        for item in report['removed']:
+            path = Path(item['path'])
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            if path.parent == OUTPUT_FOLDER:
+                removed_outputs.add(item['path'])
+                file_id = file_id_from_name(path.name)
+                if file_id:
+                    output_index.remove(file_id)
+
+        for entry in upload_result_cache.entries():
+            if entry['output_path'] in removed_outputs or not Path(entry['output_path']).exists():
+                upload_result_cache.discard(entry['key'])
+
+    def run(self, trigger: str, dry_run: bool = None) -> dict:
+        """Run the retention rules now; dry_run defaults to RETENTION_DRY_RUN"""
+        dry_run = self.dry_run if dry_run is None else dry_run
+        with self._run_lock:
+            with self._status_lock:
+                self._status['running'] = True
+            started = time.monotonic()
+            report, error = None, None
+            try:
+                report = self.plan()
+                report['dry_run'] = dry_run
+                if not dry_run:
+                    self._apply(report)
+                    if report['removed_count']:
+                        safe_print(f"🧹 Retention removed {report['removed_count']} files "
+                                   f"({report['removed_bytes'] / (1024 * 1024):.1f} MB): {report['removed_by_reason']}")
+                return report
+            except Exception as e:
+                error = str(e)
+                safe_print(f"⚠️ File retention failed: {e}")
+                raise
+            finally:
+                with self._status_lock:
+                    self._status.update({
+                        'running': False,
+                        'runs': self._status['runs'] + 1,
+                        'last_run_at': datetime.now().isoformat(),
+                        'last_trigger': trigger,
+                        'last_duration_ms': round((time.monotonic() - started) * 1000, 1),
+                        'last_error': error,
+                    })
+                    if report is not None:
+                        self._status['last_report'] = dict(report, removed=report['removed'][:100])
+                        if not dry_run:
+                            self._status['total_removed_files'] += report['removed_count']
+                            self._status['total_removed_bytes'] += report['removed_bytes']
+
+    def start(self):
+        """Start the background worker if it is not running yet"""
+        with self._status_lock:
+            if self._worker is not None:
+                return
+            self._worker = threading.Thread(target=self._loop, name='file-retention', daemon=True)
+            self._worker.start()
+
+    def _loop(self):
+        trigger = 'startup'
+        while True:
+            try:
+                self.run(trigger)
+            except Exception:
+                pass  # Already logged and recorded in the status
+            time.sleep(self.interval)
+            trigger = 'schedule'
+
+    def get_status(self) -> dict:
+        with self._status_lock:
+            status = dict(self._status)
+        status['worker_alive'] = self._worker is not None and self._worker.is_alive()
+        status['interval_seconds'] = self.interval
+        status['rules'] = {
+            'max_age_days': self.max_age_days,
+            'max_mb': self.max_bytes / (1024 * 1024),
+            'min_age_seconds': self.min_age_seconds,
+            'deduplicate': self.deduplicate,
+            'dry_run': self.dry_run,
+        }
+        status['folders'] = [str(folder) for folder in self.folders]
+        return status
+
+
+# Global file retention instance
+file_retention = FileRetention()
@@ -0,0 +1,66 @@
+"""
+JSON Streaming - Chunked (and incrementally gzipped) JSON responses
+Large list payloads are encoded one item at a time and sent in ~64 KB chunks,
+so neither the combined list nor the full JSON text is ever held in memory.
+"""
+
+import zlib
+from flask import Response, current_app, request
+
+CHUNK_SIZE = 64 * 1024
+GZIP_LEVEL = 6
+GZIP_WBITS = 16 + zlib.MAX_WBITS  # gzip container instead of raw zlib
+
+
+def iter_json_object(provider, fields: dict, stream_key: str, items):
+    """Yield the JSON text of fields plus stream_key -> [items], encoding one item at a time"""
+    keys = list(fields) + [stream_key]
+    if getattr(provider, 'sort_keys', False):
+        keys.sort()  # Same key order jsonify would produce
+
+    yield '{'
+    for position, key in enumerate(keys):
+        yield ('' if position == 0 else ',') + provider.dumps(key) + ':'
+        if key != stream_key:
+            yield provider.dumps(fields[key])
+            continue
+        yield '['
+        for index, item in enumerate(items):
+            yield ('' if index == 0 else ',') + provider.dumps(item)
+        yield ']'
+    yield '}'
+
+
+def _chunked(pieces, size: int = CHUNK_SIZE):
+    """Join small text pieces into encoded chunks of about size bytes"""
+    buffer, length = [], 0
+    for piece in pieces:
+        buffer.append(piece)
+        length += len(piece)
+        if length >= size:
+            yield ''.join(buffer).encode('utf-8')
+            buffer, length = [], 0
+    if buffer:
+        yield ''.join(buffer).encode('utf-8')
+
+
+def _gzipped(chunks):
+    """Compress chunks as one gzip stream, flushing after each so the client can start decoding"""
+    compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, GZIP_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def stream_json(fields: dict, stream_key: str, items, status: int = 200) -> Response:
+    """Streamed equivalent of jsonify({**fields, stream_key: list(items)})"""
+    # Bound now: the generator runs after the view has returned
+    chunks = _chunked(iter_json_object(current_app.json, fields, stream_key, items))
+    headers = {'Vary': 'Accept-Encoding'}
+    if 'gzip' in request.accept_encodings:
+        chunks = _gzipped(chunks)
+        # etag_versioned reads this header to give the gzipped body its own ETag
+        headers['Content-Encoding'] = 'gzip'
+    return Response(chunks, status=status, mimetype='application/json', headers=headers)
@@ -0,0 +1,152 @@
+"""
+Orphan Cleanup - Background removal of assessments.json entries whose year has no saved results
+Runs on a worker thread after assessment writes and on a schedule, so read
+endpoints never rewrite files.
+"""
+
+import os
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from assessment_store import assessment_store, year_key
+from storage_service import storage_service
+from windows_utils import safe_print
+
+ASSESSMENTS_JSON_PATH = Path(__file__).parent.parent / 'web-output' / 'assessments.json'
+
+
+class OrphanCleanup:
+    """Maintenance task that prunes assessments.json against the years stored in performa_gcg"""
+
+    def __init__(self):
+        # Full runs at least this often, plus shortly after any assessment write
+        self.interval = float(os.environ.get('ORPHAN_CLEANUP_INTERVAL', 3600))
+        self.poll_seconds = float(os.environ.get('ORPHAN_CLEANUP_POLL_SECONDS', 5))
+        self._run_lock = threading.Lock()  # One cleanup at a time
+        self._status_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._worker = None
+        self._seen_version = None
+        self._last_run_monotonic = None
+        self._status = {
+            'running': False,
+            'runs': 0,
+            'last_run_at': None,
+            'last_trigger': None,
+            'last_duration_ms': None,
+            'last_removed_count': 0,
+            'last_removed_years': [],
+            'total_removed': 0,
+            'last_error': None,
+        }
+
+    def cleanup(self) -> dict:
+        """Drop assessments.json entries for years without saved rows; writes only if something changed"""
+        saved_years = assessment_store.list_years()
+        saved = set(saved_years)
+        removed_years = []
+        kept = 0
+
+        def prune(assessments_data):
+            nonlocal kept
+            cleaned_assessments = []
+            for assessment in assessments_data.get('assessments', []):
+                year = assessment.get('year')
+                if year is not None and year_key(year) in saved:
+                    cleaned_assessments.append(assessment)
+                else:
+                    removed_years.append(year)
+            kept = len(cleaned_assessments)
+            if not removed_years:
+                return None
+            assessments_data['assessments'] = cleaned_assessments
+            return assessments_data
+
+        # Locked read-modify-write with an atomic replace, so other server workers never see a partial file
+        if storage_service.update_json_file(ASSESSMENTS_JSON_PATH, prune):
+            safe_print(f"🔄 Auto-cleaned {len(removed_years)} orphaned entries")
+
+        return {
+            'removed_count': len(removed_years),
+            'removed_years': removed_years,
+            'kept_count': kept,
+            'saved_years': saved_years,
+        }
+
+    def run(self, trigger: str) -> dict:
+        """Run a cleanup now and record it in the status"""
+        with self._run_lock:
+            with self._status_lock:
+                self._status['running'] = True
+            started = time.monotonic()
+            result, error = None, None
+            try:
+                result = self.cleanup()
+                return result
+            except Exception as e:
+                error = str(e)
+                safe_print(f"⚠️ Orphan cleanup failed: {e}")
+                raise
+            finally:
+                self._last_run_monotonic = time.monotonic()
+                with self._status_lock:
+                    self._status.update({
+                        'running': False,
+                        'runs': self._status['runs'] + 1,
+                        'last_run_at': datetime.now().isoformat(),
+                        'last_trigger': trigger,
+                        'last_duration_ms': round((self._last_run_monotonic - started) * 1000, 1),
+                        'last_error': error,
+                    })
+                    if result is not None:
+                        self._status['last_removed_count'] = result['removed_count']
+                        self._status['last_removed_years'] = result['removed_years']
+                        self._status['total_removed'] += result['removed_count']
+
+    def request_run(self):
+        """Ask the worker to run a cleanup as soon as possible"""
+        self.start()
+        self._wake.set()
+
+    def start(self):
+        """Start the background worker if it is not running yet"""
+        with self._status_lock:
+            if self._worker is not None:
+                return
+            self._worker = threading.Thread(target=self._loop, name='orphan-cleanup', daemon=True)
+            self._worker.start()
+
+    def _loop(self):
+        while True:
+            requested = self._wake.wait(self.poll_seconds)
+            self._wake.clear()
+
+            # Shared manifest version, so writes made by other server workers are noticed too
+            version = assessment_store.version
+            if requested:
+                trigger = 'requested'
+            elif version != self._seen_version:
+                trigger = 'startup' if self._seen_version is None else 'write'
+            elif time.monotonic() - self._last_run_monotonic >= self.interval:
+                trigger = 'schedule'
+            else:
+                continue
+
+            self._seen_version = version
+            try:
+                self.run(trigger)
+            except Exception:
+                pass  # Already logged and recorded in the status
+
+    def get_status(self) -> dict:
+        with self._status_lock:
+            status = dict(self._status)
+        status['worker_alive'] = self._worker is not None and self._worker.is_alive()
+        status['interval_seconds'] = self.interval
+        status['assessments_path'] = str(ASSESSMENTS_JSON_PATH)
+        return status
+
+
+# Global orphan cleanup instance
+orphan_cleanup = OrphanCleanup()
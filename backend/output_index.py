@@ -0,0 +1,166 @@
+"""
+Output Index - SQLite index of processed upload outputs (backend/outputs/processed_<file_id>_*.xlsx)
+Lookups by file id and the /api/files listing query the processed_outputs table
+instead of globbing the outputs folder. Uploads record their output as they
+write it; the folder is reconciled with the table once per process.
+"""
+
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+from database import get_db_connection
+from windows_utils import safe_print
+
+OUTPUT_FOLDER = Path(__file__).parent / 'outputs'
+OUTPUT_PATTERN = 'processed_*.xlsx'
+
+
+def create_processed_outputs_table(conn):
+    """Create the processed_outputs table and its indexes"""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS processed_outputs (
+            file_id TEXT PRIMARY KEY,
+            filename TEXT NOT NULL,
+            path TEXT NOT NULL,
+            size INTEGER,
+            created_at TEXT,
+            modified_at TEXT,
+            source_sha256 TEXT,
+            original_filename TEXT
+        )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_processed_outputs_created ON processed_outputs(created_at)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_processed_outputs_source ON processed_outputs(source_sha256)")
+
+
+def file_id_from_name(filename: str) -> Optional[str]:
+    """file_id of a processed_<file_id>_<name>.xlsx output, or None"""
+    parts = filename.split('_', 2)
+    return parts[1] if len(parts) >= 2 and parts[0] == 'processed' else None
+
+
+def _file_row(file_id: str, path: Path, source_sha256: Optional[str], original_filename: Optional[str]) -> tuple:
+    stat = path.stat()
+    return (
+        file_id,
+        path.name,
+        str(path),
+        stat.st_size,
+        datetime.fromtimestamp(stat.st_ctime).isoformat(),
+        datetime.fromtimestamp(stat.st_mtime).isoformat(),
+        source_sha256,
+        original_filename,
+    )
+
+
+def _public(row) -> dict:
+    """An index row in the /api/files item shape"""
+    return {
+        'fileId': row['file_id'],
+        'filename': row['filename'],
+        'size': row['size'],
+        'created': row['created_at'],
+        'modified': row['modified_at'],
+        'sourceSha256': row['source_sha256'],
+        'originalFilename': row['original_filename'],
+    }
+
+
+class ProcessedOutputIndex:
+    """file_id -> processed output path, size, timestamps and source hash"""
+
+    def __init__(self, folder: Path = OUTPUT_FOLDER):
+        self.folder = Path(folder)
+        self._ready = False
+        self._lock = threading.Lock()
+
+    def _ensure_ready(self):
+        """Create the table and reconcile it with the outputs folder, once per process"""
+        if self._ready:
+            return
+        with self._lock:
+            if self._ready:
+                return
+            with get_db_connection() as conn:
+                create_processed_outputs_table(conn)
+            self.reconcile()
+            self._ready = True
+
+    def reconcile(self) -> dict:
+        """Index outputs written without going through record() and drop rows whose file is gone"""
+        on_disk = {}
+        for path in self.folder.glob(OUTPUT_PATTERN):
+            file_id = file_id_from_name(path.name)
+            if file_id:
+                on_disk[file_id] = path
+
+        with get_db_connection() as conn:
+            indexed = {row['file_id']: row['path'] for row in conn.execute("SELECT file_id, path FROM processed_outputs")}
+            missing = [file_id for file_id in on_disk if indexed.get(file_id) != str(on_disk[file_id])]
+            stale = [(file_id,) for file_id in indexed if file_id not in on_disk]
+            conn.executemany("INSERT OR REPLACE INTO processed_outputs VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                             [_file_row(file_id, on_disk[file_id], None, None) for file_id in missing])
+            conn.executemany("DELETE FROM processed_outputs WHERE file_id = ?", stale)
+
+        if missing or stale:
+            safe_print(f"🗂️ Output index: added {len(missing)}, removed {len(stale)} entries")
+        return {'added': len(missing), 'removed': len(stale), 'total': len(on_disk)}
+
+    def record(self, file_id: str, path: Path, source_sha256: Optional[str] = None,
+               original_filename: Optional[str] = None):
+        """Index an output that was just written"""
+        self._ensure_ready()
+        with get_db_connection() as conn:
+            conn.execute("INSERT OR REPLACE INTO processed_outputs VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                         _file_row(file_id, Path(path), source_sha256, original_filename))
+
+    def get(self, file_id: str) -> Optional[dict]:
+        """The indexed output for file_id with its 'path', or None; rows whose file was deleted are dropped"""
+        self._ensure_ready()
+        with get_db_connection() as conn:
+            row = conn.execute("SELECT * FROM processed_outputs WHERE file_id = ?", (file_id,)).fetchone()
+            if row is None:
+                return None
+            if not Path(row['path']).exists():
+                conn.execute("DELETE FROM processed_outputs WHERE file_id = ?", (file_id,))
+                return None
+        return dict(_public(row), path=Path(row['path']))
+
+    def source_hashes(self) -> dict:
+        """file_id -> source sha256 of the indexed outputs that have one, read without reconciling or pruning"""
+        with get_db_connection() as conn:
+            try:
+                rows = conn.execute(
+                    "SELECT file_id, source_sha256 FROM processed_outputs WHERE source_sha256 IS NOT NULL"
+                ).fetchall()
+            except sqlite3.OperationalError:  # Table not created yet
+                return {}
+        return {row['file_id']: row['source_sha256'] for row in rows}
+
+    def remove(self, file_id: str):
+        self._ensure_ready()
+        with get_db_connection() as conn:
+            conn.execute("DELETE FROM processed_outputs WHERE file_id = ?", (file_id,))
+
+    def list_page(self, page: int, per_page: int) -> dict:
+        """One page of outputs, newest first"""
+        self._ensure_ready()
+        with get_db_connection() as conn:
+            total = conn.execute("SELECT COUNT(*) FROM processed_outputs").fetchone()[0]
+            rows = conn.execute(
+                "SELECT * FROM processed_outputs ORDER BY created_at DESC, file_id LIMIT ? OFFSET ?",
+                (per_page, (page - 1) * per_page)
+            ).fetchall()
+        return {
+            'files': [_public(row) for row in rows],
+            'page': page,
+            'perPage': per_page,
+            'total': total,
+            'totalPages': (total + per_page - 1) // per_page,
+        }
+
+
+# Global processed output index
+output_index = ProcessedOutputIndex()
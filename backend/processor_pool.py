@@ -0,0 +1,230 @@
+"""
+Processor Pool - Long-lived worker processes for the document processing engine
+Each worker runs main_new.py in-process for every job it takes over its pipe, so
+pandas and the OCR/ML stack are imported once per worker instead of once per
+upload. Workers are recycled after a number of jobs or when their memory grows;
+with PROCESSOR_POOL_SIZE=0 every job runs as a CLI subprocess as before.
+"""
+
+import contextlib
+import io
+import json
+import os
+import queue
+import runpy
+import subprocess
+import sys
+import threading
+import traceback
+from windows_utils import safe_print
+
+try:
+    import resource
+except ImportError:  # Windows: workers are only recycled by job count
+    resource = None
+
+# Imported by every worker at start-up, so even its first job is warm
+DEFAULT_PRELOAD = 'pandas,numpy,openpyxl'
+
+
+class WorkerCrashed(Exception):
+    """Raised when a pooled worker exits (or is terminated) in the middle of a job"""
+
+
+def _peak_rss_mb() -> float:
+    """Peak resident memory of the current process in MB, or 0 where unavailable"""
+    if resource is None:
+        return 0.0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def _run_script(script: str, args: list, cwd: str) -> dict:
+    """Run a script as __main__ the way `python script args` would, capturing its output"""
+    stdout, stderr = io.StringIO(), io.StringIO()
+    returncode = 0
+    saved_argv, saved_path = sys.argv, list(sys.path)
+    try:
+        os.chdir(cwd)
+        sys.argv = [script] + args
+        sys.path.insert(0, os.path.dirname(script))
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+            try:
+                runpy.run_path(script, run_name='__main__')
+            except SystemExit as e:
+                if isinstance(e.code, int):
+                    returncode = e.code
+                elif e.code is not None:
+                    print(e.code, file=sys.stderr)
+                    returncode = 1
+            except Exception:
+                traceback.print_exc()
+                returncode = 1
+    finally:
+        sys.argv, sys.path[:] = saved_argv, saved_path
+
+    return {'returncode': returncode, 'stdout': stdout.getvalue(), 'stderr': stderr.getvalue()}
+
+
+def _worker_main() -> int:
+    """Worker process loop: one JSON request per stdin line, one JSON reply per line"""
+    # Replies get the real stdout; anything else writing to fd 1 (native libraries) goes to stderr
+    channel = os.fdopen(os.dup(sys.stdout.fileno()), 'w', encoding='utf-8')
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+
+    for module in os.environ.get('PROCESSOR_PRELOAD', DEFAULT_PRELOAD).split(','):
+        if module.strip():
+            try:
+                __import__(module.strip())
+            except ImportError:
+                pass
+
+    for line in sys.stdin:
+        request = json.loads(line)
+        reply = _run_script(request['script'], request['args'], request['cwd'])
+        reply['peak_rss_mb'] = _peak_rss_mb()
+        channel.write(json.dumps(reply) + '\n')
+        channel.flush()
+    return 0
+
+
+class _Worker:
+    """One pooled process, with a thread that collects its replies"""
+
+    def __init__(self):
+        self.process = subprocess.Popen([sys.executable, os.path.abspath(__file__)],
+                                        cwd=os.path.dirname(os.path.abspath(__file__)),
+                                        stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                        text=True, encoding='utf-8')
+        self.replies = queue.Queue()
+        self.jobs = 0
+        self.peak_rss_mb = 0.0
+        threading.Thread(target=self._read_replies, daemon=True).start()
+
+    def _read_replies(self):
+        for line in self.process.stdout:
+            self.replies.put(json.loads(line))
+        self.replies.put(None)  # EOF: the process has exited
+
+    def send(self, request: dict):
+        self.process.stdin.write(json.dumps(request) + '\n')
+        self.process.stdin.flush()
+
+    def stop(self):
+        try:
+            self.process.stdin.close()  # The worker's loop ends at EOF
+            self.process.wait(timeout=2)
+        except (OSError, subprocess.TimeoutExpired):
+            self.process.kill()
+            self.process.wait()
+
+
+class ProcessorPool:
+    """Fixed-size pool of warm processes that run python scripts the way a CLI call would"""
+
+    def __init__(self):
+        self.size = max(0, int(os.environ.get('PROCESSOR_POOL_SIZE', 2)))
+        self.max_jobs = max(1, int(os.environ.get('PROCESSOR_MAX_JOBS', 50)))
+        self.max_rss_mb = float(os.environ.get('PROCESSOR_MAX_RSS_MB', 1024))
+        self._idle = []
+        self._lock = threading.Lock()
+        # Signalled when a worker goes idle or is retired, so a waiting checkout can take or replace it
+        self._available = threading.Condition(self._lock)
+        self._started = 0  # Workers created and not yet retired
+        self._stats = {'pool_jobs': 0, 'cli_jobs': 0, 'recycled': 0, 'crashed': 0}
+
+    def accepts(self, cmd: list) -> bool:
+        """Whether a command is a python script call the pool can run"""
+        return self.size > 0 and len(cmd) >= 2 and cmd[0] == sys.executable and cmd[1].endswith('.py')
+
+    def _checkout(self) -> _Worker:
+        """An idle warm worker, starting a new one while the pool is below its size"""
+        with self._available:
+            while not self._idle and self._started >= self.size:
+                self._available.wait()
+            if self._idle:
+                return self._idle.pop()
+            self._started += 1
+        try:
+            return _Worker()
+        except Exception:
+            with self._available:
+                self._started -= 1
+                self._available.notify()
+            raise
+
+    def _release(self, worker: _Worker):
+        with self._available:
+            self._idle.append(worker)
+            self._available.notify()
+
+    def _retire(self, worker: _Worker, reason: str):
+        worker.stop()
+        with self._available:
+            self._started -= 1
+            self._stats[reason] += 1
+            self._available.notify()  # A waiting checkout starts the replacement
+
+    def run(self, cmd: list, cwd: str, timeout: float, on_start=None) -> subprocess.CompletedProcess:
+        """Run [python, script, *args] on a warm worker with subprocess.run's result and timeout behaviour.
+
+        on_start receives the worker's process so the caller can terminate() it; the job then
+        raises WorkerCrashed, as it does when the worker dies on its own.
+        """
+        worker = self._checkout()
+        try:
+            worker.send({'script': os.path.abspath(os.path.join(cwd, cmd[1])), 'args': list(cmd[2:]), 'cwd': cwd})
+        except OSError:
+            self._retire(worker, 'crashed')
+            raise WorkerCrashed('Processor worker is not running')
+        if on_start is not None:
+            on_start(worker.process)
+
+        try:
+            reply = worker.replies.get(timeout=timeout)
+        except queue.Empty:
+            self._retire(worker, 'crashed')
+            raise subprocess.TimeoutExpired(cmd, timeout)
+        if reply is None:
+            self._retire(worker, 'crashed')
+            raise WorkerCrashed(f'Processor worker exited with code {worker.process.returncode}')
+
+        worker.jobs += 1
+        worker.peak_rss_mb = reply['peak_rss_mb']
+        with self._lock:
+            self._stats['pool_jobs'] += 1
+        if worker.jobs >= self.max_jobs or (self.max_rss_mb and worker.peak_rss_mb > self.max_rss_mb):
+            safe_print(f"♻️ Recycling processor worker after {worker.jobs} jobs ({worker.peak_rss_mb:.0f} MB peak)")
+            self._retire(worker, 'recycled')
+        else:
+            self._release(worker)
+        return subprocess.CompletedProcess(cmd, reply['returncode'], reply['stdout'], reply['stderr'])
+
+    def run_cli(self, cmd: list, cwd: str, timeout: float, on_start=None) -> subprocess.CompletedProcess:
+        """The fallback: a fresh interpreter for the job"""
+        process = subprocess.Popen(cmd, cwd=cwd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+        if on_start is not None:
+            on_start(process)
+        try:
+            stdout, stderr = process.communicate(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.communicate()
+            raise
+        with self._lock:
+            self._stats['cli_jobs'] += 1
+        return subprocess.CompletedProcess(cmd, process.returncode, stdout, stderr)
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return dict(self._stats, size=self.size, workers=self._started, idle=len(self._idle),
+                        max_jobs=self.max_jobs, max_rss_mb=self.max_rss_mb)
+
+
+# Global processor pool instance
+processor_pool = ProcessorPool()
+
+
+if __name__ == '__main__':
+    sys.exit(_worker_main())
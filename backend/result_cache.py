@@ -0,0 +1,112 @@
+"""
+Result Cache - Content-addressed cache of processed /api/upload results
+Entries are keyed by the SHA-256 of the uploaded bytes and the processor version,
+so a re-upload of an identical document skips main_new.py and reuses the earlier
+processed workbook and extractedData.
+"""
+
+import hashlib
+import os
+import shutil
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+from storage_service import storage_service
+from windows_utils import safe_print
+
+CACHE_DIR = 'upload-cache'
+
+# Bump when the extractedData built from a processed workbook changes shape
+RESULT_FORMAT_VERSION = '1'
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def sha256_file(path) -> str:
+    """Hex SHA-256 of a file, read in chunks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class UploadResultCache:
+    """Processed upload results by input hash, invalidated when the processor changes"""
+
+    def __init__(self, processor_script: Path):
+        self.enabled = os.environ.get('UPLOAD_RESULT_CACHE', 'true').strip().lower() not in ('0', 'false', 'no')
+        self.processor_script = Path(processor_script)
+        self._version = None
+        self._version_stamp = None
+        self._stats = {'hits': 0, 'misses': 0, 'stored': 0}
+
+    def processor_version(self) -> str:
+        """Hash of the processor script (or PROCESSOR_VERSION) and the result format, rehashed when the script changes"""
+        configured = os.environ.get('PROCESSOR_VERSION')
+        if configured:
+            return f'{configured}-{RESULT_FORMAT_VERSION}'
+        try:
+            stat = self.processor_script.stat()
+            stamp = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            return f'missing-{RESULT_FORMAT_VERSION}'
+        if stamp != self._version_stamp:
+            self._version = f'{sha256_file(self.processor_script)[:16]}-{RESULT_FORMAT_VERSION}'
+            self._version_stamp = stamp
+        return self._version
+
+    def key(self, input_sha256: str, file_type: str, processor_version: str) -> str:
+        return f'{input_sha256}-{file_type}-{processor_version}'
+
+    def _path(self, key: str) -> str:
+        return f'{CACHE_DIR}/{key}.json'
+
+    def lookup(self, key: str) -> Optional[dict]:
+        """The cached entry for key, or None; entries whose processed workbook is gone count as misses"""
+        if not self.enabled:
+            return None
+        entry = storage_service.read_json(self._path(key))
+        if entry and Path(entry['output_path']).exists():
+            self._stats['hits'] += 1
+            return entry
+        self._stats['misses'] += 1
+        return None
+
+    def store(self, key: str, output_path: Path, processing: dict, extracted_data: dict):
+        """Remember a successful processing result"""
+        if not self.enabled:
+            return
+        storage_service.write_json({
+            'key': key,
+            'output_path': str(output_path),
+            'processing': processing,
+            'extractedData': extracted_data,
+            'created_at': datetime.now().isoformat(),
+        }, self._path(key))
+        self._stats['stored'] += 1
+
+    def reuse_output(self, entry: dict, output_path: Path):
+        """Give the cached processed workbook the new upload's name, hard-linked where possible"""
+        try:
+            os.link(entry['output_path'], output_path)
+        except OSError:
+            shutil.copy2(entry['output_path'], output_path)
+        # A link or copy keeps the cached file's old mtime; the reused output starts its retention age now
+        os.utime(output_path)
+        safe_print(f"♻️ Reused processed output {Path(entry['output_path']).name}")
+
+    def entries(self) -> list:
+        """All cached entries"""
+        return [entry for entry in (storage_service.read_json(path) for path in storage_service.list_files(CACHE_DIR)
+                                    if path.endswith('.json')) if entry]
+
+    def discard(self, key: str):
+        storage_service.delete_file(self._path(key))
+
+    def get_stats(self) -> dict:
+        return dict(self._stats, enabled=self.enabled, processor_version=self.processor_version())
+
+
+# Global upload result cache; main_new.py lives in the project root next to the repository
+upload_result_cache = UploadResultCache(Path(__file__).parent.parent.parent / 'main_new.py')
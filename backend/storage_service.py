@@ -2,13 +2,148 @@
 Storage Service - Handles file operations for local storage
 """
 
+import atexit
+import csv
+import hashlib
+import io
+import json
 import os
 import threading
+import time
+from contextlib import contextmanager
 from pathlib import Path
 from typing import Optional
 import pandas as pd
+from pandas.io.parsers import TextParser
 from windows_utils import safe_print
 
+try:
+    import fcntl
+except ImportError:  # Windows: only in-process locking is available
+    fcntl = None
+
+# Binary sidecars live under data/.sidecar/ and mirror the tracked XLSX/CSV paths
+SIDECAR_DIR = '.sidecar'
+# Cross-process lock files live under data/.locks/
+LOCK_DIR = '.locks'
+# Append-only change journals for CSV tables live under data/.journal/
+JOURNAL_DIR = '.journal'
+INTERNAL_DIRS = {SIDECAR_DIR, LOCK_DIR, JOURNAL_DIR}
+SIDECAR_SUFFIXES = {'parquet': '.parquet', 'feather': '.feather', 'pickle': '.pkl'}
+
+# Read size when streaming uploaded files to disk
+STREAM_CHUNK_SIZE = 1024 * 1024
+# Workbook formats openpyxl can stream; anything else (.xls) is parsed by pd.read_excel
+STREAMABLE_EXCEL_SUFFIXES = {'.xlsx', '.xlsm'}
+
+
+def _detect_sidecar_format() -> Optional[str]:
+    """Pick the sidecar format requested via STORAGE_SIDECAR (parquet, feather, pickle, auto)"""
+    requested = os.environ.get('STORAGE_SIDECAR', '').strip().lower()
+    if requested in ('', '0', 'off', 'false', 'none'):
+        return None
+    if requested in ('auto', 'parquet', 'feather'):
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            safe_print("⚠️ pyarrow not installed - falling back to pickle sidecars")
+            return 'pickle'
+        return 'parquet' if requested == 'auto' else requested
+    return 'pickle'
+
+
+def _excel_cell(cell):
+    """A cell converted the way pd.read_excel's openpyxl reader converts it"""
+    if cell.value is None:
+        return ''
+    if cell.data_type == 'e':
+        return float('nan')
+    if cell.data_type == 'n':
+        number = int(cell.value)
+        return number if number == cell.value else float(cell.value)
+    return cell.value
+
+
+def _iter_sheet_rows(sheet):
+    """Yield a read-only worksheet's rows as pd.read_excel sees them, one at a time.
+
+    Trailing empty cells are trimmed and trailing empty rows dropped, like pandas does;
+    empty rows between data rows are kept.
+    """
+    sheet.reset_dimensions()
+    blank_rows = 0
+    for row in sheet.rows:
+        values = [_excel_cell(cell) for cell in row]
+        while values and values[-1] == '':
+            values.pop()
+        if not values:
+            blank_rows += 1
+            continue
+        for _ in range(blank_rows):
+            yield []
+        blank_rows = 0
+        yield values
+
+
+@contextmanager
+def _open_workbook(path):
+    from openpyxl import load_workbook
+    workbook = load_workbook(str(path), read_only=True, data_only=True, keep_links=False)
+    try:
+        yield workbook
+    finally:
+        workbook.close()
+
+
+def _rows_to_frame(rows: list) -> pd.DataFrame:
+    """Parse header + data rows with the TextParser call pd.read_excel makes, so dtypes match"""
+    if not rows:
+        return pd.DataFrame()
+    width = max(len(row) for row in rows)
+    if width == 0:
+        # No columns (e.g. none of the projected ones exist), but still one index entry per row
+        return pd.DataFrame(index=pd.RangeIndex(len(rows) - 1), columns=pd.Index([], dtype='str'))
+    rows = [row + [''] * (width - len(row)) for row in rows]
+    return TextParser(rows, header=0, skip_blank_lines=False).read()
+
+
+def _normalize_cell(value):
+    """Comparable form of a cell so 2024, 2024.0 and '2024' filter the same way"""
+    if value is None or value == '':
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return str(value).strip()
+
+
+def _filter_targets(value) -> set:
+    """Normalized cell values a filter accepts: one value, or any value in a list"""
+    values = value if isinstance(value, (list, tuple, set)) else [value]
+    return {_normalize_cell(v) for v in values}
+
+
+def _select_frame(df: pd.DataFrame, columns: Optional[list], filters: Optional[dict]) -> pd.DataFrame:
+    """The rows of an in-memory table matching `filters`, projected to `columns` (missing ones skipped)"""
+    mask = pd.Series(True, index=df.index)
+    for column, value in (filters or {}).items():
+        mask &= df[column].map(_normalize_cell).isin(_filter_targets(value)) if column in df.columns else False
+    df = df[mask]
+    if columns is not None:
+        df = df[[column for column in columns if column in df.columns]]
+    return df.reset_index(drop=True)
+
+
+class _DirNode:
+    """One directory in the cached index: its files, subdirectories and last seen mtime"""
+    __slots__ = ('files', 'dirs', 'mtime_ns')
+
+    def __init__(self):
+        self.files = {}  # name -> (size, mtime_ns)
+        self.dirs = {}  # name -> _DirNode
+        self.mtime_ns = None
+
+
 class StorageService:
     """Local file storage service"""
 
@@ -17,7 +152,33 @@ class StorageService:
         # File locks to prevent race conditions
         self._file_locks = {}
         self._locks_lock = threading.Lock()  # Lock to protect the _file_locks dict itself
+        # Parsed DataFrame cache keyed by resolved path, validated by (mtime_ns, size)
+        self._df_cache = {}
+        self._cache_lock = threading.Lock()
+        self._cache_hits = 0
+        self._cache_misses = 0
+        # Optional binary sidecar mode: XLSX/CSV are only regenerated on download
+        self.sidecar_format = _detect_sidecar_format()
+        # Journals are folded into the base CSV once either threshold is crossed
+        self.journal_compact_entries = int(os.environ.get('JOURNAL_COMPACT_ENTRIES', 200))
+        self.journal_compact_bytes = int(os.environ.get('JOURNAL_COMPACT_BYTES', 1024 * 1024))
+        # Optional write-behind: writes to the same path within this many seconds are coalesced
+        self.write_behind_delay = float(os.environ.get('STORAGE_WRITE_BEHIND_DELAY', 0))
+        self._pending_writes = {}  # file_path -> (kind, df, enqueued_at)
+        self._inflight_writes = {}  # file_path -> (kind, df) currently being flushed
+        self._pending_cond = threading.Condition()
+        self._flush_lock = threading.Lock()  # Keeps flushes of the same path in order
+        self._flusher = None
+        self._writes_requested = 0
+        self._writes_flushed = 0
+        # Directory index for list_files: subtree roots (relative to data/) -> _DirNode
+        self._dir_index = {}
+        self._index_lock = threading.RLock()
+        self._index_sweep_seconds = float(os.environ.get('DIR_INDEX_SWEEP_SECONDS', 5))
+        self._index_sweeper = None
         safe_print("✅ Local storage mode initialized")
+        if self.sidecar_format:
+            safe_print(f"✅ Sidecar storage enabled ({self.sidecar_format})")
 
     def _get_file_lock(self, file_path: str) -> threading.Lock:
         """Get or create a threading lock for a specific file path"""
@@ -26,22 +187,406 @@ class StorageService:
                 self._file_locks[file_path] = threading.Lock()
             return self._file_locks[file_path]
 
-    def read_excel(self, file_path: str) -> Optional[pd.DataFrame]:
-        """Read Excel file from local storage"""
+    @contextmanager
+    def _process_lock(self, file_path: str, exclusive: bool):
+        """Hold an fcntl lock on a table so other worker processes see consistent files.
+
+        Readers take a shared lock and never block each other; writers take an
+        exclusive one. On platforms without fcntl this is a no-op.
+        """
+        if fcntl is None:
+            yield
+            return
+        lock_path = Path(__file__).parent.parent / 'data' / LOCK_DIR / (file_path + '.lock')
+        lock_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(lock_path, 'a+') as handle:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+
+    def _atomic_write(self, target: Path, writer):
+        """Write via a temp file in the same directory, fsync it, then rename over the target"""
+        target.parent.mkdir(parents=True, exist_ok=True)
+        # Keep the real suffix so pandas picks the right engine for the temp file
+        tmp_path = target.with_name(f".{target.stem}.{os.getpid()}.{threading.get_ident()}.tmp{target.suffix}")
+        try:
+            writer(str(tmp_path))
+            with open(tmp_path, 'rb+') as handle:
+                os.fsync(handle.fileno())
+            os.replace(str(tmp_path), str(target))
+        except Exception:
+            if tmp_path.exists():
+                tmp_path.unlink()
+            raise
+        self._index_record(target)
+        if os.name != 'nt':
+            # Persist the rename itself
+            dir_fd = os.open(str(target.parent), os.O_RDONLY)
+            try:
+                os.fsync(dir_fd)
+            finally:
+                os.close(dir_fd)
+
+    def _resolve_read_path(self, file_path: str) -> Path:
+        """Resolve a storage path to the file that reads should use"""
+        # Use data directory for organized local storage
+        full_path = Path(__file__).parent.parent / 'data' / file_path
+        if full_path.exists():
+            return full_path
+        # Fallback to old location for backward compatibility
+        fallback_path = Path(__file__).parent.parent / file_path
+        if fallback_path.exists():
+            return fallback_path
+        raise FileNotFoundError(f"Local file not found: {full_path} or {fallback_path}")
+
+    def _read_cached(self, resolved_path: Path, parser) -> pd.DataFrame:
+        """Return a private copy of a parsed file, parsing only when it changed on disk"""
+        key = str(resolved_path.resolve())
+        stat = resolved_path.stat()
+        signature = (stat.st_mtime_ns, stat.st_size)
+
+        with self._cache_lock:
+            entry = self._df_cache.get(key)
+            if entry is not None and entry[0] == signature:
+                self._cache_hits += 1
+                # Callers mutate what they get back, so never hand out the cached frame
+                return entry[1].copy(deep=True)
+            self._cache_misses += 1
+
+        df = parser(str(resolved_path))
+        nbytes = int(df.memory_usage(index=True, deep=True).sum())
+
+        with self._cache_lock:
+            self._df_cache[key] = (signature, df, nbytes)
+        return df.copy(deep=True)
+
+    def _invalidate_cache(self, file_path: str):
+        """Drop cached frames for a storage path (both data/ and legacy locations)"""
+        candidates = [
+            Path(__file__).parent.parent / 'data' / file_path,
+            Path(__file__).parent.parent / file_path,
+        ]
+        candidates.extend(self._sidecar_path(file_path, fmt) for fmt in SIDECAR_SUFFIXES)
+        with self._cache_lock:
+            for candidate in candidates:
+                self._df_cache.pop(str(candidate.resolve()), None)
+
+    def clear_cache(self):
+        """Drop every cached DataFrame"""
+        with self._cache_lock:
+            self._df_cache.clear()
+
+    # Write-behind queue
+    def _enqueue_write(self, kind: str, df: pd.DataFrame, file_path: str) -> bool:
+        """Queue a snapshot for the background flusher; a newer snapshot replaces an older one"""
+        snapshot = df.copy(deep=True)
+        with self._pending_cond:
+            previous = self._pending_writes.get(file_path)
+            enqueued_at = previous[2] if previous else time.monotonic()
+            self._pending_writes[file_path] = (kind, snapshot, enqueued_at)
+            self._writes_requested += 1
+            if self._flusher is None:
+                self._flusher = threading.Thread(target=self._flush_loop, name='storage-write-behind', daemon=True)
+                self._flusher.start()
+            self._pending_cond.notify()
+        return True
+
+    def _flush_loop(self):
+        """Background thread: write each queued path once its max delay has passed"""
+        while True:
+            with self._pending_cond:
+                while not self._pending_writes:
+                    self._pending_cond.wait()
+                oldest = min(entry[2] for entry in self._pending_writes.values())
+                wait_for = oldest + self.write_behind_delay - time.monotonic()
+                if wait_for > 0:
+                    self._pending_cond.wait(wait_for)
+                    continue
+                due = [path for path, entry in self._pending_writes.items()
+                       if entry[2] + self.write_behind_delay <= time.monotonic()]
+            for file_path in due:
+                self._flush_path(file_path)
+
+    def _flush_path(self, file_path: str):
+        """Write the pending snapshot for one path, if any"""
+        with self._flush_lock:
+            with self._pending_cond:
+                entry = self._pending_writes.pop(file_path, None)
+                if entry is None:
+                    return
+                kind, df, _ = entry
+                self._inflight_writes[file_path] = (kind, df)
+            try:
+                if kind == 'excel':
+                    self._write_excel_local(df, file_path)
+                else:
+                    self._write_csv_local(df, file_path)
+                with self._pending_cond:
+                    self._writes_flushed += 1
+            except Exception as e:
+                safe_print(f"❌ Error flushing queued write for {file_path}: {e}")
+            finally:
+                with self._pending_cond:
+                    self._inflight_writes.pop(file_path, None)
+
+    def _pending_snapshot(self, file_path: str) -> Optional[pd.DataFrame]:
+        """Return a copy of a queued or in-flight write so reads see their own writes"""
+        with self._pending_cond:
+            entry = self._pending_writes.get(file_path) or self._inflight_writes.get(file_path)
+            if entry is None:
+                return None
+            return entry[1].copy(deep=True)
+
+    def flush(self, file_path: Optional[str] = None):
+        """Write queued snapshots now (one path or all); returns once they are on disk"""
+        # _flush_path serializes on _flush_lock, so a write the background thread
+        # already picked up has finished by the time this returns
+        if file_path is not None:
+            self._flush_path(file_path)
+            return
+        with self._pending_cond:
+            paths = list(self._pending_writes)
+        for path in paths:
+            self._flush_path(path)
+
+    def get_write_behind_stats(self) -> dict:
+        """Report how many writes were requested, flushed and are still queued"""
+        with self._pending_cond:
+            return {
+                'enabled': self.write_behind_delay > 0,
+                'max_delay_seconds': self.write_behind_delay,
+                'requested': self._writes_requested,
+                'flushed': self._writes_flushed,
+                'pending': len(self._pending_writes),
+            }
+
+    def get_cache_stats(self) -> dict:
+        """Report parsed DataFrame cache hit rate and memory held"""
+        with self._cache_lock:
+            lookups = self._cache_hits + self._cache_misses
+            return {
+                'entries': len(self._df_cache),
+                'hits': self._cache_hits,
+                'misses': self._cache_misses,
+                'hit_rate': round(self._cache_hits / lookups, 4) if lookups else 0.0,
+                'bytes_held': sum(entry[2] for entry in self._df_cache.values()),
+            }
+
+    # Sidecar helpers
+    def _sidecar_path(self, file_path: str, fmt: str) -> Path:
+        """Location of the binary sidecar for a tracked table"""
+        base = Path(__file__).parent.parent / 'data' / SIDECAR_DIR / file_path
+        return base.with_name(base.name + SIDECAR_SUFFIXES[fmt])
+
+    def _find_sidecar(self, file_path: str) -> Optional[Path]:
+        """Return the existing sidecar for a table, whatever format it was written in"""
+        for fmt in SIDECAR_SUFFIXES:
+            candidate = self._sidecar_path(file_path, fmt)
+            if candidate.exists():
+                return candidate
+        return None
+
+    def _read_sidecar_file(self, path: str) -> pd.DataFrame:
+        """Parse a sidecar file based on its suffix"""
+        if path.endswith('.parquet'):
+            return pd.read_parquet(path)
+        if path.endswith('.feather'):
+            return pd.read_feather(path)
+        return pd.read_pickle(path)
+
+    def _write_sidecar(self, df: pd.DataFrame, file_path: str) -> Path:
+        """Persist a table as a binary sidecar, falling back to pickle for unsupported dtypes"""
+        df = df.reset_index(drop=True)
+        formats = [self.sidecar_format] if self.sidecar_format == 'pickle' else [self.sidecar_format, 'pickle']
+        last_error = None
+        for fmt in formats:
+            target = self._sidecar_path(file_path, fmt)
+            if fmt == 'parquet':
+                writer = lambda path: df.to_parquet(path, index=False)
+            elif fmt == 'feather':
+                writer = df.to_feather
+            else:
+                writer = df.to_pickle
+            try:
+                self._atomic_write(target, writer)
+            except Exception as e:
+                # Mixed-type object columns are common in our sheets and Arrow rejects them
+                last_error = e
+                continue
+            # Remove stale sidecars left in other formats
+            for other in SIDECAR_SUFFIXES:
+                if other != fmt:
+                    stale = self._sidecar_path(file_path, other)
+                    if stale.exists():
+                        stale.unlink()
+            return target
+        raise last_error
+
+    def _load_table(self, file_path: str, parser):
+        """Read a table without locking; also returns the XLSX/CSV path if it is newer than its sidecar"""
+        if not self.sidecar_format:
+            return self._read_cached(self._resolve_read_path(file_path), parser), None
+
         try:
-            return self._read_excel_local(file_path)
+            primary = self._resolve_read_path(file_path)
+        except FileNotFoundError:
+            primary = None
+
+        sidecar = self._find_sidecar(file_path)
+        if sidecar is not None and (primary is None or sidecar.stat().st_mtime_ns >= primary.stat().st_mtime_ns):
+            return self._read_cached(sidecar, self._read_sidecar_file), None
+        if primary is None:
+            raise FileNotFoundError(f"Local file not found: {file_path}")
+        return self._read_cached(primary, parser), primary
+
+    def _read_table(self, file_path: str, parser) -> pd.DataFrame:
+        """Read a tracked table, preferring a sidecar that is at least as new as the XLSX/CSV"""
+        with self._process_lock(file_path, exclusive=False):
+            df, stale_primary = self._load_table(file_path, parser)
+
+        if stale_primary is not None:
+            # No sidecar yet, or the XLSX/CSV was edited outside the app: reseed the sidecar
+            with self._get_file_lock(file_path), self._process_lock(file_path, exclusive=True):
+                current = self._find_sidecar(file_path)
+                if current is None or current.stat().st_mtime_ns < stale_primary.stat().st_mtime_ns:
+                    self._write_sidecar(df, file_path)
+        return df
+
+    def materialize(self, file_path: str) -> Path:
+        """Regenerate the XLSX/CSV for a table from its sidecar if stale and return its path"""
+        full_path = Path(__file__).parent.parent / 'data' / file_path
+        self.flush(file_path)
+        with self._get_file_lock(file_path), self._process_lock(file_path, exclusive=True):
+            # Pending CSV journal entries must be part of the downloaded file
+            self._compact_journal_unlocked(file_path)
+            if not self.sidecar_format:
+                return self._resolve_read_path(file_path)
+
+            sidecar = self._find_sidecar(file_path)
+            if sidecar is None:
+                return self._resolve_read_path(file_path)
+            sidecar_mtime = sidecar.stat().st_mtime_ns
+            if full_path.exists() and full_path.stat().st_mtime_ns >= sidecar_mtime:
+                return full_path
+
+            df = self._read_sidecar_file(str(sidecar))
+            if full_path.suffix.lower() == '.csv':
+                self._atomic_write(full_path, lambda path: df.to_csv(path, index=False, quoting=csv.QUOTE_NONNUMERIC))
+            else:
+                self._atomic_write(full_path, lambda path: df.to_excel(path, index=False))
+            # Match the sidecar mtime so reads keep treating the sidecar as current
+            os.utime(str(full_path), ns=(sidecar_mtime, sidecar_mtime))
+            safe_print(f"📁 Regenerated {full_path} from sidecar")
+            return full_path
+
+    def read_excel(self, file_path: str, columns: Optional[list] = None,
+                   filters: Optional[dict] = None) -> Optional[pd.DataFrame]:
+        """Read Excel file from local storage; `columns`/`filters` select a part of it (see stream_excel)"""
+        try:
+            return self._read_excel_local(file_path, columns, filters)
         except Exception as e:
             safe_print(f"❌ Error reading Excel file {file_path}: {e}")
             return None
 
+    def stream_excel(self, path, columns: Optional[list] = None, filters: Optional[dict] = None,
+                     sheet_name=0) -> pd.DataFrame:
+        """Read one sheet of any workbook row by row, keeping only the matching rows and requested columns.
+
+        `filters` keeps rows whose column equals a value (or any value in a list). Without filters the
+        result equals pd.read_excel(path, sheet_name)[columns], dtypes included; with filters, dtypes
+        are inferred from the kept rows. Memory is bounded by the rows kept, not the workbook.
+        """
+        filters = filters or {}
+        if Path(path).suffix.lower() not in STREAMABLE_EXCEL_SUFFIXES:
+            return _select_frame(pd.read_excel(str(path), sheet_name=sheet_name), columns, filters)
+
+        with _open_workbook(path) as workbook:
+            sheet = workbook.worksheets[sheet_name] if isinstance(sheet_name, int) else workbook[sheet_name]
+            rows = _iter_sheet_rows(sheet)
+            header = next(rows, None)
+            if header is None:
+                return pd.DataFrame()
+            names = [str(name) for name in header]
+            if columns is None:
+                positions = list(range(len(header)))
+            else:
+                positions = [names.index(column) for column in columns if column in names]
+            if any(column not in names for column in filters):
+                return _rows_to_frame([[header[i] for i in positions]])
+            conditions = [(names.index(column), _filter_targets(value)) for column, value in filters.items()]
+
+            kept = [[header[i] for i in positions]]
+            widest = len(header)
+            for row in rows:
+                width = len(row)
+                widest = max(widest, width)
+                if all(_normalize_cell(row[index] if index < width else '') in targets for index, targets in conditions):
+                    kept.append([row[i] if i < width else '' for i in positions] if columns is not None else row)
+        if columns is None:
+            # Rows wider than the header add Unnamed columns, even when a filter dropped those rows
+            kept[0] = list(header) + [''] * (widest - len(header))
+        return _rows_to_frame(kept)
+
+    def scan_excel_sheets(self, path, max_rows: int) -> dict:
+        """Every sheet of a workbook as {name: (row_count, frame)}, read in one streaming pass.
+
+        Row counts match len(pd.read_excel(...)); only sheets with at most max_rows rows are
+        materialized, larger ones come back with frame None.
+        """
+        if Path(path).suffix.lower() not in STREAMABLE_EXCEL_SUFFIXES:
+            sheets = pd.read_excel(str(path), sheet_name=None)
+            return {name: (len(df), df if len(df) <= max_rows else None) for name, df in sheets.items()}
+
+        result = {}
+        with _open_workbook(path) as workbook:
+            for sheet in workbook.worksheets:
+                kept, count = [], -1  # The header is not a data row
+                for row in _iter_sheet_rows(sheet):
+                    count += 1
+                    if count <= max_rows:
+                        kept.append(row)
+                count = max(count, 0)
+                result[sheet.title] = (count, _rows_to_frame(kept) if count <= max_rows else None)
+        return result
+
     def write_excel(self, df: pd.DataFrame, file_path: str) -> bool:
         """Write Excel file to local storage"""
         try:
+            if self.write_behind_delay > 0:
+                return self._enqueue_write('excel', df, file_path)
             return self._write_excel_local(df, file_path)
         except Exception as e:
             safe_print(f"❌ Error writing Excel file {file_path}: {e}")
             return False
 
+    def update_excel(self, file_path: str, update) -> bool:
+        """Read-modify-write an Excel table under one hold of its locks, so concurrent updates are not lost.
+
+        update(df) gets the current table (None if there is none yet) and returns the new one, or None
+        to leave it as it is. Returns whether the table was rewritten; errors are raised to the caller.
+        """
+        return self._update_table(file_path, update, pd.read_excel, self._write_excel_unlocked)
+
+    def _update_table(self, file_path: str, update, parser, write_unlocked) -> bool:
+        """Shared body of update_excel/update_csv"""
+        # Queued snapshots were read before this update and must not land after it
+        self.flush(file_path)
+        with self._get_file_lock(file_path), self._process_lock(file_path, exclusive=True):
+            try:
+                if self._journal_path(file_path).exists():
+                    df = self._read_journaled_unlocked(file_path)
+                else:
+                    df, _ = self._load_table(file_path, parser)
+            except FileNotFoundError:
+                df = None
+            df = update(df)
+            if df is None:
+                return False
+            # Written through, not queued: the next update must read this version
+            return write_unlocked(df, file_path)
+
     def file_exists(self, file_path: str) -> bool:
         """Check if file exists in local storage"""
         try:
@@ -58,33 +603,370 @@ class StorageService:
             safe_print(f"❌ Error listing files in {directory_path}: {e}")
             return []
 
+    def count_files(self, directory_path: str = "") -> int:
+        """Count files under a storage directory using the directory index"""
+        try:
+            return sum(1 for _ in self._iter_indexed(directory_path))
+        except Exception as e:
+            safe_print(f"❌ Error counting files in {directory_path}: {e}")
+            return 0
+
+    def get_directory_size(self, directory_path: str = "") -> int:
+        """Total size in bytes of the files under a storage directory"""
+        try:
+            return sum(size for _, size in self._iter_indexed(directory_path))
+        except Exception as e:
+            safe_print(f"❌ Error sizing {directory_path}: {e}")
+            return 0
+
+    def delete_file(self, file_path: str) -> bool:
+        """Delete a file from local storage, along with any sidecar or journal for it"""
+        try:
+            # Queued snapshots must not recreate the file after it is gone
+            self.flush(file_path)
+            full_path = Path(__file__).parent.parent / 'data' / file_path
+            companions = [self._sidecar_path(file_path, fmt) for fmt in SIDECAR_SUFFIXES]
+            companions.append(self._journal_path(file_path))
+
+            deleted = False
+            with self._get_file_lock(file_path), self._process_lock(file_path, exclusive=True):
+                if full_path.is_file():
+                    full_path.unlink()
+                    deleted = True
+                for companion in companions:
+                    if companion.exists():
+                        companion.unlink()
+                        deleted = True
+            self._invalidate_cache(file_path)
+            self._index_record(full_path)
+            return deleted
+        except Exception as e:
+            safe_print(f"❌ Error deleting file {file_path}: {e}")
+            return False
+
+    def list_tables(self, directory_path: str) -> list:
+        """List table paths under a directory, including ones only held as sidecars, journals or queued writes"""
+        tables = set(self.list_files(directory_path))
+        prefix = directory_path.strip('/') + '/'
+        for internal_dir, suffixes in ((SIDECAR_DIR, SIDECAR_SUFFIXES.values()), (JOURNAL_DIR, ['.jsonl'])):
+            root = Path(__file__).parent.parent / 'data' / internal_dir
+            base = root / directory_path
+            if not base.is_dir():
+                continue
+            for path in base.rglob('*'):
+                for suffix in suffixes:
+                    if path.name.endswith(suffix):
+                        tables.add(path.relative_to(root).as_posix()[:-len(suffix)])
+        with self._pending_cond:
+            tables.update(path for path in self._pending_writes if path.startswith(prefix))
+        return sorted(tables)
+
+    def read_json(self, file_path: str) -> Optional[dict]:
+        """Read a JSON document from local storage"""
+        try:
+            full_path = Path(__file__).parent.parent / 'data' / file_path
+            with self._process_lock(file_path, exclusive=False):
+                if not full_path.exists():
+                    return None
+                with open(full_path, 'r', encoding='utf-8') as handle:
+                    return json.load(handle)
+        except Exception as e:
+            safe_print(f"❌ Error reading JSON file {file_path}: {e}")
+            return None
+
+    def write_json(self, data, file_path: str) -> bool:
+        """Write a JSON document to local storage atomically"""
+        try:
+            full_path = Path(__file__).parent.parent / 'data' / file_path
+
+            def writer(path):
+                with open(path, 'w', encoding='utf-8') as handle:
+                    json.dump(data, handle, indent=2, default=str)
+
+            with self._get_file_lock(file_path), self._process_lock(file_path, exclusive=True):
+                self._atomic_write(full_path, writer)
+            return True
+        except Exception as e:
+            safe_print(f"❌ Error writing JSON file {file_path}: {e}")
+            return False
+
+    def update_json(self, file_path: str, update) -> bool:
+        """Read-modify-write a JSON document in local storage under write_json's locks.
+
+        update(data) gets the current document (None if there is none) and returns the new one, or None
+        to leave the file as it is. Returns whether the file was rewritten; errors are raised to the caller.
+        """
+        full_path = Path(__file__).parent.parent / 'data' / file_path
+        with self._get_file_lock(file_path), self._process_lock(file_path, exclusive=True):
+            current = None
+            if full_path.exists():
+                with open(full_path, 'r', encoding='utf-8') as handle:
+                    current = json.load(handle)
+            data = update(current)
+            if data is None:
+                return False
+
+            def writer(path):
+                with open(path, 'w', encoding='utf-8') as handle:
+                    json.dump(data, handle, indent=2, default=str)
+
+            self._atomic_write(full_path, writer)
+            return True
+
+    def update_json_file(self, full_path: Path, update) -> bool:
+        """Read-modify-write a JSON document outside data/ under write_json's locks and atomic write.
+
+        update(data) returns the new document, or None to leave the file as it is. Returns whether
+        the file was rewritten; a missing file is left alone and errors are raised to the caller.
+        """
+        full_path = Path(full_path)
+        # Lock files are named after storage paths, so outside files get one from their absolute path
+        lock_key = f"external/{hashlib.sha1(str(full_path.resolve()).encode('utf-8')).hexdigest()[:16]}.json"
+        with self._get_file_lock(lock_key), self._process_lock(lock_key, exclusive=True):
+            if not full_path.exists():
+                return False
+            with open(full_path, 'r', encoding='utf-8') as handle:
+                data = update(json.load(handle))
+            if data is None:
+                return False
+
+            def writer(path):
+                with open(path, 'w', encoding='utf-8') as handle:
+                    json.dump(data, handle, indent=2, default=str)
+
+            self._atomic_write(full_path, writer)
+            return True
+
+    def save_stream(self, stream, file_path: str, chunk_size: int = STREAM_CHUNK_SIZE) -> dict:
+        """Copy a binary stream (e.g. an upload's file.stream) to local storage atomically, one chunk at a time.
+
+        Returns the byte count and SHA-256 computed while copying; raises if the file could not be written.
+        """
+        full_path = Path(__file__).parent.parent / 'data' / file_path
+        digest = hashlib.sha256()
+        size = 0
+
+        def writer(path):
+            nonlocal size
+            with open(path, 'wb') as handle:
+                for chunk in iter(lambda: stream.read(chunk_size), b''):
+                    digest.update(chunk)
+                    handle.write(chunk)
+                    size += len(chunk)
+
+        with self._get_file_lock(file_path), self._process_lock(file_path, exclusive=True):
+            self._atomic_write(full_path, writer)
+        return {'size': size, 'sha256': digest.hexdigest()}
+
+    # Directory index
+    def _data_root(self) -> Path:
+        return Path(__file__).parent.parent / 'data'
+
+    def _scan_dir(self, path: str) -> _DirNode:
+        """Build an index node for a directory tree with os.scandir"""
+        node = _DirNode()
+        # Take the mtime before listing so a concurrent change forces a rescan later
+        node.mtime_ns = os.stat(path).st_mtime_ns
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name not in INTERNAL_DIRS:
+                        node.dirs[entry.name] = self._scan_dir(entry.path)
+                elif entry.is_file():
+                    stat = entry.stat()
+                    node.files[entry.name] = (stat.st_size, stat.st_mtime_ns)
+        return node
+
+    def _sweep_dir(self, node: _DirNode, path: str) -> bool:
+        """Refresh a node whose directory mtime changed; returns False if the directory is gone"""
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            return False
+        if mtime_ns != node.mtime_ns:
+            node.mtime_ns = mtime_ns
+            files, seen_dirs = {}, set()
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name in INTERNAL_DIRS:
+                            continue
+                        seen_dirs.add(entry.name)
+                        if entry.name not in node.dirs:
+                            node.dirs[entry.name] = self._scan_dir(entry.path)
+                    elif entry.is_file():
+                        stat = entry.stat()
+                        files[entry.name] = (stat.st_size, stat.st_mtime_ns)
+            node.files = files
+            for name in list(node.dirs):
+                if name not in seen_dirs:
+                    del node.dirs[name]
+        for name, child in list(node.dirs.items()):
+            if not self._sweep_dir(child, os.path.join(path, name)):
+                del node.dirs[name]
+        return True
+
+    def _has_many_dirs(self, node: _DirNode, limit: int) -> bool:
+        """True if a subtree holds more than `limit` directories (stops counting early)"""
+        stack, count = [node], 0
+        while stack:
+            current = stack.pop()
+            count += len(current.dirs)
+            if count > limit:
+                return True
+            stack.extend(current.dirs.values())
+        return False
+
+    def _index_lookup(self, directory_path: str):
+        """Return (node, relative path) for a directory, building its subtree on first use"""
+        rel = directory_path.strip('/').replace('\\', '/')
+        with self._index_lock:
+            for root, node in self._dir_index.items():
+                if rel == root or (root == '' or rel.startswith(root + '/')):
+                    remainder = rel[len(root):].strip('/') if root else rel
+                    for part in [p for p in remainder.split('/') if p]:
+                        node = node.dirs.get(part)
+                        if node is None:
+                            break
+                    if node is not None:
+                        # Small subtrees (a single checklist row) are always revalidated
+                        if not self._has_many_dirs(node, 32):
+                            self._sweep_dir(node, str(self._data_root() / rel))
+                        return node, rel
+
+            full_path = self._data_root() / rel
+            if not full_path.is_dir():
+                return None, rel
+            node = self._scan_dir(str(full_path))
+            # Subtrees nested in the new root are now covered by it
+            for root in [r for r in self._dir_index if r.startswith(rel + '/') or (rel == '' and r)]:
+                del self._dir_index[root]
+            self._dir_index[rel] = node
+            self._start_index_sweeper()
+            return node, rel
+
+    def _iter_indexed(self, directory_path: str):
+        """Yield (relative path, size) for every file under a directory from the index"""
+        node, rel = self._index_lookup(directory_path)
+        if node is None:
+            return
+        with self._index_lock:
+            results = []
+            stack = [(rel, node)]
+            while stack:
+                prefix, current = stack.pop()
+                for name, (size, _) in current.files.items():
+                    results.append((f"{prefix}/{name}" if prefix else name, size))
+                for name, child in current.dirs.items():
+                    stack.append((f"{prefix}/{name}" if prefix else name, child))
+        yield from results
+
+    def _index_record(self, full_path: Path):
+        """Apply a file write/delete made by this service to any indexed subtree"""
+        try:
+            rel = full_path.relative_to(self._data_root()).as_posix()
+        except ValueError:
+            return
+        parts = rel.split('/')
+        if INTERNAL_DIRS.intersection(parts):
+            return
+        with self._index_lock:
+            for root, node in self._dir_index.items():
+                if root and not rel.startswith(root + '/'):
+                    continue
+                remainder = rel[len(root):].strip('/').split('/') if root else parts
+                directory = self._data_root() / root
+                for part in remainder[:-1]:
+                    directory = directory / part
+                    child = node.dirs.get(part)
+                    if child is None:
+                        if directory.is_dir():
+                            node.dirs[part] = self._scan_dir(str(directory))
+                        node = None
+                        break
+                    node = child
+                if node is None:
+                    continue
+                name = remainder[-1]
+                if full_path.is_file():
+                    stat = full_path.stat()
+                    node.files[name] = (stat.st_size, stat.st_mtime_ns)
+                else:
+                    node.files.pop(name, None)
+                try:
+                    node.mtime_ns = os.stat(str(directory)).st_mtime_ns
+                except FileNotFoundError:
+                    pass
+
+    def _start_index_sweeper(self):
+        """Start the periodic mtime sweep of indexed subtrees (caller holds _index_lock)"""
+        if self._index_sweeper is not None or self._index_sweep_seconds <= 0:
+            return
+        self._index_sweeper = threading.Thread(target=self._index_sweep_loop, name='storage-dir-index', daemon=True)
+        self._index_sweeper.start()
+
+    def _index_sweep_loop(self):
+        while True:
+            time.sleep(self._index_sweep_seconds)
+            try:
+                with self._index_lock:
+                    for root in list(self._dir_index):
+                        if not self._sweep_dir(self._dir_index[root], str(self._data_root() / root)):
+                            del self._dir_index[root]
+            except Exception as e:
+                safe_print(f"⚠️ Directory index sweep failed: {e}")
+
     # Local storage methods
-    def _read_excel_local(self, file_path: str) -> pd.DataFrame:
+    def _read_excel_local(self, file_path: str, columns: Optional[list] = None,
+                          filters: Optional[dict] = None) -> pd.DataFrame:
         """Read Excel file from local storage"""
-        # Use data directory for organized local storage
-        full_path = Path(__file__).parent.parent / 'data' / file_path
-        if full_path.exists():
-            return pd.read_excel(str(full_path))
-        else:
-            # Fallback to old location for backward compatibility
-            fallback_path = Path(__file__).parent.parent / file_path
-            if fallback_path.exists():
-                return pd.read_excel(str(fallback_path))
-            raise FileNotFoundError(f"Local file not found: {full_path} or {fallback_path}")
+        pending = self._pending_snapshot(file_path)
+        if pending is not None:
+            return pending if columns is None and not filters else _select_frame(pending, columns, filters)
+        if columns is None and not filters:
+            return self._read_table(file_path, pd.read_excel)
+
+        # A partial read streams the XLSX instead of parsing (and caching) all of it
+        with self._process_lock(file_path, exclusive=False):
+            try:
+                primary = self._resolve_read_path(file_path)
+            except FileNotFoundError:
+                primary = None
+            sidecar = self._find_sidecar(file_path) if self.sidecar_format else None
+            if sidecar is not None and (primary is None or sidecar.stat().st_mtime_ns >= primary.stat().st_mtime_ns):
+                return _select_frame(self._read_cached(sidecar, self._read_sidecar_file), columns, filters)
+            if primary is None:
+                raise FileNotFoundError(f"Local file not found: {file_path}")
+            return self.stream_excel(primary, columns, filters)
 
     def _write_excel_local(self, df: pd.DataFrame, file_path: str) -> bool:
         """Write Excel file to local storage"""
         file_lock = self._get_file_lock(file_path)
-        with file_lock:
-            # Use data directory for organized local storage
-            full_path = Path(__file__).parent.parent / 'data' / file_path
-            full_path.parent.mkdir(parents=True, exist_ok=True)
-            df.to_excel(str(full_path), index=False)
-            safe_print(f"📁 Saved Excel file to local storage: {full_path}")
+        with file_lock, self._process_lock(file_path, exclusive=True):
+            return self._write_excel_unlocked(df, file_path)
+
+    def _write_excel_unlocked(self, df: pd.DataFrame, file_path: str) -> bool:
+        """Write a full Excel table; the caller holds the file locks"""
+        if self.sidecar_format:
+            sidecar = self._write_sidecar(df, file_path)
+            self._invalidate_cache(file_path)
+            safe_print(f"📁 Saved sidecar to local storage: {sidecar}")
             return True
+        # Use data directory for organized local storage
+        full_path = Path(__file__).parent.parent / 'data' / file_path
+        self._atomic_write(full_path, lambda path: df.to_excel(path, index=False))
+        self._invalidate_cache(file_path)
+        safe_print(f"📁 Saved Excel file to local storage: {full_path}")
+        return True
 
     def _file_exists_local(self, file_path: str) -> bool:
         """Check if file exists in local storage"""
+        if self._pending_snapshot(file_path) is not None:
+            return True
+        if self.sidecar_format and self._find_sidecar(file_path) is not None:
+            return True
+        if self._journal_path(file_path).exists():
+            return True
         # Check data directory first
         full_path = Path(__file__).parent.parent / 'data' / file_path
         if full_path.exists():
@@ -97,6 +979,8 @@ class StorageService:
         """List files in local storage directory"""
         # Use data directory for organized local storage
         full_path = Path(__file__).parent.parent / 'data' / directory_path
+        if full_path.is_dir():
+            return [path for path, _ in self._iter_indexed(directory_path)]
         if not full_path.exists():
             # Fallback to old location
             full_path = Path(__file__).parent.parent / directory_path
@@ -110,7 +994,7 @@ class StorageService:
         else:
             # If it's a directory, list all files recursively
             for file_path in full_path.rglob('*'):
-                if file_path.is_file():
+                if file_path.is_file() and not INTERNAL_DIRS.intersection(file_path.parts):
                     relative_path = str(file_path.relative_to(Path(__file__).parent.parent / 'data'))
                     files.append(relative_path)
 
@@ -128,37 +1012,222 @@ class StorageService:
     def write_csv(self, df: pd.DataFrame, file_path: str) -> bool:
         """Write CSV file to local storage"""
         try:
+            if self.write_behind_delay > 0:
+                return self._enqueue_write('csv', df, file_path)
             return self._write_csv_local(df, file_path)
         except Exception as e:
             safe_print(f"❌ Error writing CSV file {file_path}: {e}")
             return False
 
+    def update_csv(self, file_path: str, update) -> bool:
+        """Read-modify-write a CSV table (journal included) under one hold of its locks; see update_excel"""
+        return self._update_table(file_path, update, pd.read_csv, self._write_csv_unlocked)
+
+    def append_csv_rows(self, file_path: str, rows: list) -> bool:
+        """Append rows to a CSV table through its change journal"""
+        return self.apply_csv_changes(file_path, [{'op': 'insert', 'rows': rows}])
+
+    def update_csv_rows(self, file_path: str, match: dict, values: dict) -> bool:
+        """Update rows matching all column values in `match` through the change journal"""
+        return self.apply_csv_changes(file_path, [{'op': 'update', 'match': match, 'values': values}])
+
+    def delete_csv_rows(self, file_path: str, match: dict) -> bool:
+        """Delete rows matching all column values in `match` through the change journal"""
+        return self.apply_csv_changes(file_path, [{'op': 'delete', 'match': match}])
+
+    def apply_csv_changes(self, file_path: str, changes: list) -> bool:
+        """Append insert/update/delete records to a CSV table's journal as one unit"""
+        try:
+            return self._apply_csv_changes_local(file_path, changes)
+        except Exception as e:
+            safe_print(f"❌ Error journaling CSV changes for {file_path}: {e}")
+            return False
+
+    def compact_journal(self, file_path: str) -> bool:
+        """Fold a CSV table's journal into its base file"""
+        try:
+            self.flush(file_path)
+            with self._get_file_lock(file_path), self._process_lock(file_path, exclusive=True):
+                return self._compact_journal_unlocked(file_path)
+        except Exception as e:
+            safe_print(f"❌ Error compacting journal for {file_path}: {e}")
+            return False
+
+    def compact_all_journals(self) -> list:
+        """Compact every CSV journal and return the table paths that were compacted"""
+        compacted = []
+        for file_path in self.list_journals():
+            if self.compact_journal(file_path):
+                compacted.append(file_path)
+        return compacted
+
+    def list_journals(self) -> list:
+        """List CSV tables that currently have pending journal entries"""
+        journal_root = Path(__file__).parent.parent / 'data' / JOURNAL_DIR
+        if not journal_root.exists():
+            return []
+        return sorted(
+            str(path.relative_to(journal_root))[:-len('.jsonl')].replace(os.sep, '/')
+            for path in journal_root.rglob('*.jsonl')
+        )
+
+    def get_journal_stats(self) -> list:
+        """Report pending entries and bytes for every CSV journal"""
+        stats = []
+        for file_path in self.list_journals():
+            journal_path = self._journal_path(file_path)
+            try:
+                with open(journal_path, 'rb') as handle:
+                    entries = sum(1 for _ in handle)
+                size = journal_path.stat().st_size
+            except FileNotFoundError:
+                continue
+            stats.append({'file_path': file_path, 'entries': entries, 'bytes': size})
+        return stats
+
     # Local CSV methods
+    def _journal_path(self, file_path: str) -> Path:
+        """Location of the change journal for a CSV table"""
+        return Path(__file__).parent.parent / 'data' / JOURNAL_DIR / (file_path + '.jsonl')
+
     def _read_csv_local(self, file_path: str) -> pd.DataFrame:
         """Read CSV file from local storage"""
-        # Use data directory for organized local storage
-        full_path = Path(__file__).parent.parent / 'data' / file_path
-        if full_path.exists():
-            return pd.read_csv(str(full_path))
-        else:
-            # Fallback to old location for backward compatibility
-            fallback_path = Path(__file__).parent.parent / file_path
-            if fallback_path.exists():
-                return pd.read_csv(str(fallback_path))
-            raise FileNotFoundError(f"Local file not found: {full_path} or {fallback_path}")
+        pending = self._pending_snapshot(file_path)
+        if pending is not None:
+            return pending
+        journal_path = self._journal_path(file_path)
+        if not journal_path.exists():
+            return self._read_table(file_path, pd.read_csv)
+
+        with self._process_lock(file_path, exclusive=False):
+            return self._read_journaled_unlocked(file_path)
+
+    def _read_journaled_unlocked(self, file_path: str) -> pd.DataFrame:
+        """Read the base CSV and replay its journal on top"""
+        try:
+            df, _ = self._load_table(file_path, pd.read_csv)
+        except FileNotFoundError:
+            df = None
+
+        try:
+            with open(self._journal_path(file_path), 'r', encoding='utf-8') as handle:
+                records = [json.loads(line) for line in handle if line.strip()]
+        except FileNotFoundError:
+            records = []
+
+        if df is None and not records:
+            raise FileNotFoundError(f"Local file not found: {file_path}")
+        return self._replay_journal(df if df is not None else pd.DataFrame(), records)
+
+    def _replay_journal(self, df: pd.DataFrame, records: list) -> pd.DataFrame:
+        """Apply journal records to a DataFrame in order"""
+        pending_rows = []
+
+        def flush_inserts(frame):
+            if not pending_rows:
+                return frame
+            # Round-trip new rows through CSV so their dtypes match what a full rewrite would read back
+            buffer = io.StringIO()
+            pd.DataFrame(pending_rows).to_csv(buffer, index=False, quoting=csv.QUOTE_NONNUMERIC)
+            buffer.seek(0)
+            inserted = pd.read_csv(buffer)
+            pending_rows.clear()
+            if frame.empty and len(frame.columns) == 0:
+                return inserted
+            return pd.concat([frame, inserted], ignore_index=True)
+
+        for record in records:
+            op = record.get('op')
+            if op == 'insert':
+                pending_rows.extend(record.get('rows', []))
+                continue
+            df = flush_inserts(df)
+            mask = self._match_mask(df, record.get('match', {}))
+            if op == 'delete':
+                df = df[~mask].reset_index(drop=True)
+            elif op == 'update':
+                for column, value in record.get('values', {}).items():
+                    if column not in df.columns:
+                        df[column] = None
+                    elif df[column].dtype != object and isinstance(value, str):
+                        df[column] = df[column].astype(object)
+                    df.loc[mask, column] = value
+        return flush_inserts(df)
+
+    def _match_mask(self, df: pd.DataFrame, match: dict) -> pd.Series:
+        """Boolean mask of rows equal to every column value in `match`"""
+        mask = pd.Series(True, index=df.index)
+        for column, value in match.items():
+            if column not in df.columns:
+                return pd.Series(False, index=df.index)
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                # CSV round-trips can turn ints into floats or strings
+                mask &= pd.to_numeric(df[column], errors='coerce') == value
+            else:
+                mask &= df[column].astype(str) == str(value)
+        return mask
+
+    def _apply_csv_changes_local(self, file_path: str, changes: list) -> bool:
+        """Append journal records and compact when the journal grows past its thresholds"""
+        journal_path = self._journal_path(file_path)
+        # A queued full rewrite would otherwise land after (and erase) these entries
+        self.flush(file_path)
+        file_lock = self._get_file_lock(file_path)
+        with file_lock, self._process_lock(file_path, exclusive=True):
+            journal_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(journal_path, 'a', encoding='utf-8') as handle:
+                for change in changes:
+                    handle.write(json.dumps(change, default=str) + '\n')
+                handle.flush()
+                os.fsync(handle.fileno())
+            self._invalidate_cache(file_path)
+
+            size = journal_path.stat().st_size
+            if size >= self.journal_compact_bytes:
+                self._compact_journal_unlocked(file_path)
+            else:
+                with open(journal_path, 'rb') as handle:
+                    entries = sum(1 for _ in handle)
+                if entries >= self.journal_compact_entries:
+                    self._compact_journal_unlocked(file_path)
+            return True
+
+    def _compact_journal_unlocked(self, file_path: str) -> bool:
+        """Rewrite the base CSV from base plus journal, then drop the journal (caller holds locks)"""
+        journal_path = self._journal_path(file_path)
+        if not journal_path.exists():
+            return False
+        df = self._read_journaled_unlocked(file_path)
+        self._write_csv_unlocked(df, file_path)
+        safe_print(f"📁 Compacted CSV journal for {file_path}")
+        return True
 
     def _write_csv_local(self, df: pd.DataFrame, file_path: str) -> bool:
         """Write CSV file to local storage"""
         file_lock = self._get_file_lock(file_path)
-        with file_lock:
+        with file_lock, self._process_lock(file_path, exclusive=True):
+            return self._write_csv_unlocked(df, file_path)
+
+    def _write_csv_unlocked(self, df: pd.DataFrame, file_path: str) -> bool:
+        """Write a full CSV table; the caller holds the file locks"""
+        if self.sidecar_format:
+            sidecar = self._write_sidecar(df, file_path)
+            safe_print(f"📁 Saved sidecar to local storage: {sidecar}")
+        else:
             # Use data directory for organized local storage
             full_path = Path(__file__).parent.parent / 'data' / file_path
-            full_path.parent.mkdir(parents=True, exist_ok=True)
             # Save with proper CSV quoting for string fields only
-            import csv
-            df.to_csv(str(full_path), index=False, quoting=csv.QUOTE_NONNUMERIC)
+            self._atomic_write(full_path, lambda path: df.to_csv(path, index=False, quoting=csv.QUOTE_NONNUMERIC))
             safe_print(f"📁 Saved CSV file to local storage: {full_path}")
-            return True
+        # A full rewrite already contains every journaled change
+        journal_path = self._journal_path(file_path)
+        if journal_path.exists():
+            journal_path.unlink()
+        self._invalidate_cache(file_path)
+        return True
 
 # Global storage service instance
 storage_service = StorageService()
+
+# Make sure queued write-behind snapshots reach disk on interpreter shutdown
+atexit.register(storage_service.flush)
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Regression check: the merge-based aspek_records must return exactly what the
+old per-subtotal header scan returned
+"""
+
+import math
+import random
+import sys
+import pandas as pd
+from windows_utils import safe_print, set_console_encoding
+from assessment_serializer import aspek_records, build_records, number_column, text_column
+
+# Set console encoding for Windows compatibility
+set_console_encoding()
+
+
+def legacy_aspek_records(df):
+    """The previous get_aspek_data: one boolean-mask scan of header_rows per subtotal row"""
+    subtotal_rows = df[df['Type'] == 'subtotal']
+    header_rows = df[df['Type'] == 'header']
+
+    deskripsi = []
+    for _, subtotal_row in subtotal_rows[['Section', 'Tahun', 'Deskripsi']].iterrows():
+        matching_header = header_rows[
+            (header_rows['Section'] == subtotal_row['Section']) &
+            (header_rows['Tahun'] == subtotal_row['Tahun'])
+        ]
+        deskripsi.append(
+            matching_header.iloc[0]['Deskripsi'] if not matching_header.empty else subtotal_row['Deskripsi']
+        )
+
+    return build_records({
+        'id': text_column(subtotal_rows, 'No'),
+        'aspek': text_column(subtotal_rows, 'Section'),
+        'deskripsi': deskripsi,
+        'jumlah_parameter': number_column(subtotal_rows, 'Jumlah_Parameter', int),
+        'bobot': number_column(subtotal_rows, 'Bobot'),
+        'skor': number_column(subtotal_rows, 'Skor'),
+        'capaian': number_column(subtotal_rows, 'Capaian'),
+        'penjelasan': text_column(subtotal_rows, 'Penjelasan', 'Tidak Baik'),
+        'tahun': number_column(subtotal_rows, 'Tahun', int)
+    })
+
+
+def build_sheet(seed):
+    """Random sheet with missing, duplicate and description-less headers and missing keys"""
+    rng = random.Random(seed)
+    rows = []
+    for year in rng.sample([2021, 2022, 2023, 2024, 2025], 3):
+        for section in ['I', 'II', 'III', 'IV', 'V', 'VI', None]:
+            for _ in range(rng.choice([0, 1, 1, 2])):
+                rows.append({'Type': 'header', 'Section': section, 'No': None, 'Tahun': year,
+                             'Deskripsi': rng.choice([f'Aspek {section} #{rng.randint(1, 99)}', None])})
+            for no in range(1, rng.randint(1, 4)):
+                rows.append({'Type': 'indicator', 'Section': section, 'No': str(no), 'Tahun': year,
+                             'Deskripsi': f'Indikator {section}.{no}', 'Bobot': rng.random() * 5})
+            if rng.random() < 0.8:
+                rows.append({'Type': 'subtotal', 'Section': section, 'No': None,
+                             'Tahun': rng.choice([year, year, None]),
+                             'Deskripsi': rng.choice([f'JUMLAH {section}', None]),
+                             'Jumlah_Parameter': rng.choice([3, None]), 'Bobot': rng.random() * 20,
+                             'Skor': rng.choice([rng.random() * 20, None]), 'Capaian': rng.random() * 100,
+                             'Penjelasan': rng.choice(['Baik', 'Cukup', None])})
+    rng.shuffle(rows)
+    return pd.DataFrame(rows)
+
+
+def same_value(a, b):
+    if isinstance(a, float) and isinstance(b, float) and math.isnan(a) and math.isnan(b):
+        return True
+    return type(a) is type(b) and a == b
+
+
+def same_records(expected, actual):
+    if len(expected) != len(actual):
+        return False
+    for left, right in zip(expected, actual):
+        if left.keys() != right.keys():
+            return False
+        if not all(same_value(left[key], right[key]) for key in left):
+            return False
+    return True
+
+
+def main():
+    failures = 0
+    for seed in range(200):
+        df = build_sheet(seed)
+        if df.empty or 'Type' not in df.columns:
+            continue
+        expected = legacy_aspek_records(df)
+        actual = aspek_records(df)
+        if not same_records(expected, actual):
+            failures += 1
+            safe_print(f"❌ Seed {seed}: merge output differs from the header scan")
+
+    if failures:
+        safe_print(f"❌ {failures} sheet(s) differ")
+        return 1
+    safe_print("✅ aspek_records matches the per-row header scan on 200 random sheets")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
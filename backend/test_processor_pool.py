@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Regression check: a checkout waiting on a full processor pool must get a worker
+when the busy one is retired (recycled or crashed), not hang forever
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+from windows_utils import safe_print, set_console_encoding
+
+# One worker that is recycled after every job, and no preloaded modules to keep start-up fast
+os.environ['PROCESSOR_POOL_SIZE'] = '1'
+os.environ['PROCESSOR_MAX_JOBS'] = '1'
+os.environ['PROCESSOR_PRELOAD'] = ''
+
+from processor_pool import ProcessorPool, WorkerCrashed
+
+# Set console encoding for Windows compatibility
+set_console_encoding()
+
+JOB_SCRIPT = """
+import sys, time
+time.sleep(float(sys.argv[1]))
+print('done')
+"""
+
+WAIT_SECONDS = 30
+
+
+def retire_while_waiting(pool, script, crash):
+    """Run a job, queue a second checkout behind it, then retire the first worker"""
+    started = threading.Event()
+    results = {}
+
+    def first():
+        def on_start(process):
+            started.set()
+            if crash:
+                time.sleep(0.5)  # Let the second checkout start waiting first
+                process.terminate()
+        try:
+            results['first'] = pool.run([sys.executable, script, '1'], os.path.dirname(script), WAIT_SECONDS, on_start)
+        except WorkerCrashed as e:
+            results['first'] = e
+
+    def second():
+        results['second'] = pool.run([sys.executable, script, '0'], os.path.dirname(script), WAIT_SECONDS)
+
+    threads = [threading.Thread(target=first, daemon=True)]
+    threads[0].start()
+    started.wait(WAIT_SECONDS)
+    threads.append(threading.Thread(target=second, daemon=True))
+    threads[1].start()
+    for thread in threads:
+        thread.join(WAIT_SECONDS)
+    return results, any(thread.is_alive() for thread in threads)
+
+
+def main():
+    failures = 0
+    with tempfile.TemporaryDirectory() as folder:
+        script = os.path.join(folder, 'job.py')
+        with open(script, 'w', encoding='utf-8') as f:
+            f.write(JOB_SCRIPT)
+
+        for crash in (False, True):
+            label = 'crashed' if crash else 'recycled'
+            pool = ProcessorPool()
+            results, hung = retire_while_waiting(pool, script, crash)
+            second = results.get('second')
+            if hung or second is None or second.returncode != 0 or second.stdout.strip() != 'done':
+                failures += 1
+                safe_print(f"❌ Waiting checkout after a {label} worker: hung={hung}, result={second!r}")
+            else:
+                safe_print(f"✅ Waiting checkout got a replacement for a {label} worker")
+            stats = pool.get_stats()
+            if stats[label] < 1 or stats['workers'] > pool.size:
+                failures += 1
+                safe_print(f"❌ Unexpected pool stats after a {label} worker: {stats}")
+
+    if failures:
+        safe_print(f"❌ {failures} check(s) failed")
+        return 1
+    safe_print("✅ Retired processor workers are replaced for waiting jobs")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
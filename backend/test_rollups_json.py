@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Regression check: /api/gcg-rollups must be strict JSON (no bare NaN tokens), both
+for the shipped performa_gcg data and for aspek rows with missing scores
+
+The API check imports app from a temporary copy of backend/ and data/, so its
+migrations, indexes and background tasks never touch the tracked database or files.
+"""
+
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+import pandas as pd
+from windows_utils import safe_print, set_console_encoding
+
+# Importing app starts the background tasks; keep file retention report-only here
+os.environ.setdefault('RETENTION_DRY_RUN', 'true')
+
+from assessment_store import build_rollups
+
+# Set console encoding for Windows compatibility
+set_console_encoding()
+
+
+def reject_constant(token):
+    raise ValueError(f'non-standard JSON token {token}')
+
+
+def strict_loads(text):
+    """json.loads that rejects NaN/Infinity like the browser's JSON.parse"""
+    return json.loads(text, parse_constant=reject_constant)
+
+
+def sparse_rows():
+    """Aspek subtotals where some years have no Skor/Capaian, so their deltas are missing"""
+    rows = []
+    for tahun, skor in [(2021, 10.0), (2022, None), (2023, 12.5)]:
+        for section in ['I', 'II']:
+            rows.append({'Type': 'subtotal', 'Section': section, 'Tahun': tahun, 'Bobot': 20.0,
+                         'Skor': skor, 'Capaian': None if skor is None else skor * 5,
+                         'Jumlah_Parameter': None, 'Penjelasan': None})
+    return pd.DataFrame(rows)
+
+
+def check_api():
+    """Fetch /api/gcg-rollups through the app; returns the number of failed checks"""
+    from app import app
+    response = app.test_client().get('/api/gcg-rollups')
+    try:
+        body = strict_loads(response.get_data(as_text=True))
+        if response.status_code != 200 or not body.get('success'):
+            safe_print(f"❌ /api/gcg-rollups answered {response.status_code}")
+            return 1
+    except ValueError as e:
+        safe_print(f"❌ /api/gcg-rollups: {e}")
+        return 1
+    return 0
+
+
+def check_api_in_copy():
+    """Run check_api in a subprocess against a scratch copy of the backend, its database and data/"""
+    backend = Path(__file__).resolve().parent
+    with tempfile.TemporaryDirectory() as folder:
+        scratch = Path(folder) / 'backend'
+        scratch.mkdir()
+        # Every module locates the database and data/ relative to its own file
+        for source in list(backend.glob('*.py')) + [backend / 'gcg_database.db']:
+            shutil.copy2(source, scratch / source.name)
+        shutil.copytree(backend.parent / 'data', Path(folder) / 'data')
+        # Legacy results are read from the old repo-root location when data/ has none
+        if (backend.parent / 'web-output').is_dir():
+            shutil.copytree(backend.parent / 'web-output', Path(folder) / 'web-output')
+        result = subprocess.run([sys.executable, str(scratch / Path(__file__).name), '--api'], cwd=str(scratch))
+        return 0 if result.returncode == 0 else 1
+
+
+def main():
+    if '--api' in sys.argv[1:]:
+        return check_api()
+
+    failures = 0
+
+    try:
+        strict_loads(json.dumps(build_rollups(sparse_rows(), {})))
+    except ValueError as e:
+        failures += 1
+        safe_print(f"❌ build_rollups with missing scores: {e}")
+
+    failures += check_api_in_copy()
+
+    if failures:
+        safe_print(f"❌ {failures} check(s) failed")
+        return 1
+    safe_print("✅ /api/gcg-rollups responses parse as strict JSON")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Regression check: the streaming Excel reader must return what pd.read_excel returns,
+for projected and filtered reads and for the per-sheet scan used by upload analysis
+"""
+
+import os
+import sys
+import tempfile
+import pandas as pd
+from openpyxl import Workbook
+from windows_utils import safe_print, set_console_encoding
+from storage_service import storage_service
+
+# Set console encoding for Windows compatibility
+set_console_encoding()
+
+
+def build_workbook(path):
+    """A DETAILED sheet with blanks, errors and a ragged row, plus a small BRIEF sheet"""
+    workbook = Workbook()
+    detailed = workbook.active
+    detailed.title = 'Detailed'
+    detailed.append(['Type', 'Tahun', 'No', 'Deskripsi', 'Skor'])
+    for no in range(1, 31):
+        detailed.append(['indicator' if no % 5 else 'subtotal', 2024, no, f'Indikator {no}', no * 1.5])
+    detailed.append([])
+    detailed.append(['total', 2024, None, '#N/A', 99, 'extra'])
+    brief = workbook.create_sheet('Brief')
+    brief.append(['Aspek', 'Bobot', 'Skor'])
+    for aspek in ('I', 'II', 'III', 'IV'):
+        brief.append([aspek, 10, 8.5])
+    workbook.save(path)
+
+
+def main():
+    failures = 0
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, 'book.xlsx')
+        build_workbook(path)
+        full = pd.read_excel(path)
+
+        checks = [
+            ('whole sheet', storage_service.stream_excel(path), full),
+            ('projection', storage_service.stream_excel(path, columns=['Skor', 'Type', 'Missing']), full[['Skor', 'Type']]),
+            ('absent columns', storage_service.stream_excel(path, columns=['Missing']), full[[]]),
+        ]
+        for label, streamed, expected in checks:
+            try:
+                pd.testing.assert_frame_equal(streamed, expected.reset_index(drop=True))
+                safe_print(f"✅ {label} matches pd.read_excel")
+            except AssertionError as e:
+                failures += 1
+                safe_print(f"❌ {label} differs from pd.read_excel: {e}")
+
+        filtered = storage_service.stream_excel(path, columns=['No'], filters={'Type': 'subtotal'})
+        if filtered['No'].tolist() != full.loc[full['Type'] == 'subtotal', 'No'].tolist():
+            failures += 1
+            safe_print(f"❌ Filtered read kept the wrong rows: {filtered['No'].tolist()}")
+        else:
+            safe_print("✅ Filtered read keeps only the matching rows")
+
+        sheets = pd.read_excel(path, sheet_name=None)
+        scanned = storage_service.scan_excel_sheets(path, 15)
+        counts = {name: count for name, (count, _) in scanned.items()}
+        if counts != {name: len(df) for name, df in sheets.items()} or scanned['Detailed'][1] is not None:
+            failures += 1
+            safe_print(f"❌ Sheet scan row counts or materialization wrong: {counts}")
+        else:
+            pd.testing.assert_frame_equal(scanned['Brief'][1], sheets['Brief'])
+            safe_print("✅ Sheet scan counts every sheet and materializes only small ones")
+
+    if failures:
+        safe_print(f"❌ {failures} check(s) failed")
+        return 1
+    safe_print("✅ Streaming Excel reads match pd.read_excel")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
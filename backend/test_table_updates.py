@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Regression check: concurrent read-modify-write updates of an Excel or CSV table
+(update_excel / update_csv) from several processes and threads must not lose rows
+"""
+
+import multiprocessing
+import shutil
+import sys
+import threading
+import uuid
+from pathlib import Path
+import pandas as pd
+from windows_utils import safe_print, set_console_encoding
+from storage_service import storage_service, SIDECAR_DIR, LOCK_DIR, JOURNAL_DIR
+
+# Set console encoding for Windows compatibility
+set_console_encoding()
+
+PROCESSES = 3
+THREADS = 3
+UPDATES_PER_THREAD = 4
+DATA_ROOT = Path(__file__).parent.parent / 'data'
+SCRATCH_DIR = f"_test_table_updates_{uuid.uuid4().hex[:8]}"
+
+
+def append_rows(file_path, kind, worker):
+    """Append one row per update, each through its own read-modify-write"""
+    update = storage_service.update_excel if kind == 'excel' else storage_service.update_csv
+
+    def run(thread):
+        for n in range(UPDATES_PER_THREAD):
+            row = pd.DataFrame([{'id': f"{worker}-{thread}-{n}", 'worker': worker}])
+            update(file_path, lambda df: row if df is None else pd.concat([df, row], ignore_index=True))
+
+    threads = [threading.Thread(target=run, args=(thread,)) for thread in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def main():
+    failures = 0
+    created = [d for d in ('', SIDECAR_DIR, LOCK_DIR, JOURNAL_DIR) if not (DATA_ROOT / d).exists()]
+    try:
+        for kind, suffix in (('excel', 'xlsx'), ('csv', 'csv')):
+            file_path = f"{SCRATCH_DIR}/table.{suffix}"
+            workers = [multiprocessing.Process(target=append_rows, args=(file_path, kind, worker))
+                       for worker in range(PROCESSES)]
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+
+            storage_service.clear_cache()
+            df = storage_service.read_excel(file_path) if kind == 'excel' else storage_service.read_csv(file_path)
+            expected = PROCESSES * THREADS * UPDATES_PER_THREAD
+            count = 0 if df is None else df['id'].nunique()
+            if count != expected:
+                failures += 1
+                safe_print(f"❌ {kind}: {count} of {expected} concurrently appended rows survived")
+            else:
+                safe_print(f"✅ {kind}: all {expected} concurrently appended rows survived")
+
+        unchanged = storage_service.update_csv(f"{SCRATCH_DIR}/table.csv", lambda df: None)
+        if unchanged:
+            failures += 1
+            safe_print("❌ An update returning None rewrote the table")
+        else:
+            safe_print("✅ An update returning None leaves the table alone")
+    finally:
+        for root in ('', SIDECAR_DIR, LOCK_DIR, JOURNAL_DIR):
+            shutil.rmtree(DATA_ROOT / root / SCRATCH_DIR, ignore_errors=True)
+        for root in created:
+            if root and (DATA_ROOT / root).exists() and not any((DATA_ROOT / root).iterdir()):
+                (DATA_ROOT / root).rmdir()
+
+    if failures:
+        safe_print(f"❌ {failures} check(s) failed")
+        return 1
+    safe_print("✅ Locked table updates do not lose concurrent writes")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
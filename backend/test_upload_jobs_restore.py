@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Regression check: on start-up an upload worker must only restore jobs whose owning
+process is gone, leave jobs of live workers alone, and never adopt a job twice when
+several workers start at once
+"""
+
+import multiprocessing
+import shutil
+import subprocess
+import sys
+import uuid
+from datetime import datetime
+from pathlib import Path
+from windows_utils import safe_print, set_console_encoding
+import upload_jobs as upload_jobs_module
+from storage_service import storage_service, LOCK_DIR
+from upload_jobs import BOOT_ID, FAILED, QUEUED, RUNNING, UploadJobQueue
+
+# Set console encoding for Windows compatibility
+set_console_encoding()
+
+DATA_ROOT = Path(__file__).parent.parent / 'data'
+SCRATCH_DIR = f"_test_upload_jobs_{uuid.uuid4().hex[:8]}"
+ORPHANS = 6
+
+
+def write_job(job_id, status, owner):
+    job = {'id': job_id, 'status': status, 'params': {}, 'created_at': datetime.now().isoformat(),
+           'started_at': None, 'finished_at': None, 'result': None, 'error': None}
+    if owner is not None:
+        job['owner'] = owner
+    storage_service.write_json(job, f'{SCRATCH_DIR}/{job_id}.json')
+
+
+def read_job(job_id):
+    return storage_service.read_json(f'{SCRATCH_DIR}/{job_id}.json')
+
+
+def restore_in_worker(barrier, results):
+    """A freshly started worker process: restore, then stay alive until every worker has restored"""
+    upload_jobs_module.JOBS_DIR = SCRATCH_DIR
+    jobs = UploadJobQueue()
+    jobs._restore_jobs()
+    results.put(sorted(jobs._jobs))
+    barrier.wait(60)
+
+
+def main():
+    failures = 0
+    upload_jobs_module.JOBS_DIR = SCRATCH_DIR
+    created = [d for d in ('', LOCK_DIR) if not (DATA_ROOT / d).exists()]
+    live = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(60)'])
+    dead = subprocess.Popen([sys.executable, '-c', 'pass'])
+    dead.wait()
+    try:
+        write_job('live-queued', QUEUED, {'pid': live.pid, 'boot_id': BOOT_ID})
+        write_job('live-running', RUNNING, {'pid': live.pid, 'boot_id': BOOT_ID})
+        write_job('dead-queued', QUEUED, {'pid': dead.pid, 'boot_id': BOOT_ID})
+        write_job('dead-running', RUNNING, {'pid': dead.pid, 'boot_id': BOOT_ID})
+        write_job('rebooted-queued', QUEUED, {'pid': live.pid, 'boot_id': 'an-earlier-boot'})
+        write_job('legacy-queued', QUEUED, None)
+
+        jobs = UploadJobQueue()
+        jobs._restore_jobs()
+        adopted = sorted(jobs._jobs)
+        expected = ['dead-queued', 'legacy-queued', 'rebooted-queued']
+        if adopted != expected:
+            failures += 1
+            safe_print(f"❌ Restored {adopted}, expected {expected}")
+        else:
+            safe_print("✅ Only jobs of dead, rebooted or unrecorded owners are restored")
+
+        if read_job('live-queued')['status'] != QUEUED or read_job('live-running')['status'] != RUNNING:
+            failures += 1
+            safe_print("❌ Jobs of a live worker were changed")
+        else:
+            safe_print("✅ Jobs of a live worker are left alone")
+
+        if read_job('dead-running')['status'] != FAILED or read_job('dead-queued')['owner'] != jobs._owner():
+            failures += 1
+            safe_print("❌ A dead worker's running job was not failed, or its queued job not claimed")
+        else:
+            safe_print("✅ A dead worker's running job is failed and its queued job is claimed")
+
+        # Several workers starting at once must split the orphans, never share them
+        for index in range(ORPHANS):
+            write_job(f'orphan-{index}', QUEUED, {'pid': dead.pid, 'boot_id': BOOT_ID})
+        workers = 3
+        barrier = multiprocessing.Barrier(workers)
+        results = multiprocessing.Queue()
+        processes = [multiprocessing.Process(target=restore_in_worker, args=(barrier, results))
+                     for _ in range(workers)]
+        for process in processes:
+            process.start()
+        restored = [job_id for _ in processes for job_id in results.get(timeout=60)]
+        for process in processes:
+            process.join(60)
+        orphans = sorted(job_id for job_id in restored if job_id.startswith('orphan-'))
+        if orphans != [f'orphan-{index}' for index in range(ORPHANS)]:
+            failures += 1
+            safe_print(f"❌ Concurrent restores adopted {orphans}")
+        else:
+            safe_print(f"✅ {workers} concurrent restores adopted each of {ORPHANS} orphaned jobs exactly once")
+    finally:
+        live.kill()
+        live.wait()
+        for root in ('', LOCK_DIR):
+            shutil.rmtree(DATA_ROOT / root / SCRATCH_DIR, ignore_errors=True)
+        for root in created:
+            if root and (DATA_ROOT / root).exists() and not any((DATA_ROOT / root).iterdir()):
+                (DATA_ROOT / root).rmdir()
+
+    if failures:
+        safe_print(f"❌ {failures} check(s) failed")
+        return 1
+    safe_print("✅ Upload jobs are restored only by a worker that may own them")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,323 @@
+"""
+Upload Jobs - Bounded background worker pool for /api/upload document processing
+Uploads are queued and processed off the request thread. Every job's state and
+result is persisted under data/upload-jobs/, so finished jobs survive a restart.
+Each job records the server process that owns it; when that process is gone, the
+next process to start picks up its waiting jobs and fails the ones it was running.
+"""
+
+import os
+import queue
+import re
+import subprocess
+import threading
+from datetime import datetime
+from typing import Callable, Optional
+from processor_pool import WorkerCrashed, processor_pool
+from storage_service import storage_service
+from windows_utils import safe_print
+
+JOBS_DIR = 'upload-jobs'
+
+# Job states
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+FINISHED_STATES = (DONE, FAILED, CANCELLED)
+
+# Internal fields that are never returned by the status endpoints
+PRIVATE_FIELDS = ('params', 'cancel_requested', 'owner')
+
+# Windows process query constants for _process_alive
+PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+STILL_ACTIVE = 259
+
+JOB_ID_PATTERN = re.compile(r'[0-9a-fA-F-]{1,64}')
+
+
+def _boot_id() -> str:
+    """Identifier of the current OS boot (Linux); '' where there is none"""
+    try:
+        with open('/proc/sys/kernel/random/boot_id', 'r', encoding='utf-8') as handle:
+            return handle.read().strip()
+    except OSError:
+        return ''
+
+
+BOOT_ID = _boot_id()
+
+
+def _process_alive(pid: int) -> bool:
+    """Whether a process with this pid is running"""
+    if os.name == 'nt':
+        # os.kill would terminate the process on Windows
+        import ctypes
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.OpenProcess(PROCESS_QUERY_LIMITED_INFORMATION, False, pid)
+        if not handle:
+            return False
+        try:
+            code = ctypes.c_ulong()
+            return bool(kernel32.GetExitCodeProcess(handle, ctypes.byref(code))) and code.value == STILL_ACTIVE
+        finally:
+            kernel32.CloseHandle(handle)
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True  # Exists, owned by another user
+    return True
+
+
+class QueueFullError(Exception):
+    """Raised when the maximum number of jobs is already waiting"""
+
+
+class JobCancelled(Exception):
+    """Raised inside a job's handler when the job is cancelled while it runs"""
+
+
+class UploadJobQueue:
+    """Fixed number of worker threads draining a queue of persisted upload jobs"""
+
+    def __init__(self):
+        self.workers = max(1, int(os.environ.get('UPLOAD_WORKERS', 2)))
+        self.max_queued = max(1, int(os.environ.get('UPLOAD_QUEUE_LIMIT', 20)))
+        self._handler = None
+        self._queue = queue.Queue()
+        self._jobs = {}  # Queued and running jobs; finished ones are only on disk
+        self._processes = {}  # job id -> running process (pool worker or subprocess), for cancellation
+        self._lock = threading.Lock()
+        self._threads = []
+
+    def job_path(self, job_id: str) -> str:
+        return f'{JOBS_DIR}/{job_id}.json'
+
+    def _owner(self) -> dict:
+        """Owner record for jobs of this process (read per call: workers may be forked after import)"""
+        return {'pid': os.getpid(), 'boot_id': BOOT_ID}
+
+    def _owner_alive(self, owner: Optional[dict]) -> bool:
+        """Whether the server process that owns a job is still running"""
+        if not owner or owner.get('boot_id') != BOOT_ID:
+            return False  # Recorded before ownership existed, or before a reboot
+        if owner.get('pid') == os.getpid():
+            return False  # An earlier process that had our pid (e.g. pid 1 in a container)
+        return _process_alive(owner['pid'])
+
+    def start(self, handler: Callable[[dict], dict]):
+        """Restore persisted jobs and start the workers; handler(job) returns the job's result"""
+        with self._lock:
+            if self._threads:
+                return
+            self._handler = handler
+            self._restore_jobs()
+            for index in range(self.workers):
+                thread = threading.Thread(target=self._worker, name=f'upload-worker-{index}', daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def _restore_jobs(self):
+        """Adopt the waiting jobs of server processes that are gone and fail the ones they were running.
+
+        Jobs of live processes (other workers of this server) are left to them. Each job is claimed
+        under its file lock, so two processes starting together never both take it.
+        """
+        waiting = []
+        for path in storage_service.list_files(JOBS_DIR):
+            # Dot files are other processes' atomic writes still in progress
+            if not path.endswith('.json') or path.rsplit('/', 1)[-1].startswith('.'):
+                continue
+            claimed = {}
+
+            def claim(job):
+                if (not job or job.get('status') not in (QUEUED, RUNNING) or job.get('id') in self._jobs
+                        or self._owner_alive(job.get('owner'))):
+                    return None
+                if job['status'] == RUNNING:
+                    job.update(status=FAILED, error='Interrupted by a server restart',
+                               finished_at=datetime.now().isoformat())
+                else:
+                    job['owner'] = self._owner()
+                    claimed['job'] = job
+                return job
+
+            try:
+                storage_service.update_json(path, claim)
+            except Exception as e:
+                safe_print(f"⚠️ Could not restore upload job {path}: {e}")
+                continue
+            if 'job' in claimed:
+                self._jobs[claimed['job']['id']] = claimed['job']
+                waiting.append(claimed['job'])
+
+        for job in sorted(waiting, key=lambda job: job['created_at']):
+            self._queue.put(job['id'])
+        if waiting:
+            safe_print(f"📋 Requeued {len(waiting)} upload jobs from the previous run")
+
+    def _save(self, job: dict):
+        storage_service.write_json(job, self.job_path(job['id']))
+
+    def _public(self, job: dict) -> dict:
+        """A job as returned by the API"""
+        public = {key: value for key, value in job.items() if key not in PRIVATE_FIELDS}
+        if job['status'] == QUEUED:
+            waiting = sorted(j['created_at'] for j in self._jobs.values() if j['status'] == QUEUED)
+            public['queue_position'] = waiting.index(job['created_at']) + 1 if job['created_at'] in waiting else None
+        return public
+
+    def submit(self, job_id: str, params: dict) -> dict:
+        """Queue a job; raises QueueFullError when max_queued jobs are already waiting"""
+        with self._lock:
+            if self._queue_depth() >= self.max_queued:
+                raise QueueFullError(f'Upload queue is full ({self.max_queued} jobs waiting)')
+            job = {
+                'id': job_id,
+                'status': QUEUED,
+                'owner': self._owner(),
+                'params': params,
+                'created_at': datetime.now().isoformat(),
+                'started_at': None,
+                'finished_at': None,
+                'result': None,
+                'error': None,
+            }
+            self._jobs[job_id] = job
+            self._save(job)
+            public = self._public(job)
+        self._queue.put(job_id)
+        return public
+
+    def record_done(self, job_id: str, params: dict, result: dict) -> dict:
+        """Persist a job that needed no processing (e.g. a cached result) as already done"""
+        now = datetime.now().isoformat()
+        job = {
+            'id': job_id,
+            'status': DONE,
+            'owner': self._owner(),
+            'params': params,
+            'created_at': now,
+            'started_at': now,
+            'finished_at': now,
+            'result': result,
+            'error': None,
+        }
+        self._save(job)
+        return self._public(job)
+
+    def get(self, job_id: str) -> Optional[dict]:
+        """A job's current state, or None if it is unknown"""
+        if not JOB_ID_PATTERN.fullmatch(job_id):
+            return None
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                return self._public(job)
+        job = storage_service.read_json(self.job_path(job_id))
+        return self._public(job) if job else None
+
+    def cancel(self, job_id: str) -> Optional[dict]:
+        """Cancel a queued job at once, or stop a running job's process; finished jobs are unchanged"""
+        process = None
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                if job['status'] == QUEUED:
+                    job.update(status=CANCELLED, finished_at=datetime.now().isoformat())
+                    self._save(job)
+                    del self._jobs[job_id]
+                else:
+                    job['cancel_requested'] = True
+                    process = self._processes.get(job_id)
+                public = self._public(job)
+        if job is None:
+            return self.get(job_id)  # Finished or unknown
+        if process is not None:
+            process.terminate()
+        return public
+
+    def run_command(self, job: dict, cmd: list, cwd: str, timeout: float) -> subprocess.CompletedProcess:
+        """subprocess.run for a job's handler that cancel() can stop; raises JobCancelled if it did.
+
+        Python scripts run on a warm processor pool worker, with a fresh subprocess as the fallback.
+        """
+        def register(process):
+            with self._lock:
+                self._processes[job['id']] = process
+                cancelled = job.get('cancel_requested', False)
+            if cancelled:
+                process.terminate()
+
+        try:
+            if processor_pool.accepts(cmd):
+                try:
+                    result = processor_pool.run(cmd, cwd, timeout, on_start=register)
+                except WorkerCrashed as e:
+                    if job.get('cancel_requested'):
+                        raise JobCancelled()
+                    safe_print(f"⚠️ {e}; retrying upload job {job['id']} as a subprocess")
+                    result = processor_pool.run_cli(cmd, cwd, timeout, on_start=register)
+            else:
+                result = processor_pool.run_cli(cmd, cwd, timeout, on_start=register)
+        finally:
+            with self._lock:
+                self._processes.pop(job['id'], None)
+
+        if job.get('cancel_requested'):
+            raise JobCancelled()
+        return result
+
+    def _worker(self):
+        while True:
+            job_id = self._queue.get()
+            with self._lock:
+                job = self._jobs.get(job_id)
+                if job is None or job['status'] != QUEUED:
+                    continue  # Cancelled while waiting
+                job.update(status=RUNNING, started_at=datetime.now().isoformat())
+                self._save(job)
+
+            update = {}
+            try:
+                update = {'status': DONE, 'result': self._handler(job)}
+            except JobCancelled:
+                update = {'status': CANCELLED}
+            except Exception as e:
+                safe_print(f"❌ Upload job {job_id} failed: {e}")
+                update = {'status': FAILED, 'error': str(e)}
+            finally:
+                with self._lock:
+                    if job.get('cancel_requested') and update.get('status') != FAILED:
+                        update = {'status': CANCELLED}
+                    job.update(update, finished_at=datetime.now().isoformat())
+                    job.pop('cancel_requested', None)
+                    self._save(job)
+                    self._jobs.pop(job_id, None)
+
+    def active_paths(self) -> set:
+        """Input and output paths of queued and running jobs, which must not be removed"""
+        with self._lock:
+            return {str(job['params'][key]) for job in self._jobs.values()
+                    for key in ('input_path', 'output_path') if job['params'].get(key)}
+
+    def _queue_depth(self) -> int:
+        return sum(1 for job in self._jobs.values() if job['status'] == QUEUED)
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return {
+                'workers': self.workers,
+                'max_queued': self.max_queued,
+                'queue_depth': self._queue_depth(),
+                'running': sum(1 for job in self._jobs.values() if job['status'] == RUNNING),
+                'active_jobs': [self._public(job) for job in self._jobs.values()],
+                'processor_pool': processor_pool.get_stats(),
+            }
+
+
+# Global upload job queue
+upload_jobs = UploadJobQueue()
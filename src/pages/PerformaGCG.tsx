@@ -19,6 +19,7 @@ import { useUser } from '@/contexts/UserContext';
 import { useChecklist } from '@/contexts/ChecklistContext';
 import { useYear } from '@/contexts/YearContext';
 import { GCGChartWrapper } from '@/components/dashboard/GCGChartWrapper';
+import { waitForUploadJob } from '@/utils/uploadJob';
 import { 
   FileText, 
   Upload, 
@@ -1313,7 +1314,9 @@ const PerformaGCG = () => {
         throw new Error('Processing failed');
       }
 
-      const result = await response.json();
+      // Cache hits come back with the result; everything else is polled until processed
+      const { jobId, result: cachedResult } = await response.json();
+      const result = cachedResult ?? await waitForUploadJob(jobId);
       
       // Store processing result for display
       setProcessingResult(result);
@@ -0,0 +1,25 @@
+// Longest wait for a queued upload: a full queue (20 jobs on 2 workers) of 3-minute processing runs
+const MAX_WAIT_MS = 30 * 60 * 1000;
+
+// /api/upload queues the document and answers with a job id; the result is fetched once the worker is done
+export const waitForUploadJob = async (jobId: string, intervalMs = 1000, timeoutMs = MAX_WAIT_MS): Promise<any> => {
+  const deadline = Date.now() + timeoutMs;
+  for (;;) {
+    const response = await fetch(`/api/upload/jobs/${jobId}/result`);
+
+    if (response.status === 200) {
+      return response.json();
+    }
+    if (response.status !== 202) {
+      const body = await response.json().catch(() => ({}));
+      throw new Error(body.error || 'Processing failed');
+    }
+
+    if (Date.now() + intervalMs > deadline) {
+      // Nobody is waiting for the result any more; stop the job if it is still queued or running
+      await fetch(`/api/upload/jobs/${jobId}/cancel`, { method: 'POST' }).catch(() => undefined);
+      throw new Error('Processing timed out');
+    }
+    await new Promise(resolve => setTimeout(resolve, intervalMs));
+  }
+};